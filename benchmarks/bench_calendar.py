@@ -0,0 +1,62 @@
+"""
+Benchmark do calendário de leitura (heatmap.py) sobre um banco gerado.
+
+Mede carregar a grade de vários anos (consultas + agrupamento por dia) e
+gerar os pixels das duas métricas, com NumPy e com o caminho em Python.
+Não abre janela: o que a UI faz depois é subir a textura e, ao arrastar,
+só trocar a região visível.
+
+    python benchmarks/generate.py /tmp/roots.db --scale large
+    python benchmarks/bench_calendar.py /tmp/roots.db --years 5 --runs 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interface"))
+
+from database import Database  # noqa: E402
+import heatmap  # noqa: E402
+
+
+def _measure(db, years, today, runs):
+    load, render = [], []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        grid = heatmap.load_calendar(db, years, today)
+        t1 = time.perf_counter()
+        for metric in heatmap.THRESHOLDS:
+            heatmap.render_rgba(grid, metric)
+        render.append((time.perf_counter() - t1) * 1000)
+        load.append((t1 - t0) * 1000)
+    return grid, load, render
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path")
+    ap.add_argument("--years", type=int, default=heatmap.YEARS)
+    ap.add_argument("--runs", type=int, default=20)
+    args = ap.parse_args()
+
+    db = Database(args.path)
+    db.migrate()
+    with db.read() as cur:
+        cur.execute("SELECT MAX(dia) FROM sessoes_leitura")
+        last = cur.fetchone()[0]
+    today = date.fromisoformat(last) if last else date.today()
+
+    modes = [("numpy", True), ("python", False)] if heatmap.HAS_NUMPY else [("python", False)]
+    for name, use_numpy in modes:
+        heatmap.HAS_NUMPY = use_numpy
+        grid, load, render = _measure(db, args.years, today, args.runs)
+        print(f"{name:<7} {grid.weeks} semanas: carregar mediana {statistics.median(load):.1f} ms, "
+              f"pixels (2 métricas) mediana {statistics.median(render):.1f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: conexão nova por chamada (comportamento antigo) x camada Database.
+
+Cria uma biblioteca sintética grande num arquivo temporário e mede as consultas
+de toque mais comuns (is_book_saved, detalhe do livro, detalhe da anotação).
+
+    python benchmarks/bench_connections.py --books 5000 --notes 50000 --calls 2000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interface"))
+
+from database import Database  # noqa: E402
+
+
+SCHEMA = """
+CREATE TABLE livros (
+    id TEXT PRIMARY KEY, nome TEXT NOT NULL, autor TEXT, cover_url TEXT,
+    qtde_paginas INTEGER, status TEXT DEFAULT 'Quero ler', pagina_atual INTEGER DEFAULT 0,
+    nota INTEGER DEFAULT 0, genero_id INTEGER, descricao TEXT
+);
+CREATE TABLE anotacoes (id INTEGER PRIMARY KEY AUTOINCREMENT, livro_id TEXT, texto TEXT);
+"""
+
+QUERIES = (
+    ("is_book_saved", "SELECT 1 FROM livros WHERE id = ? LIMIT 1", "book"),
+    ("hydrate_detail", "SELECT COALESCE(pagina_atual,0), COALESCE(status,'Quero ler'), "
+                       "COALESCE(qtde_paginas,0) FROM livros WHERE id = ?", "book"),
+    ("open_note_detail", "SELECT a.id, a.texto, COALESCE(l.id,''), COALESCE(l.nome,'Sem livro') "
+                         "FROM anotacoes a LEFT JOIN livros l ON l.id = a.livro_id WHERE a.id = ?", "note"),
+)
+
+
+def populate(path, books, notes, seed=42):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO livros (id, nome, autor, qtde_paginas, descricao) VALUES (?, ?, ?, ?, ?)",
+        ((f"b{i}", f"Livro {i}", f"Autor {i % 500}", rnd.randint(80, 900), "x" * 400) for i in range(books)),
+    )
+    conn.executemany(
+        "INSERT INTO anotacoes (livro_id, texto) VALUES (?, ?)",
+        ((f"b{rnd.randrange(books)}", "anotação " * 20) for _ in range(notes)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def bench_connect_per_call(path, sql, params):
+    t0 = time.perf_counter()
+    for p in params:
+        conn = sqlite3.connect(path)
+        cur = conn.cursor()
+        cur.execute(sql, p)
+        cur.fetchone()
+        conn.close()
+    return time.perf_counter() - t0
+
+
+def bench_pooled(db, sql, params):
+    t0 = time.perf_counter()
+    for p in params:
+        with db.read() as cur:
+            cur.execute(sql, p)
+            cur.fetchone()
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--books", type=int, default=5000)
+    ap.add_argument("--notes", type=int, default=50000)
+    ap.add_argument("--calls", type=int, default=2000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "roots.db")
+        populate(path, args.books, args.notes)
+        db = Database(path)
+        rnd = random.Random(7)
+        print(f"{'consulta':<18} {'connect/call (ms)':>18} {'pool (ms)':>10} {'ganho':>7}")
+        for name, sql, kind in QUERIES:
+            if kind == "book":
+                params = [(f"b{rnd.randrange(args.books)}",) for _ in range(args.calls)]
+            else:
+                params = [(rnd.randint(1, args.notes),) for _ in range(args.calls)]
+            old = bench_connect_per_call(path, sql, params) / args.calls * 1000
+            new = bench_pooled(db, sql, params) / args.calls * 1000
+            print(f"{name:<18} {old:>18.4f} {new:>10.4f} {old / new:>6.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark do renderizador headless da imagem de compartilhamento (Pillow).
+
+    python benchmarks/bench_share_image.py --runs 50 --out /tmp/resumo.png
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interface"))
+
+from reading_stats import summarize, week_range_sun_sat  # noqa: E402
+from share_image import render_weekly_summary  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=50)
+    ap.add_argument("--scale", type=float, default=1.0)
+    ap.add_argument("--out", help="grava a última imagem neste caminho (PNG)")
+    args = ap.parse_args()
+
+    start, end = week_range_sun_sat(date(2024, 1, 10))
+    secs = [1800, 0, 3600, 9000, 0, 600, 2400]
+    week = summarize(start, end, {
+        (start.fromordinal(start.toordinal() + i)).isoformat(): s for i, s in enumerate(secs)
+    })
+
+    times = []
+    for _ in range(args.runs):
+        t0 = time.perf_counter()
+        img = render_weekly_summary(week, scale=args.scale)
+        times.append((time.perf_counter() - t0) * 1000)
+    if args.out:
+        img.save(args.out, "PNG")
+
+    print(f"render_weekly_summary x{args.runs} (escala {args.scale}): "
+          f"mediana {statistics.median(times):.1f} ms, mín {min(times):.1f} ms, máx {max(times):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
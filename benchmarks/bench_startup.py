@@ -0,0 +1,58 @@
+"""
+Benchmark de inicialização a frio: tempo até o primeiro frame do app.
+
+Sobe interface/main.py em processos novos com ROOTS_STARTUP_BENCH=1; o app
+imprime uma linha "ROOTS_STARTUP {...}" no primeiro frame e fecha sozinho.
+Precisa de Kivy/KivyMD e de uma janela (ou servidor X virtual).
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+INTERFACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interface")
+MARKER = "ROOTS_STARTUP "
+
+
+def run_once(timeout):
+    env = dict(os.environ, ROOTS_STARTUP_BENCH="1", KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "main.py"], cwd=INTERFACE_DIR, env=env,
+        capture_output=True, text=True, timeout=timeout,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+    for line in proc.stdout.splitlines():
+        if line.startswith(MARKER):
+            result = json.loads(line[len(MARKER):])
+            result["process_ms"] = round(wall_ms, 1)
+            return result
+    raise RuntimeError(f"o app não reportou o primeiro frame (código {proc.returncode}):\n{proc.stderr[-2000:]}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--json", help="grava as medições neste arquivo")
+    args = ap.parse_args()
+
+    runs = [run_once(args.timeout) for _ in range(args.runs)]
+
+    print(f"inicialização x{args.runs} (mediana / mín / máx, ms):")
+    for field in ("import_ms", "build_ms", "first_frame_ms", "process_ms"):
+        values = [r[field] for r in runs]
+        print(f"  {field:<15} {statistics.median(values):8.1f} {min(values):8.1f} {max(values):8.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark do gráfico semanal: reconstruir a árvore de widgets a cada
+atualização (como era) x montar uma vez e só trocar pontos/textos.
+
+Mede o custo de montar/atualizar a árvore na thread da UI (o layout e as
+texturas do frame seguinte ficam de fora). Abre uma janela KivyMD mínima,
+mede e fecha sozinho. Precisa de Kivy, KivyMD e kivy-garden.graph.
+
+    python benchmarks/bench_time_chart.py --runs 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interface"))
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+from kivy.clock import Clock  # noqa: E402
+from kivymd.app import MDApp  # noqa: E402
+from kivymd.uix.boxlayout import MDBoxLayout  # noqa: E402
+
+from reading_stats import summarize, week_range_sun_sat  # noqa: E402
+from time_chart import TimeChart  # noqa: E402
+
+
+def _weeks(n, seed=42):
+    rnd = random.Random(seed)
+    start, end = week_range_sun_sat(date(2024, 1, 10))
+    return [
+        summarize(start, end, {
+            start.fromordinal(start.toordinal() + i).isoformat(): rnd.randint(0, 3 * 3600) for i in range(7)
+        })
+        for _ in range(n)
+    ]
+
+
+def _report(name, times):
+    print(f"{name:<10} x{len(times)}: mediana {statistics.median(times):.3f} ms, "
+          f"p95 {sorted(times)[int(len(times) * 0.95) - 1]:.3f} ms, máx {max(times):.3f} ms")
+
+
+class BenchApp(MDApp):
+    def __init__(self, runs, **kwargs):
+        super().__init__(**kwargs)
+        self.runs = runs
+
+    def build(self):
+        self.theme_cls.theme_style = "Dark"
+        return MDBoxLayout(orientation="vertical")
+
+    def on_start(self):
+        Clock.schedule_once(self._run, 0)
+
+    def _run(self, *_):
+        weeks = _weeks(self.runs)
+
+        rebuild = []
+        for week in weeks:
+            t0 = time.perf_counter()
+            TimeChart(self.root, self.theme_cls.primary_color).update(week)
+            rebuild.append((time.perf_counter() - t0) * 1000)
+
+        chart = TimeChart(self.root, self.theme_cls.primary_color)
+        update = []
+        for week in weeks:
+            t0 = time.perf_counter()
+            chart.update(week)
+            update.append((time.perf_counter() - t0) * 1000)
+
+        _report("rebuild", rebuild)
+        _report("update", update)
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=200)
+    args = ap.parse_args()
+    BenchApp(args.runs).run()
+
+
+if __name__ == "__main__":
+    main()
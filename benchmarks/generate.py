@@ -0,0 +1,141 @@
+"""
+Gerador de dados sintéticos (reprodutível por semente) para o roots.db.
+
+Cria o banco com as migrações do app e preenche livros, anotacoes,
+progresso_diario e sessoes_leitura. Exemplos:
+
+    python benchmarks/generate.py /tmp/roots.db --scale large
+    python benchmarks/generate.py /tmp/roots.db --books 2000 --notes 5000 --sessions 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interface"))
+
+from book_keys import book_key  # noqa: E402
+from database import Database  # noqa: E402
+
+
+SCALES = {
+    "small": {"books": 1_000, "notes": 10_000, "sessions": 50_000},
+    "medium": {"books": 5_000, "notes": 50_000, "sessions": 250_000},
+    "large": {"books": 10_000, "notes": 100_000, "sessions": 1_000_000},
+}
+
+WORDS = (
+    "amor tempo memória casa cidade rio mar noite dia coração leitura página história "
+    "viagem silêncio guerra família livro sombra luz caminho janela inverno verão "
+    "saudade destino palavra sonho cartas jardim estrada"
+).split()
+STATUSES = ("Quero ler", "Lendo", "Concluído")
+BATCH = 5_000
+
+
+def _sentence(rnd, n):
+    return " ".join(rnd.choices(WORDS, k=n))
+
+
+def _batched(rows, conn_write, sql):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            with conn_write() as cur:
+                cur.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        with conn_write() as cur:
+            cur.executemany(sql, batch)
+
+
+def generate(path, books, notes, sessions, years=5, seed=42, end=date(2025, 1, 1)):
+    """Cria/preenche `path`. Mesma semente + mesmos tamanhos = mesmo banco."""
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} já existe; use um caminho novo")
+    rnd = random.Random(seed)
+    db = Database(path)
+    db.migrate()
+    first_day = end - timedelta(days=365 * years)
+    span = (end - first_day).days
+
+    def book_rows():
+        for i in range(books):
+            pages = rnd.randint(80, 900)
+            status = rnd.choice(STATUSES)
+            current = {"Quero ler": 0, "Lendo": rnd.randint(1, pages - 1), "Concluído": pages}[status]
+            title, author = f"{_sentence(rnd, 3).title()} {i}", f"Autor {rnd.randrange(books // 3 + 1)}"
+            yield (
+                f"vol{i:07d}", title, author,
+                f"https://books.google.com/books/content?id=vol{i:07d}&printsec=frontcover&img=1&zoom=1",
+                pages, status, current, rnd.randint(0, 5), _sentence(rnd, 60), book_key(title, author),
+            )
+
+    _batched(book_rows(), db.write, """
+        INSERT INTO livros (id, nome, autor, cover_url, qtde_paginas, status, pagina_atual, nota, descricao,
+                            chave_normalizada)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """)
+
+    def note_rows():
+        for _ in range(notes):
+            text = "\n".join(_sentence(rnd, rnd.randint(8, 40)) for _ in range(rnd.randint(1, 4)))
+            yield (f"vol{rnd.randrange(books):07d}", text)
+
+    _batched(note_rows(), db.write, "INSERT INTO anotacoes (livro_id, texto) VALUES (?, ?)")
+
+    def progress_rows():
+        seen = set()
+        for _ in range(min(notes, books * 30)):
+            key = (f"vol{rnd.randrange(books):07d}", (first_day + timedelta(days=rnd.randrange(span))).isoformat())
+            if key in seen:
+                continue
+            seen.add(key)
+            yield (*key, rnd.randint(1, 60))
+
+    _batched(progress_rows(), db.write,
+             "INSERT INTO progresso_diario (livro_id, data, paginas_lidas) VALUES (?, ?, ?)")
+
+    def session_rows():
+        for _ in range(sessions):
+            day = first_day + timedelta(days=rnd.randrange(span))
+            start = datetime(day.year, day.month, day.day, rnd.randint(6, 23), rnd.randrange(60), rnd.randrange(60))
+            secs = rnd.randint(60, 2 * 3600)
+            book = f"vol{rnd.randrange(books):07d}" if rnd.random() < 0.7 else None
+            yield (book, start.strftime("%Y-%m-%d %H:%M:%S"),
+                   (start + timedelta(seconds=secs)).strftime("%Y-%m-%d %H:%M:%S"), secs, day.isoformat())
+
+    _batched(session_rows(), db.write, """
+        INSERT INTO sessoes_leitura (livro_id, inicio, fim, duracao_seg, dia) VALUES (?, ?, ?, ?, ?)
+    """)
+
+    with db.write() as cur:
+        cur.execute("ANALYZE")
+    db.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path")
+    ap.add_argument("--scale", choices=sorted(SCALES), default="small")
+    ap.add_argument("--books", type=int)
+    ap.add_argument("--notes", type=int)
+    ap.add_argument("--sessions", type=int)
+    ap.add_argument("--years", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    sizes = dict(SCALES[args.scale])
+    for k in sizes:
+        if getattr(args, k) is not None:
+            sizes[k] = getattr(args, k)
+    t0 = time.perf_counter()
+    generate(args.path, years=args.years, seed=args.seed, **sizes)
+    print(f"{args.path}: {sizes} em {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
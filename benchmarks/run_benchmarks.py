@@ -0,0 +1,167 @@
+"""
+Suíte de benchmarks das rotas de dados do app (sem Kivy, sem janela).
+
+Gera (ou reaproveita) um banco sintético e mede as consultas reais de
+interface/queries.py e reading_stats.py por trás de load_saved_books,
+load_notes, render_time_chart, open_note_detail e update_book_progress.
+O resultado vai para um JSON, para comparar entre versões:
+
+    python benchmarks/run_benchmarks.py --scale medium --out bench.json
+    python benchmarks/run_benchmarks.py --db /tmp/roots.db --repeat 50
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "interface"))
+
+from generate import SCALES, generate  # noqa: E402
+from database import Database  # noqa: E402
+from reading_stats import ReadingStats, week_range_sun_sat  # noqa: E402
+import queries  # noqa: E402
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def run_suite(db, repeat, seed=7):
+    rnd = random.Random(seed)
+    with db.read() as cur:
+        book_ids = [r[0] for r in cur.execute("SELECT id FROM livros")]
+        note_ids = [r[0] for r in cur.execute("SELECT id FROM anotacoes")]
+        last_day = cur.execute("SELECT MAX(dia) FROM sessoes_leitura").fetchone()[0]
+    today = date.fromisoformat(last_day) if last_day else date.today()
+    week = week_range_sun_sat(today)
+    stats = ReadingStats(db)
+    results = {}
+
+    results["load_saved_books.fetch_library"] = timed(lambda: queries.fetch_library(db), max(3, repeat // 10))
+
+    results["load_notes.first_page"] = timed(lambda: queries.fetch_notes_page(db), repeat)
+
+    def deep_page():
+        # keyset: página a partir de um id aleatório, como no scroll
+        queries.fetch_notes_page(db, before_id=rnd.choice(note_ids) if note_ids else None)
+    results["load_notes.keyset_page"] = timed(deep_page, repeat)
+
+    results["load_notes.filtered_page"] = timed(
+        lambda: queries.fetch_notes_page(db, book_id=rnd.choice(book_ids)), repeat
+    )
+
+    def chart_cold():
+        stats.clear()
+        stats.summary(*week)
+    results["render_time_chart.summary_cold"] = timed(chart_cold, repeat)
+    results["render_time_chart.summary_memoized"] = timed(lambda: stats.summary(*week), repeat)
+
+    def chart_raw_sessions():
+        # referência: a agregação antiga sobre sessoes_leitura
+        with db.read() as cur:
+            cur.execute("""
+                SELECT date(COALESCE(dia, inicio)), SUM(COALESCE(duracao_seg, 0))
+                FROM sessoes_leitura
+                WHERE date(COALESCE(dia, inicio)) BETWEEN ? AND ?
+                GROUP BY date(COALESCE(dia, inicio))
+            """, (week[0].isoformat(), week[1].isoformat()))
+            cur.fetchall()
+    results["render_time_chart.legacy_full_scan"] = timed(chart_raw_sessions, max(3, repeat // 10))
+
+    results["open_note_detail.fetch_note"] = timed(
+        lambda: queries.fetch_note(db, rnd.choice(note_ids)), repeat
+    )
+
+    def progress():
+        book = rnd.choice(book_ids)
+        day = (today - timedelta(days=rnd.randrange(30))).isoformat()
+        queries.save_book_progress(db, book, rnd.randint(1, 300), "Lendo", rnd.randint(1, 20), day)
+    results["update_book_progress.save"] = timed(progress, repeat)
+
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db", help="banco existente (cópia de trabalho; será alterado pelas gravações)")
+    ap.add_argument("--scale", choices=sorted(SCALES), default="small")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=30)
+    ap.add_argument("--out", help="arquivo JSON de saída (padrão: stdout)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        gen_seconds = None
+        if not path:
+            path = os.path.join(tmp, "roots.db")
+            t0 = time.perf_counter()
+            generate(path, seed=args.seed, **SCALES[args.scale])
+            gen_seconds = round(time.perf_counter() - t0, 2)
+
+        db = Database(path)
+        db.migrate()
+        try:
+            results = run_suite(db, args.repeat)
+            with db.read() as cur:
+                counts = {t: cur.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                          for t in ("livros", "anotacoes", "progresso_diario", "sessoes_leitura")}
+        finally:
+            db.close()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "scale": None if args.db else args.scale,
+            "seed": args.seed,
+            "rows": counts,
+            "generate_s": gen_seconds,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        for name, r in results.items():
+            print(f"{name:<40} mediana {r['median_ms']:>9.3f} ms   p95 {r['p95_ms']:>9.3f} ms")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,14 @@
-import sqlite3
+import os.path
+import sys
 
-conexao = sqlite3.connect("db/roots.db")
-cursor = conexao.cursor()
+# O esquema e as migrações ficam em interface/database.py (as mesmas que o app
+# aplica ao abrir). Este script só aplica as pendentes em db/roots.db, então
+# pode ser executado quantas vezes quiser.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, "..", "interface"))
 
-# Tabela de livros 
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS livros (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    nome TEXT NOT NULL,
-    autor TEXT,
-    qtde_paginas INTEGER,
-    status TEXT CHECK(status IN ('Lendo', 'Concluído', 'Quero ler')),
-    pagina_atual INTEGER,
-    nota INTEGER,
-    genero_id INTEGER,
-    FOREIGN KEY (genero_id) REFERENCES generos(id)
-)
-""")
+from database import Database  # noqa: E402
 
-# Tabela de gêneros
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS generos (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    tipo TEXT NOT NULL UNIQUE
-)
-""")
-
-# Tabela para o progresso de leitura diário 
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS progresso_diario (
-    livro_id INTEGER,
-    data TEXT,
-    paginas_lidas INTEGER,
-    FOREIGN KEY (livro_id) REFERENCES livros(id)
-)
-""")
-
-# Tabelade anotações
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS anotacoes (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    livro_id INTEGER,
-    texto TEXT,
-    FOREIGN KEY (livro_id) REFERENCES liros(id)
-)
-""")
-
-cursor.execute("""
-ALTER TABLE livros ADD COLUMN cover_url TEXT""")
-
-conexao.commit()
\ No newline at end of file
+db = Database(os.path.join(BASE_DIR, "roots.db"))
+print("Esquema na versão", db.migrate())
+db.close()
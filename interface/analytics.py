@@ -0,0 +1,113 @@
+"""
+Quando e o que se lê: consultas sobre o cubo leitura_cubo (sem Kivy).
+
+O cubo guarda segundos e nº de sessões por (livro, dia da semana, hora de
+início) e é mantido pelos triggers da migração 10 na mesma transação que
+grava a sessão, junto com dois totais: leitura_hora (7 x 24 linhas) e
+leitura_livro (um por livro, indexado por segundos). As consultas daqui
+leem um número fixo de linhas (ou o começo de um índice), não importa
+quantas sessões existam.
+
+    analytics.by_hour(db)           # [segundos] das 0h às 23h
+    analytics.top_books(db, 5)      # livros com mais tempo de leitura
+    analytics.highlights(db)        # resumo usado na tela de gráficos
+
+top_book_between() usa o resumo diário por livro (leitura_diaria_livro,
+migração 5) para um intervalo de datas, como a semana do gráfico.
+"""
+from dataclasses import dataclass
+
+from database import rebuild_cubo
+from reading_stats import WEEK_DAYS
+import rollups
+
+
+@dataclass(frozen=True)
+class Highlights:
+    weekday: str          # dia da semana com mais leitura ("" se não houver sessões)
+    hour: int             # hora de início com mais leitura (-1 se não houver)
+    book_title: str       # livro com mais tempo ("" se não houver)
+    book_minutes: int
+    total_minutes: int
+    sessions: int
+
+
+def by_hour(db):
+    """Segundos lidos por hora de início (lista de 24, índice = hora)."""
+    hours = [0] * 24
+    with db.read() as cur:
+        cur.execute("SELECT hora, SUM(segundos) FROM leitura_hora WHERE hora >= 0 GROUP BY hora")
+        for hour, seconds in cur.fetchall():
+            hours[hour] = seconds
+    return hours
+
+
+def by_weekday(db):
+    """Segundos lidos por dia da semana (lista de 7, 0 = domingo, como WEEK_DAYS)."""
+    days = [0] * 7
+    with db.read() as cur:
+        cur.execute("SELECT dia_semana, SUM(segundos) FROM leitura_hora GROUP BY dia_semana")
+        for weekday, seconds in cur.fetchall():
+            days[weekday] = seconds
+    return days
+
+
+def weekday_hour_matrix(db, book_id=None):
+    """matrix[dia_semana][hora] em segundos; book_id limita a um livro ('' = sem livro)."""
+    matrix = [[0] * 24 for _ in range(7)]
+    with db.read() as cur:
+        if book_id is None:
+            cur.execute("SELECT dia_semana, hora, segundos FROM leitura_hora WHERE hora >= 0")
+        else:
+            cur.execute("SELECT dia_semana, hora, segundos FROM leitura_cubo WHERE livro_id = ? AND hora >= 0",
+                        (book_id,))
+        for weekday, hour, seconds in cur.fetchall():
+            matrix[weekday][hour] = seconds
+    return matrix
+
+
+def top_books(db, limit=5):
+    """[(livro_id, nome, segundos, sessoes)] dos livros com mais tempo (sessões sem livro ficam de fora)."""
+    with db.read() as cur:
+        cur.execute("""
+            SELECT t.livro_id, l.nome, t.segundos, t.sessoes
+            FROM leitura_livro t JOIN livros l ON l.id = t.livro_id
+            ORDER BY t.segundos DESC
+            LIMIT ?
+        """, (limit,))
+        return cur.fetchall()
+
+
+def top_book_between(db, start, end):
+    """(nome, segundos) do livro com mais tempo entre start e end, ou None."""
+    seconds = rollups.seconds_by_book(db, start, end)
+    seconds.pop("", None)
+    if not seconds:
+        return None
+    book_id = max(seconds, key=seconds.get)
+    with db.read() as cur:
+        cur.execute("SELECT nome FROM livros WHERE id = ?", (book_id,))
+        row = cur.fetchone()
+    return (row[0], seconds[book_id]) if row else None
+
+
+def highlights(db) -> Highlights:
+    with db.read() as cur:
+        cur.execute("SELECT COALESCE(SUM(segundos), 0), COALESCE(SUM(sessoes), 0) FROM leitura_hora")
+        total, sessions = cur.fetchone()
+    if not sessions:
+        return Highlights("", -1, "", 0, 0, 0)
+
+    days = by_weekday(db)
+    hours = by_hour(db)
+    books = top_books(db, 1)
+    weekday = WEEK_DAYS[days.index(max(days))]
+    hour = hours.index(max(hours)) if any(hours) else -1
+    title, book_seconds = (books[0][1], books[0][2]) if books else ("", 0)
+    return Highlights(weekday, hour, title, book_seconds // 60, total // 60, sessions)
+
+
+def rebuild(db):
+    """Recalcula o cubo e os totais a partir de sessoes_leitura. Retorna o nº de células do cubo."""
+    with db.write() as cur:
+        return rebuild_cubo(cur)
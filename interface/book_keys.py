@@ -0,0 +1,23 @@
+"""
+Chave de deduplicação dos livros (título + autores normalizados).
+
+Gravada em livros.chave_normalizada (índice único, migração 006). Se a
+regra mudar, os livros existentes precisam de uma migração nova que
+recalcule a coluna.
+"""
+import re
+
+_PUNCT = re.compile(r"[\s\-\_\.\,\:\;\!\?\(\)\[\]\{\}]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(s: str) -> str:
+    s = (s or "").lower()
+    s = _PUNCT.sub(" ", s)
+    s = _SPACES.sub(" ", s)
+    # strip no fim: pontuação nas pontas não pode sobrar como espaço
+    return s.strip()
+
+
+def book_key(title: str, authors: str) -> str:
+    return f"{normalize_text(title)}|{normalize_text(authors)}"
@@ -0,0 +1,310 @@
+import json
+import time
+from urllib.parse import quote_plus
+
+import instrumentation
+
+
+PAGE_SIZE = 40        # máximo que a API aceita em maxResults
+MAX_PAGES = 10        # depois disso a relevância do Google já não ajuda
+PREFETCH_PAGES = 1    # páginas baixadas à frente da que está na tela
+
+GOOGLE_BOOKS_URL = (
+    "https://www.googleapis.com/books/v1/volumes"
+    "?q={query}"
+    "&printType=books"
+    "&orderBy=relevance"
+    "&startIndex={start}"
+    f"&maxResults={PAGE_SIZE}"
+    "&langRestrict=pt"
+)
+
+
+# ===================== CACHE (SQLite) =====================
+def _run_inline(fn, *args, on_done=None, on_error=None):
+    """Executor padrão: roda na hora, na thread de quem chamou (scripts, benchmarks)."""
+    try:
+        result = fn(*args)
+    except Exception as e:
+        if on_error:
+            on_error(e)
+        return
+    if on_done:
+        on_done(result)
+
+
+class SearchCache:
+    """
+    Respostas já compactadas, por chave normalizada, válidas por `ttl` segundos.
+
+    get()/put() não tocam no SQLite na thread de quem chama: o trabalho vai
+    para `run(fn, *args, on_done=..., on_error=...)` (no app, RootsApp.run_db,
+    que roda na thread do banco e devolve o resultado pelo Clock).
+    """
+
+    def __init__(self, db, ttl=6 * 3600, run=None):
+        self.db = db
+        self.ttl = ttl
+        self.run = run or _run_inline
+
+    def get(self, key, on_done):
+        """on_done(resposta ou None). Erro de leitura conta como cache vazio."""
+        def _failed(e):
+            print("[Busca] Falha ao ler cache:", e)
+            on_done(None)
+
+        self.run(self._read, key, on_done=on_done, on_error=_failed)
+
+    def put(self, key, result):
+        self.run(self._write, key, result,
+                 on_error=lambda e: print("[Busca] Falha ao gravar cache:", e))
+
+    def _read(self, key):
+        with self.db.read() as cur:
+            cur.execute(
+                "SELECT resposta FROM cache_busca WHERE chave = ? AND criado_em >= ?",
+                (key, time.time() - self.ttl),
+            )
+            row = cur.fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, key, result):
+        with self.db.write() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO cache_busca (chave, resposta, criado_em) VALUES (?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+
+    def purge(self):
+        with self.db.write() as cur:
+            cur.execute("DELETE FROM cache_busca WHERE criado_em < ?", (time.time() - self.ttl,))
+            return cur.rowcount
+
+
+# ===================== BUSCA =====================
+class BookSearch:
+    """
+    Camada de busca do Google Books.
+
+    - Consultas iguais depois de normalizadas saem do cache (SQLite, com TTL),
+      uma entrada por página.
+    - Um pedido idêntico ao que já está em voo não dispara outro download.
+    - Uma busca nova (página 0) cancela a anterior e todas as páginas dela;
+      respostas atrasadas vão para o cache mas nunca chegam à tela (cada
+      busca recebe um número de geração, que as páginas seguintes herdam).
+
+    `request_factory(url, on_success, on_error)` cria o pedido HTTP (no app,
+    um UrlRequest do Kivy) e deve devolver um objeto com `cancel()`. `run`
+    é o executor do cache (ver SearchCache): a busca segue no retorno dele.
+    """
+
+    def __init__(self, db, normalize, request_factory, ttl=6 * 3600, run=None):
+        self.cache = SearchCache(db, ttl=ttl, run=run)
+        self.normalize = normalize
+        self.request_factory = request_factory
+        self._generation = 0
+        self._inflight = {}   # chave -> {"request": ..., "waiter": (geração, on_result, on_error)}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    def cache_key(self, query, page=0):
+        return f"v2|{self.normalize(query)}|{page}"
+
+    def search(self, query, on_result, on_error, page=0):
+        """
+        Entrega on_result(resultado) só se esta ainda for a busca mais recente.
+        page 0 começa uma busca nova; page > 0 continua a busca atual.
+        """
+        if page == 0:
+            self._generation += 1
+            # as páginas da busca anterior não interessam mais; um pedido igual
+            # a este que já esteja em voo fica (vira o download desta busca)
+            self._cancel_all(except_key=self.cache_key(query, 0))
+        generation = self._generation
+        key = self.cache_key(query, page)
+        started = time.perf_counter()
+
+        def _cached(cached):
+            instrumentation.record("search.cache_lookup", (time.perf_counter() - started) * 1000)
+            if generation != self._generation:
+                return  # outra busca começou enquanto o cache era lido
+            if cached is not None:
+                self.hits += 1
+                on_result(cached)
+                return
+            self.misses += 1
+            self._fetch(query, key, page, (generation, on_result, on_error))
+
+        self.cache.get(key, _cached)
+
+    def _fetch(self, query, key, page, waiter):
+        pending = self._inflight.get(key)
+        if pending is not None:
+            # mesma consulta já em voo: só passa a responder para esta chamada
+            self.coalesced += 1
+            pending["waiter"] = waiter
+            return
+
+        url = GOOGLE_BOOKS_URL.format(query=quote_plus(query.strip()), start=page * PAGE_SIZE)
+        entry = {"waiter": waiter, "started": time.perf_counter()}
+        self._inflight[key] = entry
+        entry["request"] = self.request_factory(
+            url,
+            lambda _req, result: self._on_success(key, entry, result),
+            lambda _req, error: self._on_error(key, entry, error),
+        )
+
+    # ------------------ respostas ------------------
+    def _finish(self, key, entry):
+        instrumentation.record("net.search", (time.perf_counter() - entry["started"]) * 1000)
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+        generation, on_result, on_error = entry["waiter"]
+        return generation == self._generation, on_result, on_error
+
+    def _on_success(self, key, entry, result):
+        compact = self.compact(result)
+        self.cache.put(key, compact)
+        current, on_result, _ = self._finish(key, entry)
+        if current and not entry.get("cancelled"):
+            on_result(compact)
+
+    def _on_error(self, key, entry, error):
+        current, _, on_error = self._finish(key, entry)
+        if current and not entry.get("cancelled"):
+            on_error(error)
+
+    def _cancel_all(self, except_key):
+        for key in [k for k in self._inflight if k != except_key]:
+            entry = self._inflight.pop(key)
+            entry["cancelled"] = True
+            cancel = getattr(entry.get("request"), "cancel", None)
+            if cancel:
+                try:
+                    cancel()
+                except Exception:
+                    pass
+            self.cancelled += 1
+
+    # ------------------ utilidades ------------------
+    @staticmethod
+    def compact(result):
+        """Guarda só os campos que a tela usa (a resposta crua tem até PAGE_SIZE volumes completos)."""
+        items = []
+        for item in (result or {}).get("items") or []:
+            info = item.get("volumeInfo", {}) or {}
+            kept = {k: info[k] for k in ("title", "authors", "pageCount", "description") if info.get(k)}
+            thumb = (info.get("imageLinks", {}) or {}).get("thumbnail")
+            if thumb:
+                kept["imageLinks"] = {"thumbnail": thumb}
+            items.append({"id": item.get("id", ""), "volumeInfo": kept})
+        return {"items": items, "totalItems": (result or {}).get("totalItems", 0)}
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+
+# ===================== PAGINAÇÃO =====================
+class SearchPager:
+    """
+    As páginas de uma busca, para rolagem infinita.
+
+    start() pede a página 0; more() pede a próxima quando a lista chega ao
+    fim. Cada página entregue dispara o download das PREFETCH_PAGES
+    seguintes, então normalmente more() já encontra a página pronta. No
+    máximo `max_inflight` downloads ficam em voo (a página que a tela está
+    esperando sempre vai). on_page(resultado, página, última) recebe as
+    páginas em ordem, uma de cada vez.
+    """
+
+    def __init__(self, search, query, on_page, on_error,
+                 prefetch=PREFETCH_PAGES, max_inflight=2, max_pages=MAX_PAGES):
+        self.search = search
+        self.query = query
+        self.on_page = on_page
+        self.on_error = on_error
+        self.prefetch = prefetch
+        self.max_inflight = max_inflight
+        self.max_pages = max_pages
+        self._ready = {}        # página -> resultado baixado e ainda não entregue
+        self._loading = set()
+        self._next = 0          # próxima página a entregar
+        self.waiting = False    # a tela pediu self._next e ela ainda não chegou
+        self.exhausted = False
+        self.cancelled = False
+
+    def start(self):
+        self.waiting = True
+        self._load(0)
+
+    def more(self) -> bool:
+        """Pede a próxima página. False se não há mais ou se ela já foi pedida."""
+        if self.exhausted or self.cancelled or self.waiting:
+            return False
+        self.waiting = True
+        if self._next in self._ready:
+            self._deliver()
+        else:
+            self._load(self._next)
+        return True
+
+    def cancel(self):
+        self.cancelled = True
+        self._ready.clear()
+
+    # ------------------ interno ------------------
+    def _load(self, page):
+        if page in self._loading or page in self._ready or page >= self.max_pages:
+            return
+        self._loading.add(page)
+        self.search.search(
+            self.query,
+            lambda result: self._loaded(page, result),
+            lambda error: self._failed(page, error),
+            page=page,
+        )
+
+    def _loaded(self, page, result):
+        self._loading.discard(page)
+        if self.cancelled:
+            return
+        self._ready[page] = result
+        if self.waiting and page == self._next:
+            self._deliver()
+
+    def _failed(self, page, error):
+        self._loading.discard(page)
+        if self.cancelled:
+            return
+        # Falha de pré-carga fica quieta: more() tenta de novo
+        if self.waiting and page == self._next:
+            self.waiting = False
+            self.on_error(error)
+
+    def _deliver(self):
+        page = self._next
+        result = self._ready.pop(page)
+        self._next += 1
+        self.waiting = False
+        items = len(result.get("items") or [])
+        # O Google devolve páginas curtas no meio da busca (filtra volumes
+        # depois de paginar): só página vazia, totalItems ou o limite encerram
+        last = (items == 0
+                or self._next * PAGE_SIZE >= (result.get("totalItems") or 0)
+                or self._next >= self.max_pages)
+        self.exhausted = last
+        self.on_page(result, page, last)
+        if not last:
+            for ahead in range(self._next, self._next + self.prefetch):
+                if len(self._loading) >= self.max_inflight:
+                    break
+                self._load(ahead)
@@ -0,0 +1,114 @@
+"""
+Calendário de leitura (mapa de calor) na tela de gráficos.
+
+O histórico inteiro (heatmap.render_rgba) vira UMA textura; o widget
+desenha um retângulo com a região de `VISIBLE_WEEKS` semanas dessa
+textura. Arrastar o slider só troca a região (get_region não copia
+pixels), então dá para percorrer cinco anos sem recriar nada.
+"""
+from datetime import timedelta
+
+from kivy.graphics import Color, Rectangle
+from kivy.graphics.texture import Texture
+from kivy.metrics import dp
+from kivy.uix.widget import Widget
+from kivymd.uix.boxlayout import MDBoxLayout
+from kivymd.uix.button import MDFlatButton
+from kivymd.uix.label import MDLabel
+from kivymd.uix.slider import MDSlider
+
+import heatmap
+
+VISIBLE_WEEKS = 53
+METRICS = (("minutes", "Minutos"), ("pages", "Páginas"))
+
+
+class _HeatmapView(Widget):
+    """Um retângulo texturizado; a altura acompanha a largura (células quadradas)."""
+
+    def __init__(self, **kwargs):
+        super().__init__(size_hint_y=None, **kwargs)
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self.rect = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._layout, width=self._layout)
+
+    def _layout(self, *_):
+        self.height = self.width * 7 / VISIBLE_WEEKS
+        self.rect.pos = self.pos
+        self.rect.size = (self.width, self.height)
+
+
+class CalendarChart:
+    """Monta o calendário dentro de `box` uma vez; update() troca só as texturas."""
+
+    def __init__(self, box):
+        self.box = box
+        box.clear_widgets()
+        self.grid = None
+        self.metric = "minutes"
+        self._textures = {}
+
+        box.add_widget(MDLabel(text="Histórico de leitura", halign="center",
+                               size_hint_y=None, height=dp(24), bold=True))
+
+        buttons = MDBoxLayout(adaptive_size=True, pos_hint={"center_x": .5}, spacing=dp(8))
+        self._buttons = {}
+        for metric, label in METRICS:
+            button = MDFlatButton(text=label, on_release=lambda _b, m=metric: self.set_metric(m))
+            self._buttons[metric] = button
+            buttons.add_widget(button)
+        box.add_widget(buttons)
+
+        self.view = _HeatmapView()
+        box.add_widget(self.view)
+
+        self.slider = MDSlider(min=0, max=0, step=1, value=0, hint=False,
+                               size_hint_y=None, height=dp(36))
+        self.slider.bind(value=lambda *_: self._show_window())
+        box.add_widget(self.slider)
+
+        self.range_label = MDLabel(halign="center", size_hint_y=None, height=dp(40),
+                                   theme_text_color="Secondary", markup=True)
+        box.add_widget(self.range_label)
+
+    def update(self, grid, images):
+        """grid = heatmap.CalendarGrid; images = {métrica: (rgba, largura, altura)}."""
+        at_end = self.grid is None or self.slider.value >= self.slider.max
+        self.grid = grid
+        for metric, (pixels, width, height) in images.items():
+            texture = self._textures.get(metric)
+            if texture is None or texture.size != (width, height):
+                texture = Texture.create(size=(width, height), colorfmt="rgba")
+                texture.mag_filter = "nearest"
+                texture.min_filter = "nearest"
+                self._textures[metric] = texture
+            texture.blit_buffer(pixels, colorfmt="rgba", bufferfmt="ubyte")
+
+        last = max(0, grid.weeks - VISIBLE_WEEKS)
+        self.slider.max = last
+        if at_end:
+            self.slider.value = last   # abre (e continua) no ano mais recente
+        self._show_window()
+
+    def set_metric(self, metric):
+        self.metric = metric
+        self._show_window()
+
+    def _show_window(self):
+        grid = self.grid
+        texture = self._textures.get(self.metric)
+        if grid is None or texture is None:
+            return
+        first = int(self.slider.value)
+        weeks = min(VISIBLE_WEEKS, grid.weeks - first)
+        self.view.rect.texture = texture.get_region(first * heatmap.CELL, 0,
+                                                    weeks * heatmap.CELL, texture.height)
+
+        for metric, button in self._buttons.items():
+            button.theme_text_color = "Primary" if metric == self.metric else "Hint"
+        start = grid.week_start(first)
+        end = min(grid.week_start(first + weeks) - timedelta(days=1), grid.end)
+        minutes, pages = grid.totals(first, first + weeks - 1)
+        self.range_label.text = (f"{start:%d/%m/%Y} — {end:%d/%m/%Y}\n"
+                                 f"[b]{minutes}[/b] min · [b]{pages}[/b] páginas")
@@ -0,0 +1,169 @@
+import hashlib
+import io
+import os
+import threading
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import instrumentation
+
+
+# ===================== CACHE DE CAPAS =====================
+class CoverCache:
+    """
+    Cache em disco das capas, já reduzidas ao tamanho em que aparecem no app.
+
+    - Nome do arquivo = sha1 da URL normalizada (http/https e o "edge=curl"
+      do Google Books apontam para a mesma imagem).
+    - Orçamento em bytes com despejo LRU; o mtime do arquivo guarda o último
+      uso, então a ordem sobrevive entre execuções.
+    - get() nunca toca a rede; fetch() baixa/reduz/grava numa thread própria
+      e junta pedidos repetidos da mesma capa num único download.
+    """
+
+    def __init__(self, root_dir, max_size=(220, 320), budget_bytes=40 * 1024 * 1024, workers=3):
+        self.root_dir = root_dir
+        self.max_size = (int(max_size[0]), int(max_size[1]))
+        self.budget_bytes = int(budget_bytes)
+        os.makedirs(root_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index = OrderedDict()   # chave -> bytes (mais antigo primeiro)
+        self._total = 0
+        self._pending = {}            # chave -> Future em andamento
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="covers")
+        self._scan()
+
+    # ------------------ CHAVES ------------------
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        url = (url or "").strip()
+        if url.startswith("http://"):
+            url = "https://" + url[len("http://"):]
+        return url.replace("&edge=curl", "")
+
+    def key_for(self, url: str) -> str:
+        return hashlib.sha1(self.normalize_url(url).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, f"{key}.jpg")
+
+    # ------------------ ÍNDICE / LRU ------------------
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            if name.endswith(".tmp"):
+                # sobra de uma gravação interrompida
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".jpg"):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name[:-4], st.st_size))
+        entries.sort()
+        with self._lock:
+            for _mtime, key, size in entries:
+                self._index[key] = size
+                self._total += size
+            self._evict_locked()
+
+    def _evict_locked(self):
+        while self._total > self.budget_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    # ------------------ API ------------------
+    def get(self, url: str):
+        """Caminho local da capa se já estiver no cache, senão None (sem rede)."""
+        if not url:
+            return None
+        key = self.key_for(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            # apagada por fora: esquece a entrada
+            with self._lock:
+                size = self._index.pop(key, 0)
+                self._total -= size
+            return None
+        return path
+
+    def fetch(self, url: str) -> Future:
+        """Future com o caminho local da capa (baixa e reduz só se preciso)."""
+        cached = self.get(url)
+        if cached or not url:
+            fut = Future()
+            fut.set_result(cached)
+            return fut
+
+        key = self.key_for(url)
+        with self._lock:
+            fut = self._pending.get(key)
+            if fut is not None:
+                return fut
+            fut = self._pool.submit(self._download, key, self.normalize_url(url))
+            self._pending[key] = fut
+        # fora do lock: se já terminou, o callback roda aqui mesmo
+        fut.add_done_callback(lambda _f, k=key: self._forget_pending(k))
+        return fut
+
+    def _forget_pending(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _download(self, key, url):
+        req = urllib.request.Request(url, headers={"User-Agent": "Roots/1.0"})
+        with instrumentation.timed("net.cover"), urllib.request.urlopen(req, timeout=15) as resp:
+            raw = resp.read()
+
+        from PIL import Image   # só na primeira capa que precisa ser baixada
+
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with Image.open(io.BytesIO(raw)) as img:
+            img = img.convert("RGB")
+            img.thumbnail(self.max_size, Image.LANCZOS)
+            img.save(tmp, "JPEG", quality=85, optimize=True)
+        os.replace(tmp, path)
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._evict_locked()
+        return path
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._index)
+            self._index.clear()
+            self._total = 0
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,814 @@
+import os.path
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import instrumentation
+from book_keys import book_key
+
+
+# ===================== CONEXÕES =====================
+# Uma única conexão de escrita (serializada por lock) + um pool pequeno de
+# conexões de leitura. Em WAL, leitores não bloqueiam o escritor e vice-versa.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",        # ~8 MB de page cache por conexão
+    "PRAGMA mmap_size = 67108864",      # 64 MB mapeados em memória
+)
+BUSY_TIMEOUT_MS = 5000
+
+
+# ===================== MIGRAÇÕES =====================
+# Cada migração roda uma única vez, em ordem, dentro da sua própria transação.
+# A versão aplicada fica em PRAGMA user_version (0 = banco novo/legado).
+# NUNCA altere uma migração já publicada: acrescente uma nova no fim da lista.
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _m001_schema_base(conn):
+    """Esquema original do app (idempotente também para bancos antigos)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS livros (
+            id TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            autor TEXT,
+            cover_url TEXT,
+            qtde_paginas INTEGER,
+            status TEXT CHECK(status IN ('Lendo', 'Concluído', 'Quero ler')) DEFAULT 'Quero ler',
+            pagina_atual INTEGER DEFAULT 0,
+            nota INTEGER DEFAULT 0,
+            genero_id INTEGER,
+            descricao TEXT
+        )
+    """)
+    # Bancos criados pelo antigo db/database.py não tinham essas colunas
+    cols = _columns(conn, "livros")
+    if "cover_url" not in cols:
+        conn.execute("ALTER TABLE livros ADD COLUMN cover_url TEXT")
+    if "descricao" not in cols:
+        conn.execute("ALTER TABLE livros ADD COLUMN descricao TEXT")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS generos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo TEXT NOT NULL UNIQUE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS progresso_diario (
+            livro_id TEXT,
+            data TEXT,
+            paginas_lidas INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS anotacoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            livro_id TEXT,
+            texto TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sessoes_leitura (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            livro_id TEXT,
+            inicio TEXT NOT NULL,
+            fim TEXT NOT NULL,
+            duracao_seg INTEGER NOT NULL,
+            dia TEXT NOT NULL
+        )
+    """)
+
+
+def _m002_chaves_e_indices(conn):
+    """
+    Recria as tabelas filhas com FOREIGN KEY ... ON DELETE, um UNIQUE
+    (livro_id, data) no progresso diário e índices para gráfico/anotações.
+    """
+    # --- progresso_diario: uma linha por (livro, dia); duplicadas são somadas
+    conn.execute("""
+        CREATE TABLE progresso_diario_novo (
+            livro_id TEXT NOT NULL REFERENCES livros(id) ON DELETE CASCADE,
+            data TEXT NOT NULL,
+            paginas_lidas INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (livro_id, data)
+        )
+    """)
+    # Linhas sem livro ou com data que o SQLite não entende não têm para onde ir;
+    # ficam de fora, mas contadas no log
+    orphans, bad_dates = conn.execute("""
+        SELECT COALESCE(SUM(COALESCE(livro_id NOT IN (SELECT id FROM livros), 1)), 0),
+               COALESCE(SUM(livro_id IN (SELECT id FROM livros) AND date(data) IS NULL), 0)
+        FROM progresso_diario
+    """).fetchone()
+    if orphans or bad_dates:
+        print(f"[DB] Migração 2: {orphans + bad_dates} linha(s) de progresso descartada(s) "
+              f"({orphans} sem livro, {bad_dates} com data inválida)")
+    conn.execute("""
+        INSERT INTO progresso_diario_novo (livro_id, data, paginas_lidas)
+        SELECT livro_id, date(data), SUM(COALESCE(paginas_lidas, 0))
+        FROM progresso_diario
+        WHERE livro_id IN (SELECT id FROM livros) AND date(data) IS NOT NULL
+        GROUP BY livro_id, date(data)
+    """)
+    conn.execute("DROP TABLE progresso_diario")
+    conn.execute("ALTER TABLE progresso_diario_novo RENAME TO progresso_diario")
+    conn.execute("CREATE INDEX idx_progresso_data ON progresso_diario(data)")
+
+    # --- anotacoes: apagadas junto com o livro; órfãs viram "Sem livro"
+    conn.execute("""
+        CREATE TABLE anotacoes_novo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            livro_id TEXT REFERENCES livros(id) ON DELETE CASCADE,
+            texto TEXT
+        )
+    """)
+    conn.execute("""
+        INSERT INTO anotacoes_novo (id, livro_id, texto)
+        SELECT id,
+               CASE WHEN livro_id IN (SELECT id FROM livros) THEN livro_id END,
+               texto
+        FROM anotacoes
+    """)
+    conn.execute("DROP TABLE anotacoes")
+    conn.execute("ALTER TABLE anotacoes_novo RENAME TO anotacoes")
+    conn.execute("CREATE INDEX idx_anotacoes_livro ON anotacoes(livro_id, id)")
+
+    # --- sessoes_leitura: sessão sem livro usa NULL (antes era ''); dia normalizado
+    conn.execute("""
+        CREATE TABLE sessoes_leitura_novo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            livro_id TEXT REFERENCES livros(id) ON DELETE SET NULL,
+            inicio TEXT NOT NULL,
+            fim TEXT NOT NULL,
+            duracao_seg INTEGER NOT NULL,
+            dia TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        INSERT INTO sessoes_leitura_novo (id, livro_id, inicio, fim, duracao_seg, dia)
+        SELECT id,
+               CASE WHEN livro_id IN (SELECT id FROM livros) THEN livro_id END,
+               inicio, fim, COALESCE(duracao_seg, 0),
+               COALESCE(date(dia), date(inicio), dia)
+        FROM sessoes_leitura
+    """)
+    conn.execute("DROP TABLE sessoes_leitura")
+    conn.execute("ALTER TABLE sessoes_leitura_novo RENAME TO sessoes_leitura")
+    conn.execute("CREATE INDEX idx_sessoes_dia ON sessoes_leitura(dia)")
+    conn.execute("CREATE INDEX idx_sessoes_livro ON sessoes_leitura(livro_id)")
+
+
+def _m003_cache_busca(conn):
+    """Respostas da API do Google Books por consulta normalizada (com TTL)."""
+    conn.execute("""
+        CREATE TABLE cache_busca (
+            chave TEXT PRIMARY KEY,
+            resposta TEXT NOT NULL,
+            criado_em REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_cache_busca_criado ON cache_busca(criado_em)")
+
+
+def _m004_busca_textual(conn):
+    """
+    Índices FTS5 para a busca offline, mantidos por triggers.
+
+    - anotacoes_fts é "external content" (o texto fica só em anotacoes; o id
+      é INTEGER PRIMARY KEY, então o rowid é estável).
+    - livros_fts guarda o próprio conteúdo e o id do livro: o rowid de
+      livros (PK TEXT) pode mudar num VACUUM e não serve de ligação.
+    """
+    conn.execute("""
+        CREATE VIRTUAL TABLE livros_fts USING fts5(
+            livro_id UNINDEXED, nome, autor, descricao,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER livros_fts_ai AFTER INSERT ON livros BEGIN
+            INSERT INTO livros_fts (livro_id, nome, autor, descricao)
+            VALUES (new.id, new.nome, new.autor, new.descricao);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER livros_fts_ad AFTER DELETE ON livros BEGIN
+            DELETE FROM livros_fts WHERE livro_id = old.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER livros_fts_au AFTER UPDATE OF id, nome, autor, descricao ON livros BEGIN
+            DELETE FROM livros_fts WHERE livro_id = old.id;
+            INSERT INTO livros_fts (livro_id, nome, autor, descricao)
+            VALUES (new.id, new.nome, new.autor, new.descricao);
+        END
+    """)
+    conn.execute("""
+        INSERT INTO livros_fts (livro_id, nome, autor, descricao)
+        SELECT id, nome, autor, descricao FROM livros
+    """)
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE anotacoes_fts USING fts5(
+            texto,
+            content = 'anotacoes', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER anotacoes_fts_ai AFTER INSERT ON anotacoes BEGIN
+            INSERT INTO anotacoes_fts (rowid, texto) VALUES (new.id, new.texto);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER anotacoes_fts_ad AFTER DELETE ON anotacoes BEGIN
+            INSERT INTO anotacoes_fts (anotacoes_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER anotacoes_fts_au AFTER UPDATE OF texto ON anotacoes BEGIN
+            INSERT INTO anotacoes_fts (anotacoes_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+            INSERT INTO anotacoes_fts (rowid, texto) VALUES (new.id, new.texto);
+        END
+    """)
+    conn.execute("INSERT INTO anotacoes_fts (anotacoes_fts) VALUES ('rebuild')")
+
+
+def _m005_resumo_diario(conn):
+    """
+    Totais de leitura por dia (e por dia+livro) mantidos por triggers na
+    mesma transação que grava/apaga/edita a sessão. livro_id '' = sem livro.
+    """
+    conn.execute("""
+        CREATE TABLE leitura_diaria (
+            dia TEXT PRIMARY KEY,
+            segundos INTEGER NOT NULL DEFAULT 0,
+            sessoes INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE leitura_diaria_livro (
+            dia TEXT NOT NULL,
+            livro_id TEXT NOT NULL,
+            segundos INTEGER NOT NULL DEFAULT 0,
+            sessoes INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, livro_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_leitura_livro ON leitura_diaria_livro(livro_id, dia)")
+
+    add = """
+        INSERT INTO leitura_diaria (dia, segundos, sessoes) VALUES (new.dia, new.duracao_seg, 1)
+        ON CONFLICT(dia) DO UPDATE SET segundos = segundos + excluded.segundos, sessoes = sessoes + 1;
+        INSERT INTO leitura_diaria_livro (dia, livro_id, segundos, sessoes)
+        VALUES (new.dia, COALESCE(new.livro_id, ''), new.duracao_seg, 1)
+        ON CONFLICT(dia, livro_id) DO UPDATE SET segundos = segundos + excluded.segundos, sessoes = sessoes + 1;
+    """
+    remove = """
+        UPDATE leitura_diaria SET segundos = segundos - old.duracao_seg, sessoes = sessoes - 1
+        WHERE dia = old.dia;
+        DELETE FROM leitura_diaria WHERE dia = old.dia AND sessoes <= 0;
+        UPDATE leitura_diaria_livro SET segundos = segundos - old.duracao_seg, sessoes = sessoes - 1
+        WHERE dia = old.dia AND livro_id = COALESCE(old.livro_id, '');
+        DELETE FROM leitura_diaria_livro
+        WHERE dia = old.dia AND livro_id = COALESCE(old.livro_id, '') AND sessoes <= 0;
+    """
+    conn.execute(f"CREATE TRIGGER sessoes_resumo_ai AFTER INSERT ON sessoes_leitura BEGIN {add} END")
+    conn.execute(f"CREATE TRIGGER sessoes_resumo_ad AFTER DELETE ON sessoes_leitura BEGIN {remove} END")
+    # Também pega o ON DELETE SET NULL quando um livro é apagado
+    conn.execute(f"""
+        CREATE TRIGGER sessoes_resumo_au AFTER UPDATE OF dia, duracao_seg, livro_id ON sessoes_leitura
+        BEGIN {remove} {add} END
+    """)
+
+    conn.execute("""
+        INSERT INTO leitura_diaria (dia, segundos, sessoes)
+        SELECT dia, SUM(duracao_seg), COUNT(*) FROM sessoes_leitura GROUP BY dia
+    """)
+    conn.execute("""
+        INSERT INTO leitura_diaria_livro (dia, livro_id, segundos, sessoes)
+        SELECT dia, COALESCE(livro_id, ''), SUM(duracao_seg), COUNT(*)
+        FROM sessoes_leitura GROUP BY dia, COALESCE(livro_id, '')
+    """)
+
+
+def _m006_chave_normalizada(conn):
+    """
+    Chave título|autores normalizada (book_keys.book_key) com índice único.
+    Duplicatas já salvas são fundidas no livro com mais progresso (empate:
+    o mais recente, que era o que a biblioteca mostrava): anotações, sessões
+    e progresso diário passam para ele antes de apagar as cópias.
+    """
+    conn.execute("ALTER TABLE livros ADD COLUMN chave_normalizada TEXT")
+
+    best = {}     # chave -> (pagina_atual, rowid, id) do livro que fica
+    keys = {}     # id -> chave
+    rows = conn.execute("SELECT rowid, id, nome, autor, COALESCE(pagina_atual, 0) FROM livros").fetchall()
+    for rowid, book_id, title, authors, pages in rows:
+        key = keys[book_id] = book_key(title, authors)
+        conn.execute("UPDATE livros SET chave_normalizada = ? WHERE rowid = ?", (key, rowid))
+        if key not in best or (pages, rowid) > best[key][:2]:
+            best[key] = (pages, rowid, book_id)
+
+    target = {book_id: best[key][2] for book_id, key in keys.items() if best[key][2] != book_id}
+    for dup, winner in target.items():
+        conn.execute("UPDATE anotacoes SET livro_id = ? WHERE livro_id = ?", (winner, dup))
+        conn.execute("UPDATE sessoes_leitura SET livro_id = ? WHERE livro_id = ?", (winner, dup))
+        conn.execute("""
+            INSERT INTO progresso_diario (livro_id, data, paginas_lidas)
+            SELECT ?, data, paginas_lidas FROM progresso_diario WHERE livro_id = ?
+            ON CONFLICT(livro_id, data) DO UPDATE SET paginas_lidas = paginas_lidas + excluded.paginas_lidas
+        """, (winner, dup))
+        # foreign_keys fica OFF durante as migrações: sem cascade aqui
+        conn.execute("DELETE FROM progresso_diario WHERE livro_id = ?", (dup,))
+        conn.execute("DELETE FROM livros WHERE id = ?", (dup,))
+
+    conn.execute("CREATE UNIQUE INDEX idx_livros_chave ON livros(chave_normalizada)")
+
+
+def _m007_livros_fts_ids(conn):
+    """
+    livros_fts passa a ter rowid fixo por livro (tabela livros_fts_ids), para
+    os triggers apagarem/regravarem a linha pelo rowid em vez de varrer o
+    índice inteiro atrás do livro_id (UNINDEXED). O trigger de UPDATE só age
+    quando o texto indexado muda de fato.
+    """
+    for trigger in ("livros_fts_ai", "livros_fts_ad", "livros_fts_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("""
+        CREATE TABLE livros_fts_ids (
+            fts_id INTEGER PRIMARY KEY,
+            livro_id TEXT NOT NULL UNIQUE
+        )
+    """)
+    fts_row = "(SELECT fts_id FROM livros_fts_ids WHERE livro_id = {}.id)"
+    conn.execute(f"""
+        CREATE TRIGGER livros_fts_ai AFTER INSERT ON livros BEGIN
+            INSERT INTO livros_fts_ids (livro_id) VALUES (new.id);
+            INSERT INTO livros_fts (rowid, livro_id, nome, autor, descricao)
+            VALUES ({fts_row.format("new")}, new.id, new.nome, new.autor, new.descricao);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER livros_fts_ad AFTER DELETE ON livros BEGIN
+            DELETE FROM livros_fts WHERE rowid = {fts_row.format("old")};
+            DELETE FROM livros_fts_ids WHERE livro_id = old.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER livros_fts_au AFTER UPDATE OF id, nome, autor, descricao ON livros
+        WHEN old.id IS NOT new.id OR old.nome IS NOT new.nome
+          OR old.autor IS NOT new.autor OR old.descricao IS NOT new.descricao
+        BEGIN
+            DELETE FROM livros_fts WHERE rowid = {fts_row.format("old")};
+            UPDATE livros_fts_ids SET livro_id = new.id WHERE livro_id = old.id;
+            INSERT INTO livros_fts (rowid, livro_id, nome, autor, descricao)
+            VALUES ({fts_row.format("new")}, new.id, new.nome, new.autor, new.descricao);
+        END
+    """)
+    rebuild_livros_fts(conn)
+
+
+def rebuild_livros_fts(conn):
+    """Refaz livros_fts (e os rowids fixos) a partir de livros."""
+    conn.execute("DELETE FROM livros_fts")
+    conn.execute("DELETE FROM livros_fts_ids")
+    conn.execute("INSERT INTO livros_fts_ids (livro_id) SELECT id FROM livros")
+    conn.execute("""
+        INSERT INTO livros_fts (rowid, livro_id, nome, autor, descricao)
+        SELECT m.fts_id, l.id, l.nome, l.autor, l.descricao
+        FROM livros l JOIN livros_fts_ids m ON m.livro_id = l.id
+    """)
+
+
+def _m008_cronometro(conn):
+    """Checkpoint do cronômetro em andamento (no máximo uma linha)."""
+    conn.execute("""
+        CREATE TABLE cronometro_ativo (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            livro_id TEXT REFERENCES livros(id) ON DELETE SET NULL,
+            estado TEXT NOT NULL,
+            atualizado_em TEXT NOT NULL
+        )
+    """)
+
+
+def _m009_progresso_data_paginas(conn):
+    """
+    Índice de cobertura (data, paginas_lidas) no lugar de idx_progresso_data:
+    o calendário soma páginas por dia de vários anos só lendo o índice.
+    """
+    conn.execute("CREATE INDEX idx_progresso_data_paginas ON progresso_diario(data, paginas_lidas)")
+    conn.execute("DROP INDEX IF EXISTS idx_progresso_data")
+
+
+def _cubo_cell(row):
+    """Expressões SQL (dia_semana, hora, livro_id) da célula de `row` (new/old/tabela)."""
+    return (
+        f"COALESCE(CAST(strftime('%w', {row}.inicio) AS INTEGER), CAST(strftime('%w', {row}.dia) AS INTEGER), 0)",
+        f"COALESCE(CAST(strftime('%H', {row}.inicio) AS INTEGER), -1)",
+        f"COALESCE({row}.livro_id, '')",
+    )
+
+
+# tabela -> colunas da chave (subconjunto de dia_semana, hora, livro_id)
+CUBO_TABELAS = {
+    "leitura_cubo": ("livro_id", "dia_semana", "hora"),
+    "leitura_hora": ("dia_semana", "hora"),
+    "leitura_livro": ("livro_id",),
+}
+
+
+def _m010_cubo_sessoes(conn):
+    """
+    Tempo de leitura por (livro, dia da semana, hora de início), mantido por
+    triggers como o resumo diário (migração 5), mais dois totais do mesmo
+    cubo: leitura_hora (7 x 24 linhas) e leitura_livro (um por livro, com
+    índice por segundos para o "top N"). dia_semana: 0 = domingo; hora:
+    0-23 do início (-1 se inicio não for uma data válida). A sessão inteira
+    conta na hora em que começou.
+    """
+    conn.execute("""
+        CREATE TABLE leitura_cubo (
+            livro_id TEXT NOT NULL,
+            dia_semana INTEGER NOT NULL,
+            hora INTEGER NOT NULL,
+            segundos INTEGER NOT NULL DEFAULT 0,
+            sessoes INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (livro_id, dia_semana, hora)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE leitura_hora (
+            dia_semana INTEGER NOT NULL,
+            hora INTEGER NOT NULL,
+            segundos INTEGER NOT NULL DEFAULT 0,
+            sessoes INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia_semana, hora)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE leitura_livro (
+            livro_id TEXT PRIMARY KEY,
+            segundos INTEGER NOT NULL DEFAULT 0,
+            sessoes INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_leitura_livro_segundos ON leitura_livro(segundos)")
+
+    def exprs(row):
+        return dict(zip(("dia_semana", "hora", "livro_id"), _cubo_cell(row)))
+
+    new, old = exprs("new"), exprs("old")
+    add, remove = [], []
+    for table, keys in CUBO_TABELAS.items():
+        columns = ", ".join(keys)
+        add.append(f"""
+            INSERT INTO {table} ({columns}, segundos, sessoes)
+            VALUES ({", ".join(new[k] for k in keys)}, new.duracao_seg, 1)
+            ON CONFLICT({columns}) DO UPDATE SET segundos = segundos + excluded.segundos, sessoes = sessoes + 1;
+        """)
+        match = " AND ".join(f"{k} = {old[k]}" for k in keys)
+        remove.append(f"""
+            UPDATE {table} SET segundos = segundos - old.duracao_seg, sessoes = sessoes - 1 WHERE {match};
+            DELETE FROM {table} WHERE {match} AND sessoes <= 0;
+        """)
+    add, remove = "".join(add), "".join(remove)
+    conn.execute(f"CREATE TRIGGER sessoes_cubo_ai AFTER INSERT ON sessoes_leitura BEGIN {add} END")
+    conn.execute(f"CREATE TRIGGER sessoes_cubo_ad AFTER DELETE ON sessoes_leitura BEGIN {remove} END")
+    # Também pega o ON DELETE SET NULL quando um livro é apagado
+    conn.execute(f"""
+        CREATE TRIGGER sessoes_cubo_au AFTER UPDATE OF inicio, dia, duracao_seg, livro_id ON sessoes_leitura
+        BEGIN {remove} {add} END
+    """)
+    rebuild_cubo(conn)
+
+
+def rebuild_cubo(conn):
+    """Recalcula o cubo e os dois totais a partir de sessoes_leitura. Devolve o nº de células."""
+    weekday, hour, book = _cubo_cell("sessoes_leitura")
+    for table in CUBO_TABELAS:
+        conn.execute(f"DELETE FROM {table}")
+    cells = conn.execute(f"""
+        INSERT INTO leitura_cubo (livro_id, dia_semana, hora, segundos, sessoes)
+        SELECT {book} AS b, {weekday} AS w, {hour} AS h, SUM(duracao_seg), COUNT(*)
+        FROM sessoes_leitura GROUP BY b, w, h
+    """).rowcount
+    conn.execute("""
+        INSERT INTO leitura_hora (dia_semana, hora, segundos, sessoes)
+        SELECT dia_semana, hora, SUM(segundos), SUM(sessoes) FROM leitura_cubo GROUP BY dia_semana, hora
+    """)
+    conn.execute("""
+        INSERT INTO leitura_livro (livro_id, segundos, sessoes)
+        SELECT livro_id, SUM(segundos), SUM(sessoes) FROM leitura_cubo GROUP BY livro_id
+    """)
+    return cells
+
+def _m011_ritmo(conn):
+    """
+    Estatísticas de ritmo por livro (ritmo_livro) e gerais (ritmo_global,
+    uma linha), mantidas por triggers em progresso_diario: cada gravação de
+    progresso custa O(1) a mais e a previsão de término (forecast.py) não
+    precisa ler o histórico. Apagar progresso não recua primeiro/último dia
+    (o intervalo só cresce); rebuild_ritmo() recalcula tudo.
+    """
+    conn.execute("""
+        CREATE TABLE ritmo_livro (
+            livro_id TEXT PRIMARY KEY REFERENCES livros(id) ON DELETE CASCADE,
+            paginas INTEGER NOT NULL DEFAULT 0,
+            dias INTEGER NOT NULL DEFAULT 0,
+            primeiro_dia TEXT,
+            ultimo_dia TEXT
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE ritmo_global (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            paginas INTEGER NOT NULL DEFAULT 0,
+            registros INTEGER NOT NULL DEFAULT 0,
+            primeiro_dia TEXT,
+            ultimo_dia TEXT
+        )
+    """)
+
+    _create_ritmo_triggers(conn)
+    # Os totais são preenchidos pela migração 12 (rebuild_ritmo), que vem logo depois
+
+
+def _create_ritmo_triggers(conn, skip_imported=False):
+    """
+    Triggers que mantêm ritmo_livro / ritmo_global. skip_imported: linhas com
+    importado = 1 (livro inteiro lido "num dia" pelo importador) não entram.
+    """
+    def counted(row):
+        return f"{row}.importado = 0" if skip_imported else "1"
+
+    # min()/max() de duas datas; date() NULL (texto que não é data) não mexe no intervalo
+    def span(column, fn):
+        return f"COALESCE({fn}({column}, date(new.data)), {column}, date(new.data))"
+
+    # INSERT ... SELECT ... WHERE: a linha só entra se contar para o ritmo
+    add = f"""
+        INSERT INTO ritmo_livro (livro_id, paginas, dias, primeiro_dia, ultimo_dia)
+        SELECT new.livro_id, new.paginas_lidas, 1, date(new.data), date(new.data) WHERE {counted("new")}
+        ON CONFLICT(livro_id) DO UPDATE SET
+            paginas = paginas + excluded.paginas, dias = dias + 1,
+            primeiro_dia = {span("primeiro_dia", "min")}, ultimo_dia = {span("ultimo_dia", "max")};
+        INSERT INTO ritmo_global (id, paginas, registros, primeiro_dia, ultimo_dia)
+        SELECT 1, new.paginas_lidas, 1, date(new.data), date(new.data) WHERE {counted("new")}
+        ON CONFLICT(id) DO UPDATE SET
+            paginas = paginas + excluded.paginas, registros = registros + 1,
+            primeiro_dia = {span("primeiro_dia", "min")}, ultimo_dia = {span("ultimo_dia", "max")};
+    """
+    remove = f"""
+        UPDATE ritmo_livro SET paginas = paginas - old.paginas_lidas, dias = dias - 1
+        WHERE livro_id = old.livro_id AND {counted("old")};
+        DELETE FROM ritmo_livro WHERE livro_id = old.livro_id AND dias <= 0;
+        UPDATE ritmo_global SET paginas = paginas - old.paginas_lidas, registros = registros - 1
+        WHERE id = 1 AND {counted("old")};
+    """
+    columns = "livro_id, data, paginas_lidas, importado" if skip_imported else "livro_id, data, paginas_lidas"
+    conn.execute(f"CREATE TRIGGER progresso_ritmo_ai AFTER INSERT ON progresso_diario BEGIN {add} END")
+    conn.execute(f"CREATE TRIGGER progresso_ritmo_ad AFTER DELETE ON progresso_diario BEGIN {remove} END")
+    # O UPSERT de save_book_progress cai aqui (DO UPDATE dispara UPDATE)
+    conn.execute(f"""
+        CREATE TRIGGER progresso_ritmo_au AFTER UPDATE OF {columns} ON progresso_diario
+        BEGIN {remove} {add} END
+    """)
+
+
+def _m012_progresso_importado(conn):
+    """
+    progresso_diario.importado = 1 marca o livro concluído que o importador
+    grava como um dia só (todas as páginas na data de leitura). Essas linhas
+    continuam no calendário, mas não entram no ritmo: um livro de 400 páginas
+    "lido num dia" puxava a previsão de todos os outros. Nas linhas já
+    existentes, marca o mesmo padrão: livro concluído cujo único registro tem
+    todas as páginas.
+    """
+    conn.execute("ALTER TABLE progresso_diario ADD COLUMN importado INTEGER NOT NULL DEFAULT 0")
+    conn.execute("""
+        UPDATE progresso_diario SET importado = 1
+        WHERE rowid IN (
+            SELECT MIN(p.rowid) FROM progresso_diario p JOIN livros l ON l.id = p.livro_id
+            WHERE l.status = 'Concluído' AND COALESCE(l.qtde_paginas, 0) > 0
+            GROUP BY p.livro_id
+            HAVING COUNT(*) = 1 AND SUM(p.paginas_lidas) >= MAX(l.qtde_paginas)
+        )
+    """)
+    for suffix in ("ai", "ad", "au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS progresso_ritmo_{suffix}")
+    _create_ritmo_triggers(conn, skip_imported=True)
+    rebuild_ritmo(conn)
+
+
+def rebuild_ritmo(conn):
+    """Recalcula ritmo_livro e ritmo_global a partir de progresso_diario (sem as linhas importadas)."""
+    conn.execute("DELETE FROM ritmo_livro")
+    conn.execute("DELETE FROM ritmo_global")
+    books = conn.execute("""
+        INSERT INTO ritmo_livro (livro_id, paginas, dias, primeiro_dia, ultimo_dia)
+        SELECT livro_id, SUM(paginas_lidas), COUNT(*), MIN(date(data)), MAX(date(data))
+        FROM progresso_diario WHERE importado = 0 GROUP BY livro_id
+    """).rowcount
+    conn.execute("""
+        INSERT INTO ritmo_global (id, paginas, registros, primeiro_dia, ultimo_dia)
+        SELECT 1, SUM(paginas_lidas), COUNT(*), MIN(date(data)), MAX(date(data))
+        FROM progresso_diario WHERE importado = 0 HAVING COUNT(*) > 0
+    """)
+    return books
+
+MIGRATIONS = (
+    _m001_schema_base,
+    _m002_chaves_e_indices,
+    _m003_cache_busca,
+    _m004_busca_textual,
+    _m005_resumo_diario,
+    _m006_chave_normalizada,
+    _m007_livros_fts_ids,
+    _m008_cronometro,
+    _m009_progresso_data_paginas,
+    _m010_cubo_sessoes,
+    _m011_ritmo,
+    _m012_progresso_importado,
+)
+
+
+class Database:
+    """
+    Camada de conexões compartilhada pelo app.
+
+    Uso:
+        with db.read() as cur:
+            cur.execute("SELECT ...")
+        with db.write() as cur:
+            cur.execute("INSERT ...")   # commit automático (rollback em erro)
+
+    write("tabela", ...) avisa quais tabelas a transação altera: depois do
+    COMMIT, data_version(tabela) aumenta e caches em memória sabem que
+    precisam recalcular.
+    """
+
+    def __init__(self, path: str, readers: int = 2):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._max_readers = max(1, int(readers))
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._touched = set()
+        self._versions = {}
+        self._writer = self._connect()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: controlamos as transações com BEGIN/COMMIT
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    # ------------------ LEITURA ------------------
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._reader_lock:
+            if self._reader_count < self._max_readers:
+                self._reader_count += 1
+                return self._connect()
+        return self._readers.get()
+
+    @contextmanager
+    def read(self):
+        """Cursor de uma conexão de leitura do pool (sempre em autocommit)."""
+        conn = self._acquire_reader()
+        cur = conn.cursor()
+        try:
+            with instrumentation.timed("db.read"):
+                yield cur
+        finally:
+            cur.close()
+            if self._closed:
+                conn.close()
+            else:
+                self._readers.put(conn)
+
+    # ------------------ ESCRITA ------------------
+    @contextmanager
+    def write(self, *touches):
+        """
+        Transação na conexão de escrita. Chamadas aninhadas na mesma thread
+        participam da transação mais externa.
+        """
+        with instrumentation.timed("db.write"), self._write_lock:
+            conn = self._writer
+            outermost = self._write_depth == 0
+            if outermost:
+                conn.execute("BEGIN IMMEDIATE")
+                self._touched.clear()
+            self._touched.update(touches)
+            self._write_depth += 1
+            cur = conn.cursor()
+            try:
+                yield cur
+            except BaseException:
+                self._write_depth -= 1
+                if outermost:
+                    conn.execute("ROLLBACK")
+                    self._touched.clear()
+                raise
+            else:
+                self._write_depth -= 1
+                if outermost:
+                    conn.execute("COMMIT")
+                    for table in self._touched:
+                        self._versions[table] = self._versions.get(table, 0) + 1
+                    self._touched.clear()
+            finally:
+                cur.close()
+
+    def data_version(self, table: str) -> int:
+        """Contador (em memória) de transações confirmadas que alteraram `table`."""
+        return self._versions.get(table, 0)
+
+    # ------------------ THREAD DO BANCO ------------------
+    def submit(self, fn, *args, **kwargs):
+        """
+        Executa fn(*args, **kwargs) na thread do banco e devolve um Future.
+        É uma thread só: os trabalhos rodam na ordem em que foram enviados,
+        então duas gravações nunca trocam de ordem.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="roots-db")
+            return self._executor.submit(fn, *args, **kwargs)
+
+    # ------------------ MIGRAÇÕES ------------------
+    def migrate(self) -> int:
+        """Aplica as migrações pendentes e retorna a versão final do esquema."""
+        with self._write_lock:
+            conn = self._writer
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(MIGRATIONS):
+                return version
+
+            # Recriar tabelas exige FKs desligadas (o PRAGMA não vale dentro de transação)
+            conn.execute("PRAGMA foreign_keys = OFF")
+            try:
+                for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        step(conn)
+                        broken = conn.execute("PRAGMA foreign_key_check").fetchall()
+                        if broken:
+                            raise sqlite3.IntegrityError(
+                                f"migração {number} deixou chaves estrangeiras inválidas: {broken[:5]}"
+                            )
+                        conn.execute(f"PRAGMA user_version = {number}")
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                    version = number
+            finally:
+                conn.execute("PRAGMA foreign_keys = ON")
+            return version
+
+    # ------------------ CICLO DE VIDA ------------------
+    def close(self):
+        # Termina o que já foi enviado (gravações pendentes) antes de fechar
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self._closed = True
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._write_lock:
+            try:
+                self._writer.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            self._writer.close()
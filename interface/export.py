@@ -0,0 +1,175 @@
+"""
+Backup e exportação do banco do Roots (sem Kivy).
+
+- backup(): cópia consistente do roots.db com a API de backup online do
+  SQLite, num passo só a partir de uma conexão de leitura; em WAL o app
+  continua gravando enquanto a cópia anda.
+- export_jsonl() / export_csv() / export_markdown(): percorrem o cursor
+  linha a linha (nada de fetchall), então a memória não cresce com anos
+  de histórico.
+
+    backup(db, "/tmp/roots-copia.db")
+    export_all(db, "/tmp/roots-export")
+"""
+import csv
+import json
+import os
+import sqlite3
+import time
+
+
+# nome -> (colunas, SQL). A ordem das colunas é a do SELECT.
+DATASETS = {
+    "livros": (
+        ("id", "nome", "autor", "status", "pagina_atual", "qtde_paginas", "nota", "cover_url", "descricao"),
+        """
+        SELECT id, nome, autor, COALESCE(status, 'Quero ler'), COALESCE(pagina_atual, 0),
+               COALESCE(qtde_paginas, 0), COALESCE(nota, 0), COALESCE(cover_url, ''), COALESCE(descricao, '')
+        FROM livros ORDER BY rowid
+        """,
+    ),
+    "sessoes": (
+        ("id", "livro_id", "livro", "inicio", "fim", "duracao_seg", "dia"),
+        """
+        SELECT s.id, COALESCE(s.livro_id, ''), COALESCE(l.nome, ''), s.inicio, s.fim, s.duracao_seg, s.dia
+        FROM sessoes_leitura s LEFT JOIN livros l ON l.id = s.livro_id
+        ORDER BY s.id
+        """,
+    ),
+    "anotacoes": (
+        ("id", "livro_id", "livro", "texto"),
+        """
+        SELECT a.id, COALESCE(a.livro_id, ''), COALESCE(l.nome, 'Sem livro'), COALESCE(a.texto, '')
+        FROM anotacoes a LEFT JOIN livros l ON l.id = a.livro_id
+        ORDER BY a.id
+        """,
+    ),
+}
+FETCH_SIZE = 500
+
+
+# ===================== BACKUP =====================
+def backup(db, dest_path):
+    """
+    Copia o banco para dest_path (gravado num .tmp e trocado no fim).
+    Copia tudo num passo (pages=-1): em passos menores, cada commit do app
+    entre um passo e outro faz o SQLite recomeçar a cópia, e com o app
+    gravando ela podia nunca terminar. Quem chama avisa o início e o fim.
+    """
+    tmp = f"{dest_path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    dst = sqlite3.connect(tmp)
+    try:
+        with db.read() as cur:
+            cur.connection.backup(dst, pages=-1)
+        ok = dst.execute("PRAGMA quick_check").fetchone()[0]
+        if ok != "ok":
+            raise sqlite3.DatabaseError(f"cópia corrompida: {ok}")
+    finally:
+        dst.close()
+    os.replace(tmp, dest_path)
+    return dest_path
+
+
+# ===================== EXPORTAÇÃO =====================
+def iter_rows(db, dataset):
+    """Gera as linhas (tuplas) do dataset sem carregar tudo na memória."""
+    _columns, sql = DATASETS[dataset]
+    with db.read() as cur:
+        cur.execute(sql)
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+
+def export_jsonl(db, dataset, path):
+    columns, _sql = DATASETS[dataset]
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for row in iter_rows(db, dataset):
+            f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def export_csv(db, dataset, path):
+    columns, _sql = DATASETS[dataset]
+    count = 0
+    # utf-8-sig: o Excel reconhece os acentos
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in iter_rows(db, dataset):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _md_quote(text):
+    return "\n".join(f"> {line}" if line else ">" for line in (text or "").splitlines()) or ">"
+
+
+def export_markdown(db, path):
+    """Um livro por seção, com status/progresso e as anotações em citação."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f, db.read() as cur:
+        f.write("# Minha biblioteca no Roots\n")
+        cur.execute("""
+            SELECT l.id, l.nome, COALESCE(l.autor, ''), COALESCE(l.status, 'Quero ler'),
+                   COALESCE(l.pagina_atual, 0), COALESCE(l.qtde_paginas, 0), COALESCE(l.nota, 0),
+                   a.texto
+            FROM livros l LEFT JOIN anotacoes a ON a.livro_id = l.id
+            ORDER BY l.nome COLLATE NOCASE, l.id, a.id
+        """)
+        current = None
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for book_id, title, authors, status, pages_read, pages, rating, note in rows:
+                if book_id != current:
+                    current = book_id
+                    count += 1
+                    f.write(f"\n## {title}\n\n")
+                    if authors:
+                        f.write(f"*{authors}*\n\n")
+                    progress = f" — {pages_read}/{pages} páginas" if pages else ""
+                    stars = f" — {'★' * rating}" if rating else ""
+                    f.write(f"{status}{progress}{stars}\n")
+                if note:
+                    f.write(f"\n{_md_quote(note)}\n")
+
+        cur.execute("SELECT texto FROM anotacoes WHERE livro_id IS NULL ORDER BY id")
+        first = True
+        for (note,) in cur:
+            if first:
+                f.write("\n## Sem livro\n")
+                first = False
+            f.write(f"\n{_md_quote(note)}\n")
+    return count
+
+
+def export_all(db, out_dir, formats=("jsonl", "csv", "md")):
+    """Exporta livros, sessões e anotações para out_dir. Devolve {arquivo: linhas}."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+    for dataset in DATASETS:
+        if "jsonl" in formats:
+            path = os.path.join(out_dir, f"{dataset}.jsonl")
+            written[path] = export_jsonl(db, dataset, path)
+        if "csv" in formats:
+            path = os.path.join(out_dir, f"{dataset}.csv")
+            written[path] = export_csv(db, dataset, path)
+    if "md" in formats:
+        path = os.path.join(out_dir, "biblioteca.md")
+        written[path] = export_markdown(db, path)
+    return written
+
+
+def timestamped(base_dir, prefix, suffix=""):
+    """Caminho base_dir/prefix-AAAAMMDD-HHMMSS[suffix]."""
+    return os.path.join(base_dir, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}{suffix}")
@@ -0,0 +1,103 @@
+"""
+Ritmo de leitura e previsão de término (sem Kivy).
+
+Os totais vêm de ritmo_livro / ritmo_global (migrações 11 e 12, mantidos
+por triggers a cada gravação em progresso_diario, sem os livros concluídos
+que o importador grava de uma vez) e de leitura_livro (tempo
+cronometrado por livro, migração 10). book_forecast() faz só buscas por
+chave primária, então abrir o detalhe do livro não lê o histórico.
+
+O ritmo do livro é páginas / dias corridos desde o primeiro registro até
+hoje (parar de ler deixa o ritmo cair). Com poucos dias ele é puxado para
+o ritmo geral (páginas por registro de livro+dia, somando todos os
+livros): PRIOR_DAYS dias "emprestados" com esse ritmo.
+"""
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from database import rebuild_ritmo
+
+PRIOR_DAYS = 7
+
+
+@dataclass(frozen=True)
+class Forecast:
+    pages_per_day: float        # 0.0 = sem dados de ritmo
+    pages_per_minute: float     # 0.0 = livro sem sessões cronometradas
+    remaining_pages: int
+    finish_date: object         # date ou None (sem ritmo, sem nº de páginas ou já lido)
+    minutes_left: int           # -1 se não houver páginas/minuto
+
+
+def _days_since(first, today):
+    try:
+        return max(1, (today - date.fromisoformat(first)).days + 1)
+    except (TypeError, ValueError):
+        return 0
+
+
+def estimate(book_pages, book_first_day, global_pages, global_records, seconds,
+             pages_read, page_count, today) -> Forecast:
+    """Previsão a partir dos totais já somados (função pura)."""
+    global_rate = global_pages / global_records if global_records and global_pages > 0 else 0.0
+    book_days = _days_since(book_first_day, today) if book_pages > 0 else 0
+
+    if book_days or global_rate:
+        rate = (book_pages + PRIOR_DAYS * global_rate) / (book_days + PRIOR_DAYS)
+    else:
+        rate = 0.0
+
+    ppm = book_pages / (seconds / 60) if seconds >= 60 and book_pages > 0 else 0.0
+    remaining = max(0, int(page_count or 0) - int(pages_read or 0))
+
+    finish = None
+    if remaining and rate > 0:
+        finish = today + timedelta(days=math.ceil(remaining / rate))
+    minutes_left = int(math.ceil(remaining / ppm)) if ppm > 0 else -1
+    return Forecast(rate, ppm, remaining, finish, minutes_left)
+
+
+def book_forecast(db, book_id, today=None) -> Forecast:
+    today = today or date.today()
+    with db.read() as cur:
+        cur.execute("""
+            SELECT COALESCE(l.pagina_atual, 0), COALESCE(l.qtde_paginas, 0),
+                   COALESCE(r.paginas, 0), r.primeiro_dia,
+                   COALESCE(g.paginas, 0), COALESCE(g.registros, 0),
+                   COALESCE(t.segundos, 0)
+            FROM livros l
+            LEFT JOIN ritmo_livro r ON r.livro_id = l.id
+            LEFT JOIN ritmo_global g ON g.id = 1
+            LEFT JOIN leitura_livro t ON t.livro_id = l.id
+            WHERE l.id = ?
+        """, (book_id,))
+        row = cur.fetchone()
+    if row is None:
+        return Forecast(0.0, 0.0, 0, None, -1)
+    pages_read, page_count, book_pages, book_first, global_pages, global_records, seconds = row
+    return estimate(book_pages, book_first, global_pages, global_records, seconds,
+                    pages_read, page_count, today)
+
+
+def describe(fc: Forecast) -> str:
+    """Texto curto para a tela de detalhe ('' quando não há o que mostrar)."""
+    parts = []
+    if fc.pages_per_day > 0:
+        pace = f"Ritmo: {fc.pages_per_day:.1f} pág/dia"
+        if fc.pages_per_minute > 0:
+            pace += f" · {fc.pages_per_minute:.2f} pág/min"
+        parts.append(pace)
+    if fc.finish_date is not None:
+        parts.append(f"Previsão de término: {fc.finish_date:%d/%m/%Y}")
+    if fc.remaining_pages and fc.minutes_left >= 0:
+        hours, minutes = divmod(fc.minutes_left, 60)
+        parts.append(f"Faltam ~{hours} h {minutes:02d} min de leitura" if hours
+                     else f"Faltam ~{minutes} min de leitura")
+    return "\n".join(parts)
+
+
+def rebuild(db):
+    """Recalcula as estatísticas de ritmo a partir de progresso_diario. Retorna o nº de livros."""
+    with db.write() as cur:
+        return rebuild_ritmo(cur)
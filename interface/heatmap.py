@@ -0,0 +1,170 @@
+"""
+Calendário de leitura de vários anos (mapa de calor, sem Kivy).
+
+- load_calendar() lê os totais por dia (leitura_diaria para minutos,
+  progresso_diario somado no SQL para páginas) e distribui tudo numa grade
+  de semanas x dias da semana com um único np.bincount por métrica; sem
+  NumPy cai num laço em Python com o mesmo resultado.
+- render_rgba() transforma a grade em pixels RGBA (uma imagem só, para
+  virar uma textura na UI); quem desenha não cria um widget por dia.
+
+A grade começa num domingo e cada coluna é uma semana DOM->SÁB, como no
+gráfico semanal (reading_stats.week_range_sun_sat).
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from reading_stats import week_range_sun_sat
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+YEARS = 5
+CELL = 4          # pixels por dia na textura (3 preenchidos + 1 de espaço)
+GAP = 1
+
+# Limites dos níveis 1..4 (nível 0 = sem leitura)
+THRESHOLDS = {
+    "minutes": (1, 15, 30, 60),
+    "pages": (1, 10, 30, 60),
+}
+# Nível -> RGBA (0-255), do fundo até a cor mais forte
+PALETTE = (
+    (255, 255, 255, 24),
+    (109, 76, 65, 255),
+    (141, 110, 99, 255),
+    (188, 170, 164, 255),
+    (249, 235, 215, 255),
+)
+
+
+@dataclass(frozen=True)
+class CalendarGrid:
+    start: date           # domingo da primeira coluna
+    weeks: int
+    end: date             # último dia com dado possível (hoje)
+    minutes: object       # por dia desde start (len = weeks * 7); ndarray ou list
+    pages: object
+
+    def values(self, metric):
+        return self.minutes if metric == "minutes" else self.pages
+
+    def week_start(self, week: int) -> date:
+        return self.start + timedelta(weeks=week)
+
+    def totals(self, first_week: int, last_week: int):
+        """(minutos, páginas) somados entre as colunas first_week..last_week (inclusive)."""
+        a, b = first_week * 7, (last_week + 1) * 7
+        return int(sum(self.minutes[a:b])), int(sum(self.pages[a:b]))
+
+
+def calendar_range(years=YEARS, today=None):
+    """(domingo inicial, número de semanas) cobrindo `years` anos até a semana de hoje."""
+    today = today or date.today()
+    _start, last_sat = week_range_sun_sat(today)
+    # dia 28 no lugar de 29/02, que não existe em todo ano
+    first = date(today.year - years, today.month, min(today.day, 28)) + timedelta(days=1)
+    first_sun, _end = week_range_sun_sat(first)
+    return first_sun, ((last_sat - first_sun).days + 1) // 7
+
+
+# ===================== BINNING =====================
+def bin_days(start: date, ndays: int, days, values):
+    """
+    Soma `values` no índice (dia - start) de um vetor com ndays posições.
+    `days` são strings 'YYYY-MM-DD'; datas fora do intervalo são ignoradas.
+    """
+    if HAS_NUMPY:
+        if not days:
+            return np.zeros(ndays, dtype=np.int64)
+        offsets = (np.array(days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+        weights = np.asarray(values, dtype=np.float64)
+        inside = (offsets >= 0) & (offsets < ndays)
+        binned = np.bincount(offsets[inside], weights=weights[inside], minlength=ndays)
+        return binned.astype(np.int64)
+
+    binned = [0] * ndays
+    base = start.toordinal()
+    for day, value in zip(days, values):
+        i = date.fromisoformat(day).toordinal() - base
+        if 0 <= i < ndays:
+            binned[i] += int(value or 0)
+    return binned
+
+
+def load_calendar(db, years=YEARS, today=None) -> CalendarGrid:
+    """Minutos e páginas por dia dos últimos `years` anos (duas consultas, sem laço por dia)."""
+    today = today or date.today()
+    start, weeks = calendar_range(years, today)
+    ndays = weeks * 7
+    lo, hi = start.isoformat(), today.isoformat()
+    with db.read() as cur:
+        cur.execute("SELECT dia, segundos FROM leitura_diaria WHERE dia BETWEEN ? AND ?", (lo, hi))
+        rows = cur.fetchall()
+        # Soma por data no índice (data, paginas_lidas) da migração 9; as datas
+        # já são 'AAAA-MM-DD' (migração 2), "~" só garante o limite de hi.
+        cur.execute("""
+            SELECT date(data), SUM(paginas_lidas) FROM progresso_diario
+            WHERE data BETWEEN ? AND ? AND paginas_lidas > 0
+            GROUP BY data
+        """, (lo, hi + "~"))
+        page_rows = [row for row in cur.fetchall() if row[0] is not None]
+
+    seconds = bin_days(start, ndays, [d for d, _s in rows], [s for _d, s in rows])
+    if HAS_NUMPY:
+        minutes = seconds // 60
+    else:
+        minutes = [s // 60 for s in seconds]
+    pages = bin_days(start, ndays, [d for d, _p in page_rows], [p for _d, p in page_rows])
+    return CalendarGrid(start=start, weeks=weeks, end=today, minutes=minutes, pages=pages)
+
+
+# ===================== IMAGEM =====================
+def levels(values, thresholds):
+    """Nível 0..len(thresholds) de cada valor."""
+    if HAS_NUMPY:
+        return np.searchsorted(np.asarray(thresholds), np.asarray(values), side="right")
+    return [sum(1 for t in thresholds if v >= t) for v in values]
+
+
+def render_rgba(grid: CalendarGrid, metric="minutes", cell=CELL, gap=GAP):
+    """
+    (pixels RGBA em bytes, largura, altura) do calendário inteiro: uma
+    coluna de `cell` px por semana e uma linha por dia da semana, com o
+    domingo em cima. As linhas saem de baixo para cima (origem da textura
+    no Kivy). Dias depois de grid.end ficam transparentes.
+    """
+    width, height = grid.weeks * cell, 7 * cell
+    future = (grid.start + timedelta(days=grid.weeks * 7 - 1) - grid.end).days
+
+    if HAS_NUMPY:
+        palette = np.array(PALETTE + ((0, 0, 0, 0),), dtype=np.uint8)
+        lv = levels(grid.values(metric), THRESHOLDS[metric]).astype(np.intp)
+        if future > 0:
+            lv[-future:] = len(PALETTE)   # índice da cor transparente
+        # dia i -> (semana i // 7, dia da semana i % 7); domingo na linha de cima
+        days = palette[lv.reshape(grid.weeks, 7).T[::-1]]          # (7, semanas, 4)
+        block = np.repeat(np.repeat(days, cell, axis=0), cell, axis=1)
+        if gap:
+            block[np.arange(height) % cell >= cell - gap] = 0
+            block[:, np.arange(width) % cell >= cell - gap] = 0
+        return block.tobytes(), width, height
+
+    lv = levels(grid.values(metric), THRESHOLDS[metric])
+    blank = bytes(4)
+    out = bytearray()
+    for y in range(height):
+        if y % cell >= cell - gap:
+            out += blank * width
+            continue
+        weekday = 6 - y // cell
+        row = bytearray()
+        for week in range(grid.weeks):
+            i = week * 7 + weekday
+            color = blank if i >= len(lv) - max(future, 0) else bytes(PALETTE[lv[i]])
+            row += color * (cell - gap) + blank * gap
+        out += row
+    return bytes(out), width, height
@@ -0,0 +1,213 @@
+"""
+Importação em lote da biblioteca a partir de CSV (sem Kivy).
+
+Aceita o export do Goodreads ("goodreads_library_export.csv") e CSVs
+simples com cabeçalho em português ou inglês (titulo/title, autor/author,
+paginas/pages, status, nota/rating, pagina_atual/pages_read...).
+
+O arquivo é lido linha a linha e gravado em lotes (executemany, uma
+transação por lote): a memória não cresce com o tamanho do arquivo.
+Livros que já estão na biblioteca (mesma chave título|autores) são
+atualizados em vez de duplicados.
+
+    result = import_csv(db, "goodreads_library_export.csv", progress=print)
+"""
+import csv
+import hashlib
+import io
+import os
+import re
+from dataclasses import dataclass
+from datetime import date
+
+import local_search
+from book_keys import book_key
+
+
+BATCH_SIZE = 1000
+
+# Nome de coluna (minúsculo) -> campo
+COLUMNS = {
+    "title": "title", "titulo": "title", "título": "title", "nome": "title",
+    "author": "author", "autor": "author", "authors": "author", "autores": "author",
+    "additional authors": "extra_authors",
+    "number of pages": "pages", "pages": "pages", "paginas": "pages", "páginas": "pages",
+    "qtde_paginas": "pages",
+    "exclusive shelf": "shelf", "status": "status",
+    "my rating": "rating", "rating": "rating", "nota": "rating",
+    "pages read": "pages_read", "pages_read": "pages_read", "pagina_atual": "pages_read",
+    "date read": "date_read", "data_leitura": "date_read",
+    "cover_url": "cover_url", "capa": "cover_url",
+    "description": "description", "descricao": "description", "descrição": "description",
+}
+
+# Prateleiras do Goodreads / status em inglês -> status do app
+STATUSES = {
+    "read": "Concluído", "currently-reading": "Lendo", "to-read": "Quero ler",
+    "lido": "Concluído", "concluído": "Concluído", "concluido": "Concluído",
+    "lendo": "Lendo", "reading": "Lendo",
+    "quero ler": "Quero ler", "want to read": "Quero ler",
+}
+
+# 2020/05/31 ou 2020-05-31 (Goodreads / ISO) e 31/05/2020
+_YMD = re.compile(r"(\d{4})[/-](\d{1,2})[/-](\d{1,2})")
+_DMY = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_NOT_DIGITS = re.compile(r"[^\d]")
+
+# Reimportar não faz o livro voltar: status e página andam juntos, e se o
+# livro já está mais adiantado no app ficam o status e a página dele
+UPSERT_BOOK = """
+    INSERT INTO livros (
+        id, nome, autor, cover_url, qtde_paginas, status, pagina_atual, nota, descricao, chave_normalizada
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(chave_normalizada) DO UPDATE SET
+        status = CASE WHEN COALESCE(livros.pagina_atual, 0) > excluded.pagina_atual
+                      THEN livros.status ELSE excluded.status END,
+        nota = CASE WHEN excluded.nota > 0 THEN excluded.nota ELSE livros.nota END,
+        pagina_atual = MAX(COALESCE(livros.pagina_atual, 0), excluded.pagina_atual),
+        qtde_paginas = CASE WHEN COALESCE(livros.qtde_paginas, 0) = 0
+                            THEN excluded.qtde_paginas ELSE livros.qtde_paginas END,
+        cover_url = COALESCE(NULLIF(livros.cover_url, ''), excluded.cover_url),
+        descricao = COALESCE(NULLIF(livros.descricao, ''), excluded.descricao)
+"""
+
+# O livro pode já existir com outro id: procura pela chave. importado = 1:
+# o livro inteiro num dia só não entra no ritmo de leitura (migração 12)
+INSERT_FINISHED = """
+    INSERT INTO progresso_diario (livro_id, data, paginas_lidas, importado)
+    SELECT id, ?, ?, 1 FROM livros WHERE chave_normalizada = ?
+    ON CONFLICT(livro_id, data) DO NOTHING
+"""
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0        # linhas de dados lidas
+    imported: int = 0    # livros inseridos ou atualizados
+    skipped: int = 0     # linhas sem título
+
+
+def _int(value):
+    if not value:
+        return 0
+    if not value.isdigit():
+        value = _NOT_DIGITS.sub("", value)
+    return int(value) if value else 0
+
+
+def _date(value):
+    if not value:
+        return None
+    m = _YMD.match(value.strip())
+    if m:
+        y, mo, d = m.groups()
+    else:
+        m = _DMY.match(value.strip())
+        if not m:
+            return None
+        d, mo, y = m.groups()
+    try:
+        return date(int(y), int(mo), int(d)).isoformat()
+    except ValueError:
+        return None
+
+
+def parse_row(row):
+    """
+    Converte uma linha (dict com os campos de COLUMNS) em
+    (parâmetros de UPSERT_BOOK, parâmetros de INSERT_FINISHED ou None),
+    ou None se a linha não tiver título.
+    """
+    title = (row.get("title") or "").strip()
+    if not title:
+        return None
+    authors = ", ".join(a.strip() for a in [row.get("author") or ""] + (row.get("extra_authors") or "").split(",")
+                        if a.strip()) or "Autor Desconhecido"
+    pages = _int(row.get("pages"))
+    status = STATUSES.get((row.get("shelf") or row.get("status") or "").strip().lower(), "Quero ler")
+    rating = min(_int(row.get("rating")), 5)
+
+    pages_read = _int(row.get("pages_read"))
+    if status == "Concluído":
+        pages_read = pages
+    elif status == "Quero ler":
+        pages_read = 0
+    elif pages:
+        pages_read = min(pages_read, pages)
+
+    key = book_key(title, authors)
+    # id estável: reimportar o mesmo arquivo atualiza em vez de duplicar
+    book_id = "import-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    book = (book_id, title, authors, (row.get("cover_url") or "").strip(), pages, status,
+            pages_read, rating, (row.get("description") or "").strip(), key)
+
+    finished = None
+    day = _date(row.get("date_read"))
+    if status == "Concluído" and day and pages:
+        finished = (day, pages, key)
+    return book, finished
+
+
+def _write_batch(db, books, finished):
+    with db.write("livros", "progresso_diario") as cur:
+        with local_search.bulk_book_index(cur):
+            cur.executemany(UPSERT_BOOK, books)
+        if finished:
+            cur.executemany(INSERT_FINISHED, finished)
+    return len(books)
+
+
+def import_rows(db, rows, progress=None, batch_size=BATCH_SIZE, position=None):
+    """
+    Importa um iterável de dicts (já com os campos de COLUMNS).
+    progress(linhas_lidas, fração) é chamado a cada lote; a fração vem de
+    position() (0..1) quando disponível, senão é None.
+    """
+    result = ImportResult()
+    books, finished = [], []
+    for row in rows:
+        result.rows += 1
+        parsed = parse_row(row)
+        if parsed is None:
+            result.skipped += 1
+            continue
+        book, done = parsed
+        books.append(book)
+        if done:
+            finished.append(done)
+        if len(books) >= batch_size:
+            result.imported += _write_batch(db, books, finished)
+            books, finished = [], []
+            if progress:
+                progress(result.rows, position() if position else None)
+    if books:
+        result.imported += _write_batch(db, books, finished)
+    if progress:
+        progress(result.rows, 1.0)
+    return result
+
+
+def _mapped_rows(reader):
+    fields = {name: COLUMNS.get((name or "").strip().lower()) for name in reader.fieldnames or ()}
+    if "title" not in fields.values():
+        raise ValueError("o CSV precisa de uma coluna de título (title/titulo/nome)")
+    for raw in reader:
+        yield {field: raw[name] for name, field in fields.items() if field and raw.get(name) is not None}
+
+
+def import_csv(db, path, progress=None, batch_size=BATCH_SIZE):
+    """Importa o CSV em `path` (UTF-8, com ou sem BOM; vírgula ou ponto e vírgula)."""
+    total = os.path.getsize(path) or 1
+    with open(path, "rb") as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        sample = text.read(8192)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(text, dialect=dialect)
+        return import_rows(
+            db, _mapped_rows(reader), progress=progress, batch_size=batch_size,
+            position=lambda: min(raw.tell() / total, 1.0),
+        )
@@ -0,0 +1,146 @@
+"""
+Instrumentação opcional dos caminhos quentes (sem Kivy).
+
+Ligada com a variável de ambiente ROOTS_PROFILE=1. Desligada, timed() e
+record() não fazem nada além de um if. Cada métrica é um histograma de
+latência em buckets logarítmicos (ms), com contagem, soma, mínimo e máximo.
+
+    with instrumentation.timed("db.read"):
+        ...
+
+    @instrumentation.timed_call("screen.go_graph")
+    def go_graph(self): ...
+
+    instrumentation.dump("/tmp/roots_profile.json")
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+ENABLED = os.environ.get("ROOTS_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Limites superiores dos buckets, em ms (o último é "acima de 5 s")
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, ms):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        """Estimativa pelo limite superior do bucket (limitada ao máximo observado)."""
+        if not self.count:
+            return 0.0
+        target = p * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 4) if self.count else 0.0,
+            "min_ms": round(self.min, 4) if self.count else 0.0,
+            "max_ms": round(self.max, 4),
+            "p50_ms": round(self.percentile(0.50), 4),
+            "p95_ms": round(self.percentile(0.95), 4),
+            "buckets": {("inf" if b == float("inf") else str(b)): n
+                        for b, n in zip(BUCKETS_MS, self.counts) if n},
+        }
+
+
+_lock = threading.Lock()
+_metrics = {}
+
+
+def record(name, ms):
+    if not ENABLED:
+        return
+    with _lock:
+        hist = _metrics.get(name)
+        if hist is None:
+            hist = _metrics[name] = Histogram()
+        hist.add(ms)
+
+
+@contextmanager
+def _timed(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - t0) * 1000)
+
+
+@contextmanager
+def _noop():
+    yield
+
+
+def timed(name):
+    """Context manager que mede o bloco (não faz nada se desligado)."""
+    return _timed(name) if ENABLED else _noop()
+
+
+def timed_call(name):
+    """Decorator: mede cada chamada da função."""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _timed(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    with _lock:
+        return {name: hist.as_dict() for name, hist in sorted(_metrics.items())}
+
+
+def summary_lines(limit=12):
+    """Linhas curtas (as métricas mais custosas primeiro) para o overlay de debug."""
+    snap = snapshot()
+    ranked = sorted(snap.items(), key=lambda kv: kv[1]["count"] * kv[1]["mean_ms"], reverse=True)
+    return [
+        f"{name}: n={m['count']} p50={m['p50_ms']:.2f} p95={m['p95_ms']:.2f} max={m['max_ms']:.2f} ms"
+        for name, m in ranked[:limit]
+    ]
+
+
+def dump(path):
+    data = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "metrics": snapshot()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
@@ -0,0 +1,97 @@
+import re
+from contextlib import contextmanager
+
+from database import rebuild_livros_fts
+
+
+# Marcadores do snippet(); a UI troca por markup depois de escapar o texto
+HIT_START = "\x02"
+HIT_END = "\x03"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(text: str) -> str:
+    """
+    Converte o que o usuário digitou numa consulta FTS5 segura: cada palavra
+    vira um prefixo entre aspas ("dom"* "casm"*), todas obrigatórias.
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def search_books(db, text: str, limit: int = 20):
+    """[(livro_id, nome, autor, cover_url, qtde_paginas, descricao, trecho), ...] por relevância."""
+    match = build_match_query(text)
+    if not match:
+        return []
+    with db.read() as cur:
+        cur.execute(f"""
+            SELECT l.id, l.nome, COALESCE(l.autor, ''), COALESCE(l.cover_url, ''),
+                   COALESCE(l.qtde_paginas, 0), COALESCE(l.descricao, ''),
+                   snippet(livros_fts, -1, '{HIT_START}', '{HIT_END}', '…', 12)
+            FROM livros_fts
+            JOIN livros l ON l.id = livros_fts.livro_id
+            WHERE livros_fts MATCH ?
+            ORDER BY bm25(livros_fts, 0.0, 10.0, 5.0, 1.0)
+            LIMIT ?
+        """, (match, limit))
+        return cur.fetchall()
+
+
+def search_notes(db, text: str, limit: int = 50):
+    """[(nota_id, livro_id, nome_do_livro, trecho), ...] por relevância."""
+    match = build_match_query(text)
+    if not match:
+        return []
+    with db.read() as cur:
+        cur.execute(f"""
+            SELECT a.id, COALESCE(a.livro_id, ''), COALESCE(l.nome, 'Sem livro'),
+                   snippet(anotacoes_fts, 0, '{HIT_START}', '{HIT_END}', '…', 16)
+            FROM anotacoes_fts
+            JOIN anotacoes a ON a.id = anotacoes_fts.rowid
+            LEFT JOIN livros l ON l.id = a.livro_id
+            WHERE anotacoes_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, (match, limit))
+        return cur.fetchall()
+
+
+def search_all(db, text: str):
+    """(livros, anotações) de uma vez: um job só na thread do banco."""
+    return search_books(db, text), search_notes(db, text)
+
+
+def rebuild_indexes(db):
+    """Reconstrói os dois índices do zero (recuperação/manutenção)."""
+    with db.write() as cur:
+        rebuild_livros_fts(cur)
+        cur.execute("INSERT INTO anotacoes_fts (anotacoes_fts) VALUES ('rebuild')")
+        cur.execute("INSERT INTO livros_fts (livros_fts) VALUES ('optimize')")
+        cur.execute("INSERT INTO anotacoes_fts (anotacoes_fts) VALUES ('optimize')")
+
+
+@contextmanager
+def bulk_book_index(cur):
+    """
+    Para cargas em lote dentro de um db.write(): tira o trigger livros_fts_ai
+    durante o bloco e indexa de uma vez, no fim, os livros inseridos nele
+    (disparado linha a linha, o trigger custa várias vezes um INSERT ...
+    SELECT). O trigger volta na mesma transação; se o bloco falhar, o
+    ROLLBACK desfaz tudo, inclusive o DROP.
+    """
+    trigger_sql = cur.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'livros_fts_ai'"
+    ).fetchone()[0]
+    last_rowid = cur.execute("SELECT COALESCE(MAX(rowid), 0) FROM livros").fetchone()[0]
+    cur.execute("DROP TRIGGER livros_fts_ai")
+    yield cur
+    cur.execute("INSERT INTO livros_fts_ids (livro_id) SELECT id FROM livros WHERE rowid > ?", (last_rowid,))
+    cur.execute("""
+        INSERT INTO livros_fts (rowid, livro_id, nome, autor, descricao)
+        SELECT m.fts_id, l.id, l.nome, l.autor, l.descricao
+        FROM livros l JOIN livros_fts_ids m ON m.livro_id = l.id
+        WHERE l.rowid > ?
+    """, (last_rowid,))
+    cur.execute(trigger_sql)
@@ -1,47 +1,55 @@
-import sqlite3
+import time
+_T_IMPORT = time.perf_counter()   # referência do benchmark de inicialização
+
 import os.path
 import re
 import html
-import webbrowser
-from datetime import date, timedelta, datetime
-from kivy.properties import StringProperty, NumericProperty, BooleanProperty
+import json
+from datetime import date
+from kivy.properties import StringProperty, NumericProperty, BooleanProperty, DictProperty
 from kivy.clock import Clock
-from kivy.network.urlrequest import UrlRequest
-from urllib.parse import quote_plus
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.button import MDFlatButton
-from kivymd.uix.textfield import MDTextField
 from kivymd.toast import toast
 from kivymd.app import MDApp
 from kivy.lang import Builder
 from kivy.uix.screenmanager import Screen
 from kivy.uix.behaviors import ButtonBehavior
 from kivymd.uix.boxlayout import MDBoxLayout
-from kivymd.uix.list import TwoLineAvatarIconListItem, IconRightWidget
-from functools import partial
+from kivymd.uix.list import TwoLineAvatarIconListItem, TwoLineListItem
 from kivy.metrics import dp
-from kivy.loader import Loader
 from kivy.core.text import LabelBase
 from kivy.resources import resource_add_path
 from kivy.core.window import Window
-from kivymd.uix.menu import MDDropdownMenu
-from kivy.utils import get_color_from_hex
-from kivymd.uix.card import MDSeparator
-from kivy.uix.relativelayout import RelativeLayout
-from kivy.core.window import Window
+from kivy.utils import get_color_from_hex, escape_markup
 from kivy.utils import platform
-from kivymd.uix.label import MDLabel
-from PIL import Image, ImageDraw, ImageFont
 
-# ---------- Graph (kivy-garden.graph) ----------
-try:
-    # Agora importamos também o MeshStemPlot para "barras"
-    from kivy_garden.graph import Graph, MeshLinePlot, MeshStemPlot
-    HAS_GRAPH = True
-except Exception:
-    HAS_GRAPH = False
+from database import Database
+from cover_cache import CoverCache
+from book_search import BookSearch, SearchPager
+import local_search
+import queries
+import instrumentation
+from book_keys import book_key, normalize_text
+from timer import ReadingTimer
+from progress import ProgressWriter
+from reading_stats import ReadingStats, week_range_sun_sat
+
+# Diálogos, menus, o Graph (via time_chart), o webbrowser e o Pillow (via
+# share_image) só são importados quando a tela/ação que precisa deles é usada.
+STARTUP_BENCH = bool(os.environ.get("ROOTS_STARTUP_BENCH"))
 
 # ===================== SCREENS =====================
+class CachedCoverBehavior:
+    """Troca cover_url (rede) por cover_source (arquivo local do CoverCache)."""
+
+    def on_cover_url(self, _instance, url):
+        # Célula reciclada/tela reaproveitada: limpa a capa anterior na hora
+        self.cover_source = ""
+        MDApp.get_running_app().load_cover(url, self._apply_cover)
+
+    def _apply_cover(self, url, path):
+        if path and url == self.cover_url:
+            self.cover_source = path
+
 class NoteDetailScreen(Screen):
     note_id = NumericProperty(0)
     book_id = StringProperty("")
@@ -54,14 +62,25 @@ class NoteEditorScreen(Screen):
     book_title = StringProperty("")
     note_text = StringProperty("")
 
-class BookItem(ButtonBehavior, MDBoxLayout):
+class NoteItem(TwoLineAvatarIconListItem):
+    note_id = NumericProperty(0)
+
+class SearchResultItem(TwoLineListItem):
+    result_kind = StringProperty("")   # "book" | "note"
+    payload = DictProperty({})
+
+class BookItem(CachedCoverBehavior, ButtonBehavior, MDBoxLayout):
     title = StringProperty('')
     cover_url = StringProperty('')
+    cover_source = StringProperty('')
     book_id = StringProperty('')
     authors = StringProperty('')
     page_count = NumericProperty(0)
     description = StringProperty('')
     removable = BooleanProperty(False)
+    book_status = StringProperty('')
+    progress_percent = NumericProperty(0)
+    in_library = BooleanProperty(False)
 
 class MainScreen(Screen):
     show_back = BooleanProperty(False)
@@ -74,24 +93,30 @@ class NotesScreen(Screen):
     notes_book_title = StringProperty("Selecionar livro")
 
 class TimerScreen(Screen):
+    book_title = StringProperty('')   # livro da sessão em andamento ('' = sem livro)
+
+class SearchScreen(Screen):
     pass
 
-class BookDetailScreen(Screen):
+class BookDetailScreen(CachedCoverBehavior, Screen):
     book_id = StringProperty('')
     book_title = StringProperty('')
     authors = StringProperty('')
     cover_url = StringProperty('')
+    cover_source = StringProperty('')
     page_count = NumericProperty(0)
     description = StringProperty('')
     already_added = BooleanProperty(False)
     pages_read = NumericProperty(0)
     book_status = StringProperty('Quero ler')
     progress_percent = NumericProperty(0)
+    forecast_text = StringProperty('')
 
 # ===================== APP =====================
 class RootsApp(MDApp):
     APP_BG_COLOR = get_color_from_hex("#1b2c3c")
     READING_GOAL_MIN_PER_DAY = 6  # meta diária (min). Ajuste se quiser.
+    NOTES_PAGE_SIZE = 50          # anotações carregadas por página (scroll infinito)
 
         # --- MENU DE STATUS NO DETALHE DO LIVRO ---
     def open_status_menu(self, caller):
@@ -108,6 +133,7 @@ class RootsApp(MDApp):
             {"text": "Lendo",     "on_release": lambda: (self.set_status_from_ui("Lendo"),     self._dismiss_status_menu())},
             {"text": "Lido",      "on_release": lambda: (self.set_status_from_ui("Lido"),      self._dismiss_status_menu())},
         ]
+        from kivymd.uix.menu import MDDropdownMenu
         self._status_menu = MDDropdownMenu(caller=caller, items=items, width_mult=3)
         self._status_menu.open()
 
@@ -143,28 +169,36 @@ class RootsApp(MDApp):
     def go_home(self):
         self.root.current = 'main_screen'
 
+    @instrumentation.timed_call("screen.go_graph")
     def go_graph(self):
         self.root.current = 'graph_screen'
-        # Renderiza o gráfico de TEMPO (único)
+        # Renderiza o gráfico de TEMPO da semana e o calendário de vários anos
         Clock.schedule_once(lambda *_: self.render_time_chart(), 0)
+        Clock.schedule_once(lambda *_: self.render_calendar(), 0)
+        Clock.schedule_once(lambda *_: self.render_insights(), 0)
 
+    @instrumentation.timed_call("screen.go_notes")
     def go_notes(self):
         self.root.current = 'notes_screen'
         self.load_notes()
 
+    @instrumentation.timed_call("screen.go_search")
+    def go_search(self):
+        self.root.current = 'search_screen'
+
+    @instrumentation.timed_call("screen.go_timer")
     def go_timer(self):
+        # rótulo e ticks ficam por conta de on_timer_screen_enter
         self.root.current = 'timer_screen'
-        try:
-            ts = self.root.get_screen('timer_screen')
-            if not getattr(self, "_timer_running", False):
-                ts.ids.timer_label.text = "00:00:00"
-        except Exception:
-            pass
 
     def on_back_from_search(self):
-        sm = self.root.get_screen('main_screen')
-        sm.show_back = False
-        self.load_saved_books()
+        self._cancel_search_pager()
+        library = getattr(self, "_library", None)
+        if library is None:
+            self.load_saved_books()
+        else:
+            # A biblioteca em memória já está em dia (mudanças pontuais)
+            self._show_library(library)
 
     # ------------------ UTILS ------------------
     def notify(self, msg: str):
@@ -175,10 +209,7 @@ class RootsApp(MDApp):
 
     @staticmethod
     def _normalize_text(s: str) -> str:
-        s = (s or "").lower().strip()
-        s = re.sub(r"[\s\-\_\.\,\:\;\!\?\(\)\[\]\{\}]+", " ", s)
-        s = re.sub(r"\s+", " ", s)
-        return s
+        return normalize_text(s)
 
     @staticmethod
     def clean_description(s: str) -> str:
@@ -186,8 +217,69 @@ class RootsApp(MDApp):
         s = re.sub(r'<[^>]+>', '', s)
         return html.unescape(s).strip()
 
+    def load_cover(self, url, callback):
+        """
+        Chama callback(url, caminho_local) na thread da UI. Capas em cache saem
+        na hora; as demais são baixadas (uma vez) e reduzidas em segundo plano.
+        """
+        if not url:
+            return
+        path = self.covers.get(url)
+        if path:
+            callback(url, path)
+            return
+
+        def _done(fut):
+            try:
+                local = fut.result()
+            except Exception as e:
+                print("[Capas] Falha ao baixar capa:", e)
+                return
+            Clock.schedule_once(lambda *_: callback(url, local), 0)
+
+        self.covers.fetch(url).add_done_callback(_done)
+
+    def run_db(self, fn, *args, on_done=None, on_error=None):
+        """
+        Roda fn(*args) na thread do banco (nada de SQLite na thread da UI) e
+        entrega on_done(resultado) / on_error(exceção) de volta pelo Clock.
+        """
+        def _finish(fut):
+            try:
+                result = fut.result()
+            except Exception as e:
+                handler = on_error or self._on_db_error
+                Clock.schedule_once(lambda *_, err=e: handler(err), 0)
+                return
+            if on_done:
+                Clock.schedule_once(lambda *_: on_done(result), 0)
+
+        if instrumentation.ENABLED:
+            # tempo total do job, incluindo a espera na fila da thread do banco
+            fn = self._timed_job(fn)
+        fut = self.db.submit(fn, *args)
+        fut.add_done_callback(_finish)
+        return fut
+
+    @staticmethod
+    def _timed_job(fn):
+        name = "db." + getattr(fn, "__name__", "job")
+        queued = time.perf_counter()
+
+        def _job(*args):
+            try:
+                return fn(*args)
+            finally:
+                instrumentation.record(name, (time.perf_counter() - queued) * 1000)
+        return _job
+
+    def _on_db_error(self, err):
+        print("[DB] Erro:", err)
+        self.notify("Erro ao acessar o banco de dados.")
+
     # ------------------ APP LIFECYCLE ------------------
     def build(self):
+        self._t_build = time.perf_counter()
         # Define o tema como Escuro
         self.theme_cls.theme_style = "Dark"
         
@@ -197,85 +289,136 @@ class RootsApp(MDApp):
         self.theme_cls.primary_hue = "800" # Um tom de marrom mais forte e escuro
         
         self.initialize_database()
+        # Capas guardadas no tamanho da tela de detalhe (a maior em que aparecem)
+        self.covers = CoverCache(
+            os.path.join(self.user_data_dir, "covers"),
+            max_size=(dp(110), dp(160)),
+        )
+        self.stats = ReadingStats(self.db)
+        self.timer = ReadingTimer()
+        self.progress_writer = ProgressWriter(self.db)
+        # O cache da busca lê e grava pela thread do banco (run_db), nunca na UI
+        self.book_search = BookSearch(self.db, self._normalize_text, self._make_search_request,
+                                      run=self.run_db)
         self._register_fonts()
         Window.clearcolor = self.APP_BG_COLOR
+        self._setup_debug_overlay()
         return Builder.load_file('ui.kv')
 
     def initialize_database(self):
-        db_dir = os.path.join(self.user_data_dir, "db")
-        os.makedirs(db_dir, exist_ok=True)
-        conn = sqlite3.connect(os.path.join(db_dir, "roots.db"))
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS livros (
-                id TEXT PRIMARY KEY,
-                nome TEXT NOT NULL,
-                autor TEXT,
-                cover_url TEXT,
-                qtde_paginas INTEGER,
-                status TEXT CHECK(status IN ('Lendo', 'Concluído', 'Quero ler')) DEFAULT 'Quero ler',
-                pagina_atual INTEGER DEFAULT 0,
-                nota INTEGER DEFAULT 0,
-                genero_id INTEGER,
-                descricao TEXT
-            )
-        """)
+        self.db = Database(os.path.join(self.user_data_dir, "db", "roots.db"))
+        self.db.migrate()
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS generos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tipo TEXT NOT NULL UNIQUE
-            )
-        """)
+    def on_start(self):
+        self._t_start = time.perf_counter()
+        # Só a tela visível (biblioteca) é preenchida agora. Anotações carregam
+        # no primeiro go_notes e o gráfico quando a tela de gráficos abre.
+        self.load_saved_books()
+        Window.bind(on_flip=self._on_first_frame)
+
+    def _on_first_frame(self, *_):
+        Window.unbind(on_flip=self._on_first_frame)
+        t_frame = time.perf_counter()
+        # Manutenção que não precisa bloquear a primeira tela
+        self.run_db(self.book_search.cache.purge,
+                    on_error=lambda err: print("[Busca] Falha ao limpar cache:", err))
+        self._restore_timer()
+        if STARTUP_BENCH:
+            print("ROOTS_STARTUP " + json.dumps({
+                "import_ms": round((self._t_build - _T_IMPORT) * 1000, 1),
+                "build_ms": round((self._t_start - self._t_build) * 1000, 1),
+                "first_frame_ms": round((t_frame - _T_IMPORT) * 1000, 1),
+            }), flush=True)
+            self.stop()
+
+    def on_pause(self):
+        # Android: o app pode ser morto em segundo plano sem on_stop
+        self._checkpoint_timer()
+        return True
+
+    def on_stop(self):
+        db = getattr(self, "db", None)
+        writer = getattr(self, "progress_writer", None)
+        if db and writer and writer.pending:
+            try:
+                writer.flush()
+            except Exception as e:
+                print("Erro ao atualizar progresso:", e)
+        timer = getattr(self, "timer", None)
+        if db and timer and timer.started:
+            try:
+                queries.save_timer_checkpoint(db, self._timer_book_id, timer.checkpoint())
+            except Exception as e:
+                print("[Cronômetro] Falha no checkpoint final:", e)
+        if db:
+            db.close()
+        covers = getattr(self, "covers", None)
+        if covers:
+            covers.shutdown()
+        search = getattr(self, "book_search", None)
+        if search:
+            print("[Busca] Estatísticas do cache:", search.stats())
+        if instrumentation.ENABLED:
+            self.dump_profile()
+
+    # ------------------ DEBUG (ROOTS_PROFILE=1) ------------------
+    def _setup_debug_overlay(self):
+        self._debug_label = None
+        self._debug_event = None
+        if not instrumentation.ENABLED:
+            return
+        Window.bind(on_keyboard=self._on_debug_key)
+        print("[Perf] Instrumentação ligada: F12 mostra as latências, F11 grava o JSON.")
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS progresso_diario (
-                livro_id TEXT,
-                data TEXT,
-                paginas_lidas INTEGER
-            )
-        """)
+    def _on_debug_key(self, _window, key, *args):
+        if key == 293:    # F12
+            self.toggle_debug_overlay()
+            return True
+        if key == 292:    # F11
+            self.dump_profile()
+            return True
+        return False
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS anotacoes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                livro_id TEXT,
-                texto TEXT
-            )
-        """)
-
-        # ATENÇÃO: livro_id sem NOT NULL para evitar erro ao salvar sessão sem escolher livro
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sessoes_leitura (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                livro_id TEXT,
-                inicio TEXT NOT NULL,
-                fim TEXT NOT NULL,
-                duracao_seg INTEGER NOT NULL,
-                dia TEXT NOT NULL
-            )
-        """)
+    def toggle_debug_overlay(self):
+        if self._debug_label is not None:
+            self._debug_event.cancel()
+            Window.remove_widget(self._debug_label)
+            self._debug_label = self._debug_event = None
+            return
 
-        conn.commit()
-        conn.close()
+        from kivymd.uix.label import MDLabel
+        label = MDLabel(
+            font_style="Caption",
+            theme_text_color="Custom",
+            text_color=(0.6, 1, 0.6, 1),
+            md_bg_color=(0, 0, 0, 0.75),
+            padding=(dp(8), dp(8)),
+            valign="top",
+            size_hint=(None, None),
+            size=(Window.width, Window.height * 0.4),
+            pos=(0, Window.height * 0.6),
+        )
+        Window.add_widget(label)
+        self._debug_label = label
+        self._refresh_debug_overlay()
+        self._debug_event = Clock.schedule_interval(lambda *_: self._refresh_debug_overlay(), 1.0)
 
-    def on_start(self):
-        self.load_saved_books()
-        self.load_notes()
-        # (gráfico só quando abre a tela de gráficos)
+    def _refresh_debug_overlay(self):
+        if self._debug_label is None:
+            return
+        lines = instrumentation.summary_lines() or ["(nenhuma medição ainda)"]
+        self._debug_label.text = "\n".join(lines)
 
-    # ------------------ DETALHES (livro) ------------------
-    def is_book_saved(self, book_id, title, authors) -> bool:
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+    def dump_profile(self):
+        path = os.environ.get("ROOTS_PROFILE_OUT") or os.path.join(self.user_data_dir, "roots_profile.json")
         try:
-            cursor.execute("SELECT 1 FROM livros WHERE id = ? LIMIT 1", (book_id,))
-            return cursor.fetchone() is not None
-        finally:
-            conn.close()
+            instrumentation.dump(path)
+            print("[Perf] Latências gravadas em", path)
+        except OSError as e:
+            print("[Perf] Falha ao gravar latências:", e)
 
+    # ------------------ DETALHES (livro) ------------------
+    @instrumentation.timed_call("screen.open_book_detail")
     def open_book_detail(self, book_id, title, authors, cover_url, page_count, description=''):
         detail = self.root.get_screen('detail_screen')
 
@@ -285,61 +428,61 @@ class RootsApp(MDApp):
         detail.cover_url = cover_url
         detail.page_count = int(page_count or 0)
         detail.description = description or ''
-        detail.already_added = self.is_book_saved(book_id, title, authors)
 
-        # --- INÍCIO DA CORREÇÃO ---
-        # Pega os widgets pelo ID que definimos no arquivo .kv
-        progress_layout = detail.ids.progress_layout
-        separator = detail.ids.separator
-
-        # Lógica para mostrar ou esconder a barra de progresso
-        if detail.already_added:
-            # Se o livro está na biblioteca, mostra a barra e o separador
-            progress_layout.opacity = 1
-            progress_layout.height = progress_layout.minimum_height
-            progress_layout.size_hint_y = None
-            
-            separator.opacity = 1
-            separator.height = dp(1)
-            
-            # Carrega os dados do banco de dados
-            Clock.schedule_once(lambda *_: self._hydrate_detail_from_db(book_id), 0)
-        else:
-            # Se o livro NÃO está na biblioteca, esconde a barra e o separador
-            progress_layout.opacity = 0
-            progress_layout.height = 0
-            progress_layout.size_hint_y = None
-
-            separator.opacity = 0
-            separator.height = 0
-            
-            # Reseta os valores para um livro não salvo
-            detail.pages_read = 0
-            detail.book_status = 'Quero ler'
-            self._refresh_detail_progress()
-        # --- FIM DA CORREÇÃO ---
+        # Abre como livro não salvo; se ele estiver na biblioteca, a hidratação
+        # (na thread do banco) troca o id e mostra a barra de progresso
+        detail.already_added = False
+        self._show_detail_progress(detail, False)
+        detail.pages_read = 0
+        detail.book_status = 'Quero ler'
+        detail.forecast_text = ''
+        self._refresh_detail_progress()
 
         self.root.current = 'detail_screen'
+        self._hydrate_detail_from_db(book_id, title, authors)
 
-    def _hydrate_detail_from_db(self, book_id):
+    @staticmethod
+    def _show_detail_progress(detail, visible):
+        """Mostra ou esconde a barra de progresso e o separador (ids do .kv)."""
+        progress_layout = detail.ids.progress_layout
+        separator = detail.ids.separator
+        progress_layout.opacity = 1 if visible else 0
+        progress_layout.height = progress_layout.minimum_height if visible else 0
+        progress_layout.size_hint_y = None
+        separator.opacity = 1 if visible else 0
+        separator.height = dp(1) if visible else 0
+
+    def _hydrate_detail_from_db(self, book_id, title, authors):
+        # O mesmo livro pode voltar da busca com outro id do Google Books:
+        # o job resolve o id com que ele está salvo e já traz o estado
+        def _done(result):
+            detail = self.root.get_screen('detail_screen')
+            if detail.book_id != book_id or result is None:
+                return  # outro livro aberto, ou este não está salvo
+            saved_id, row = result
+            detail.book_id = saved_id
+            detail.already_added = True
+            self._show_detail_progress(detail, True)
+            self._apply_detail_state(saved_id, row)
+            self._load_forecast(saved_id)
+
+        self.run_db(queries.fetch_saved_book_state, self.db, book_id, title, authors, on_done=_done)
+
+    def _load_forecast(self, book_id):
+        """Ritmo e previsão de término (forecast.py: só buscas por chave, sem ler o histórico)."""
+        import forecast
+
+        def _show(fc):
+            detail = self.root.get_screen('detail_screen')
+            if detail.book_id == book_id and detail.already_added:
+                detail.forecast_text = forecast.describe(fc)
+
+        self.run_db(forecast.book_forecast, self.db, book_id, on_done=_show)
+
+    def _apply_detail_state(self, book_id, row):
         detail = self.root.get_screen('detail_screen')
-        if not detail.already_added:
-            return
-
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        try:
-            cur.execute("""
-                SELECT COALESCE(pagina_atual,0),
-                       COALESCE(status,'Quero ler'),
-                       COALESCE(qtde_paginas,0)
-                FROM livros WHERE id = ?
-            """, (book_id,))
-            row = cur.fetchone()
-        finally:
-            conn.close()
-
+        if detail.book_id != book_id:
+            return  # o usuário já abriu outro livro
         if row:
             detail.pages_read = int(row[0] or 0)
             detail.book_status = row[1] or 'Quero ler'
@@ -348,27 +491,41 @@ class RootsApp(MDApp):
             self._refresh_detail_progress()
 
     def save_from_detail(self):
-        def _do_save(*_):
-            try:
-                detail = self.root.get_screen('detail_screen')
-                ok = self.save_book_to_database(
-                    detail.book_id, detail.book_title, detail.authors,
-                    detail.cover_url, detail.page_count, detail.description or ''
-                )
-                if ok:
-                    self.notify(f"'{detail.book_title}' adicionado à sua lista!")
-                    self.go_home()
-            except Exception as e:
-                import traceback; traceback.print_exc()
-                self.notify(f"Falha ao adicionar: {e}")
-
-        Clock.schedule_once(_do_save, 0)
+        detail = self.root.get_screen('detail_screen')
+        self.save_book_to_database(
+            detail.book_id, detail.book_title, detail.authors,
+            detail.cover_url, detail.page_count, detail.description or '',
+            on_saved=lambda: self.go_home(),
+        )
 
     # ------------------ BUSCA ------------------
+    @staticmethod
+    def _book_item_data(book_id, title, authors, cover_url, page_count, description, removable,
+                        pages_read=0, status='Quero ler'):
+        """Linha do RecycleView da biblioteca (vira as propriedades de um BookItem)."""
+        page_count = int(page_count or 0)
+        pages_read = int(pages_read or 0)
+        return {
+            "book_id": book_id or "",
+            "title": title or "",
+            "authors": authors or "",
+            "cover_url": cover_url or "",
+            "page_count": page_count,
+            "description": description or "",
+            "removable": removable,
+            "book_status": status or 'Quero ler',
+            "progress_percent": int(round(min(pages_read, page_count) * 100 / page_count)) if page_count > 0 else 0,
+            "in_library": removable,
+        }
+
+    SEARCH_MIN_RESULTS = 12      # busca mais páginas até ter isso (só entram livros com capa)
+    SEARCH_SCROLL_THRESHOLD = 0.15   # scroll_y do RecycleView (0 = fim da lista)
+
     def add_book_search(self, query):
         sm = self.root.get_screen('main_screen')
-        books_grid = sm.ids.books_grid
-        books_grid.clear_widgets()
+        books_rv = sm.ids.books_rv
+        books_rv.data = []
+        self._cancel_search_pager()
 
         q = (query or "").strip()
         if not q:
@@ -378,20 +535,16 @@ class RootsApp(MDApp):
 
         sm.show_back = True
 
-        api_url = (
-            "https://www.googleapis.com/books/v1/volumes"
-            f"?q={quote_plus(q)}"
-            "&printType=books"
-            "&orderBy=relevance"
-            "&maxResults=30"
-            "&langRestrict=pt"
-        )
-
         seen_ids = set()
         seen_title_author = set()
+        # Uma busca mais nova descarta a marcação "já salvo" de uma antiga
+        self._search_seq = seq = getattr(self, "_search_seq", 0) + 1
 
-        def ok(req, result):
-            added = 0
+        def on_page(result, page, last):
+            if seq != self._search_seq:
+                return
+            results = []
+            keys = []
             items = (result or {}).get('items') or []
             for item in items:
                 volume_info = item.get('volumeInfo', {}) or {}
@@ -408,7 +561,7 @@ class RootsApp(MDApp):
 
                 if book_id and book_id in seen_ids:
                     continue
-                ta_key = f"{self._normalize_text(title)}|{self._normalize_text(authors)}"
+                ta_key = book_key(title, authors)
                 if ta_key in seen_title_author:
                     continue
 
@@ -416,273 +569,354 @@ class RootsApp(MDApp):
                     seen_ids.add(book_id)
                 seen_title_author.add(ta_key)
 
-                books_grid.add_widget(BookItem(
-                    book_id=book_id,
-                    title=title,
-                    authors=authors,
-                    cover_url=cover_url,
-                    page_count=page_count,
-                    description=description,
-                    removable=False
+                results.append(self._book_item_data(
+                    book_id, title, authors, cover_url, page_count, description, removable=False
                 ))
-                added += 1
-
-            if added == 0:
+                keys.append(ta_key)
+
+            # Cada página entra no fim da lista; o que já está na tela não muda
+            start = len(books_rv.data)
+            if results:
+                books_rv.data.extend(results)
+                # Marca de uma vez (uma consulta) o que já está na biblioteca
+                self.run_db(queries.saved_keys, self.db, keys,
+                            on_done=lambda saved: _mark_saved(start, results, keys, saved))
+
+            shown = len(books_rv.data)
+            if not shown and last:
                 self.notify("Nada encontrado.")
                 sm.show_back = False
-            else:
-                sm.show_back = True
+            elif not last and shown < self.SEARCH_MIN_RESULTS:
+                # Poucas capas nesta página: completa a tela sem esperar a rolagem
+                pager.more()
+
+        def _mark_saved(start, results, keys, saved):
+            if seq != self._search_seq or not saved or not sm.show_back:
+                return
+            if not any(key in saved for key in keys):
+                return
+            books_rv.data[start:start + len(results)] = [
+                dict(row, in_library=True) if key in saved else row for row, key in zip(results, keys)
+            ]
 
-        def fail(req, err):
+        def fail(err):
             print("Erro na busca:", err)
+            if seq != self._search_seq:
+                return
+            if books_rv.data:
+                self.notify("Não consegui carregar mais resultados.")
+                return
             sm.show_back = False
             self.notify("Erro ao buscar livros, Verifique sua conexão.")
 
-        UrlRequest(api_url, on_success=ok, on_error=fail, on_failure=fail, decode=True)
+        # Cache por página + cancelamento da busca anterior (book_search.py);
+        # o pager pré-carrega a próxima página enquanto a atual está na tela
+        pager = self._search_pager = SearchPager(self.book_search, q, on_page, fail)
+        pager.start()
 
-    # ------------------ DB: livros ------------------
-    def save_book_to_database(self, book_id, title, authors, cover_url, page_count, description=''):
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+    def on_books_scroll(self, scroll_y):
+        """Rolagem infinita: perto do fim da lista de resultados, pede a próxima página."""
+        pager = getattr(self, "_search_pager", None)
+        if pager is None or scroll_y > self.SEARCH_SCROLL_THRESHOLD:
+            return
+        if self.root.get_screen('main_screen').show_back:
+            pager.more()
+
+    def _cancel_search_pager(self):
+        pager = getattr(self, "_search_pager", None)
+        if pager is not None:
+            pager.cancel()
+            self._search_pager = None
 
+    @staticmethod
+    def _make_search_request(url, on_success, on_error):
+        from kivy.network.urlrequest import UrlRequest
+        return UrlRequest(url, on_success=on_success, on_error=on_error, on_failure=on_error, decode=True)
+
+    # ------------------ DB: livros ------------------
+    def save_book_to_database(self, book_id, title, authors, cover_url, page_count, description='', on_saved=None):
         try:
             page_count = int(page_count) if page_count is not None else 0
         except (ValueError, TypeError):
             page_count = 0
 
-        try:
-            cursor.execute("""
-                INSERT OR IGNORE INTO livros (
-                    id, nome, autor, cover_url, qtde_paginas, status, pagina_atual, nota, genero_id, descricao
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (book_id, title, authors, cover_url, page_count, 'Quero ler', 0, 0, None, description))
-            conn.commit()
-            self.load_saved_books()
-            self.notify(f"'{title}' adicionado à sua lista!")
-            return True
-        except sqlite3.Error as e:
-            print(f"Erro ao salvar livro: {e}")
-            return False
-        finally:
-            conn.close()
+        def _saved(inserted):
+            if inserted:
+                self._library_insert(self._book_item_data(
+                    book_id, title, authors, cover_url, page_count, description, removable=True
+                ))
+                self.notify(f"'{title}' adicionado à sua lista!")
+            else:
+                self.notify(f"'{title}' já está na sua lista.")
+            if on_saved:
+                on_saved()
+
+        def _failed(err):
+            print(f"Erro ao salvar livro: {err}")
+            self.notify(f"Falha ao adicionar: {err}")
+
+        self.run_db(queries.save_book, self.db, book_id, title, authors, cover_url, page_count, description,
+                    on_done=_saved, on_error=_failed)
 
     def load_saved_books(self):
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, nome, autor, cover_url, COALESCE(qtde_paginas,0), COALESCE(descricao,'')
-            FROM livros
-            ORDER BY rowid DESC
-        """)
-        rows = cursor.fetchall()
-        conn.close()
-
-        grid = self.root.get_screen('main_screen').ids.books_grid
-        grid.clear_widgets()
-        self.root.get_screen('main_screen').show_back = False
-
-        seen = set()
-        for book_id, title, authors, cover_url, page_count, description in rows:
-            key = f"{self._normalize_text(title)}|{self._normalize_text(authors)}"
-            if key in seen:
-                continue
-            seen.add(key)
-
-            grid.add_widget(BookItem(
-                book_id=book_id,
-                title=title,
-                authors=authors,
-                cover_url=cover_url,
-                page_count=page_count,
-                description=description,
-                removable=True
-            ))
-
-            if cover_url:
-                Loader.image(cover_url)
+        def _build():
+            # Roda na thread do banco: consulta + montagem das linhas
+            # Duplicatas (título+autores) já são barradas pelo índice único
+            return [
+                self._book_item_data(
+                    book_id, title, authors, cover_url, page_count, description, removable=True,
+                    pages_read=pages_read, status=status,
+                )
+                for (book_id, title, authors, cover_url, page_count, description,
+                     pages_read, status) in queries.fetch_library(self.db)
+            ]
+
+        self.run_db(_build, on_done=self._show_library)
+
+    @instrumentation.timed_call("ui.library_rebuild")
+    def _show_library(self, data):
+        sm = self.root.get_screen('main_screen')
+        sm.show_back = False
+        if data is not getattr(self, "_library", None):
+            self._library = data
+            self._reindex_library()
+        # Sem widgets por livro: o RecycleView monta só as células visíveis
+        sm.ids.books_rv.data = list(data)
+
+    # Mudanças pontuais: mexem só no item afetado, sem reconsultar a tabela.
+    # self._library é a biblioteca em memória; books_rv.data só a espelha
+    # (mesma ordem) enquanto a tela principal não está mostrando resultados
+    # de busca.
+    #
+    # self._library_pos: book_id -> posição "absoluta"; o índice na lista é
+    # posição - self._library_base. Inserir no topo só baixa a base, então
+    # achar um livro (progresso, status) não percorre a biblioteca.
+    def _reindex_library(self):
+        self._library_base = 0
+        self._library_pos = {row["book_id"]: i for i, row in enumerate(self._library)}
+
+    def _library_rv(self):
+        sm = self.root.get_screen('main_screen')
+        return None if sm.show_back else sm.ids.books_rv
+
+    def _index_of_book(self, book_id):
+        pos = getattr(self, "_library_pos", {}).get(book_id)
+        return -1 if pos is None else pos - self._library_base
+
+    @instrumentation.timed_call("ui.library_insert")
+    def _library_insert(self, item):
+        library = getattr(self, "_library", None)
+        if library is None or self._index_of_book(item["book_id"]) >= 0:
+            return
+        library.insert(0, item)
+        self._library_base -= 1
+        self._library_pos[item["book_id"]] = self._library_base
+        rv = self._library_rv()
+        if rv is not None:
+            rv.data.insert(0, item)
+
+    @instrumentation.timed_call("ui.library_remove")
+    def _library_remove(self, book_id):
+        i = self._index_of_book(book_id)
+        if i < 0:
+            return
+        library = self._library
+        del library[i]
+        del self._library_pos[book_id]
+        # Só os livros depois do removido sobem uma posição
+        for row in library[i:]:
+            self._library_pos[row["book_id"]] -= 1
+        rv = self._library_rv()
+        if rv is not None:
+            del rv.data[i]
+
+    @instrumentation.timed_call("ui.library_update")
+    def _library_update(self, book_id, pages_read, status):
+        i = self._index_of_book(book_id)
+        if i < 0:
+            return
+        library = self._library
+        row = library[i]
+        library[i] = self._book_item_data(
+            book_id, row["title"], row["authors"], row["cover_url"], row["page_count"],
+            row["description"], removable=True, pages_read=pages_read, status=status,
+        )
+        rv = self._library_rv()
+        if rv is not None:
+            rv.data[i] = library[i]
 
     def delete_book(self, book_id, title=None):
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        try:
-            cursor.execute("DELETE FROM progresso_diario WHERE livro_id = ?", (book_id,))
-            cursor.execute("DELETE FROM anotacoes WHERE livro_id = ?", (book_id,))
-            cursor.execute("DELETE FROM livros WHERE id = ?", (book_id,))
-            conn.commit()
-            self.load_saved_books()
+        def _deleted(_result):
+            self._library_remove(book_id)
+            if self._timer_book_id == book_id:
+                self._set_timer_book(None)   # a sessão em andamento continua, sem livro
             self.notify(f"'{title}' removido." if title else "Livro removido.")
-        except sqlite3.Error as e:
-            print(f"Erro ao remover livro: {e}")
+
+        def _failed(err):
+            print(f"Erro ao remover livro: {err}")
             self.notify("Falha ao remover.")
-        finally:
-            conn.close()
+
+        self.run_db(queries.delete_book, self.db, book_id, on_done=_deleted, on_error=_failed)
 
     # ------------------ GRÁFICO: TEMPO DE LEITURA ------------------
     def _week_range_sun_sat(self):
         """
         Retorna (start, end) da semana DOM->SÁB da data atual.
         """
-        today = date.today()
-        days_since_sun = (today.weekday() + 1) % 7  # dom -> 0
-        start = today - timedelta(days=days_since_sun)
-        end = start + timedelta(days=6)
-        return start, end
+        return week_range_sun_sat()
 
     def render_time_chart(self):
         """
         Gráfico ÚNICO: TEMPO de leitura na semana atual (Dom-Sáb).
-        Usa os recursos do próprio Graph para desenhar os rótulos dos dias,
-        garantindo o alinhamento perfeito.
+        Os dados vêm da thread do banco; o desenho acontece em _draw_time_chart.
         """
-        from kivymd.uix.boxlayout import MDBoxLayout
-        from kivymd.uix.label import MDLabel
-        from kivymd.uix.card import MDSeparator
-
-        try:
-            gs = self.root.get_screen('graph_screen')
-            box = gs.ids.chart_time
-        except Exception:
-            return
+        # Memorizado até a próxima sessão salva (reading_stats.py)
+        self.run_db(self.stats.summary, *self._week_range_sun_sat(), on_done=self._draw_time_chart)
 
-        box.clear_widgets()
-
-        start, end = self._week_range_sun_sat()
-
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT date(COALESCE(dia, inicio)) AS d,
-                   SUM(COALESCE(duracao_seg, 0)) AS segs
-            FROM sessoes_leitura
-            WHERE date(COALESCE(dia, inicio)) BETWEEN ? AND ?
-            GROUP BY date(COALESCE(dia, inicio))
-            ORDER BY d
-        """, (start.isoformat(), end.isoformat()))
-        rows = dict(cur.fetchall())
-        conn.close()
-
-        xs, ys = [], []
-        d = start
-        for i in range(7):
-            xs.append(i)
-            secs = int(rows.get(d.isoformat(), 0))
-            mins = secs // 60
-            ys.append(mins)
-            d += timedelta(days=1)
-
-        y_max = 120
-        y_tick = 30
-
-        box.add_widget(MDLabel(text="Tempo de leitura (min) — semana atual (Dom->Sáb)",
-                               halign="center", size_hint_y=None, height=dp(24), bold=True))
-
-        if not HAS_GRAPH:
-            return
-        
-        graph = Graph(
-            xlabel='Dias',
-            ylabel='Minutos',
-            x_ticks_minor=0,
-            y_ticks_major=y_tick, 
-            y_grid_label=True,
-            x_grid=True, 
-            y_grid=True,
-            xmin=-0.5, 
-            xmax=6.5,
-            ymin=0, 
-            ymax=y_max,
-            size_hint=(1, None), 
-            height=dp(260),
-            padding=dp(5) 
-        )
+    @instrumentation.timed_call("ui.render_time_chart")
+    def _draw_time_chart(self, week):
+        """
+        Na primeira vez monta o gráfico (time_chart.TimeChart); depois só
+        atualiza pontos e textos, sem recriar widgets.
+        """
+        chart = getattr(self, "_time_chart", None)
+        if chart is None:
+            from time_chart import TimeChart
+            try:
+                box = self.root.get_screen('graph_screen').ids.chart_time
+            except Exception:
+                return
+            chart = self._time_chart = TimeChart(box, self.theme_cls.primary_color)
+        chart.update(week)
 
-        week_days = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"]
-        graph.x_ticks_major = 1  
-        graph.x_labels = [week_days[i] for i in range(7)] 
+    # ------------------ QUANDO E O QUE SE LÊ ------------------
+    def render_insights(self):
+        """
+        Dia/hora com mais leitura e livro com mais tempo, lidos do cubo, e o
+        livro da semana do gráfico, do resumo diário por livro (analytics.py).
+        """
+        self.run_db(self._load_insights, on_done=self._draw_insights)
 
+    def _load_insights(self):
+        import analytics
+        return analytics.highlights(self.db), analytics.top_book_between(self.db, *self._week_range_sun_sat())
 
+    def _draw_insights(self, result):
+        h, week_book = result
         try:
-            bar_plot = MeshStemPlot(color=[1, 1, 1, 1])
-            bar_plot.points = list(zip(xs, ys))
-            graph.add_plot(bar_plot)
+            label = self.root.get_screen('graph_screen').ids.reading_insights
         except Exception:
-            line_fallback = MeshLinePlot(color=self.theme_cls.primary_color)
-            line_fallback.points = list(zip(xs, ys))
-            graph.add_plot(line_fallback)
-
-        media = sum(ys) / 7.0 if ys else 0.0
-        avg_plot = MeshLinePlot(color=[1, 0, 0, 1])
-        avg_plot.points = [(x, media) for x in xs]
-        graph.add_plot(avg_plot)
-
-        box.add_widget(graph)
-
-        day_labels_layout = MDBoxLayout(
-            orientation='horizontal',
-            size_hint_y=None,
-            height=dp(20),
-            padding=(dp(68), 0, dp(10), 0)
-        )
-
-        week_days = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"]
-        for label in week_days:
-            day_labels_layout.add_widget(MDLabel(text=label, halign='center'))
-
-        box.add_widget(day_labels_layout)
-
-        box.add_widget(MDLabel(
-            text=f"Média: {media:.1f} min/dia",
-            halign="center",
-            size_hint_y=None,
-            height=dp(22),
-            theme_text_color="Secondary"
-        ))
-
-        box.add_widget(MDBoxLayout(size_hint_y=None, height=dp(20)))
-        box.add_widget(MDSeparator())
-        box.add_widget(MDBoxLayout(size_hint_y=None, height=dp(10)))
-
-        total_minutes = sum(ys)
-        max_minutes = max(ys) if ys else 0
-        min_minutes = min(ys) if ys else 0
-        
-        most_productive_day = week_days[ys.index(max_minutes)] if total_minutes > 0 else "Nenhum"
-        least_productive_day = week_days[ys.index(min_minutes)] if total_minutes > 0 else "Nenhum"
+            return
+        if not h.sessions:
+            label.text = ""
+            return
+        lines = [f"Quando você mais lê: [b]{h.weekday}[/b]" + (f", por volta das [b]{h.hour}h[/b]" if h.hour >= 0 else "")]
+        if week_book:
+            lines.append(f"Mais lido nesta semana: [b]{escape_markup(week_book[0])}[/b] ({week_book[1] // 60} min)")
+        if h.book_title:
+            lines.append(f"Livro com mais tempo: [b]{escape_markup(h.book_title)}[/b] ({h.book_minutes} min)")
+        lines.append(f"{h.sessions} sessões, {h.total_minutes} min no total")
+        label.text = "\n".join(lines)
+
+    # ------------------ CALENDÁRIO DE LEITURA (VÁRIOS ANOS) ------------------
+    def render_calendar(self):
+        """
+        Mapa de calor dos últimos anos. Agrupar os dias e gerar os pixels
+        (heatmap.py) roda na thread do banco; na UI só sobe a textura.
+        """
+        self.run_db(self._load_calendar, on_done=self._draw_calendar)
+
+    def _load_calendar(self):
+        """(grade, imagens) ou None se nada mudou desde a última vez (thread do banco)."""
+        import heatmap
+        key = (date.today(), self.db.data_version("sessoes_leitura"), self.db.data_version("progresso_diario"))
+        if key == getattr(self, "_calendar_key", None):
+            return None
+        grid = heatmap.load_calendar(self.db)
+        images = {metric: heatmap.render_rgba(grid, metric) for metric in heatmap.THRESHOLDS}
+        self._calendar_key = key
+        return grid, images
+
+    @instrumentation.timed_call("ui.render_calendar")
+    def _draw_calendar(self, result):
+        if result is None:
+            return
+        chart = getattr(self, "_calendar_chart", None)
+        if chart is None:
+            from calendar_chart import CalendarChart
+            try:
+                box = self.root.get_screen('graph_screen').ids.chart_calendar
+            except Exception:
+                return
+            chart = self._calendar_chart = CalendarChart(box)
+        chart.update(*result)
 
-        total_label = MDLabel(
-            text=f"Total de minutos lidos na semana: [b]{total_minutes}[/b]",
-            halign="center", size_hint_y=None, height=dp(20), markup=True
-        )
-        max_day_label = MDLabel(
-            text=f"Dia mais produtivo: [b]{most_productive_day}[/b] ({max_minutes} min)",
-            halign="center", size_hint_y=None, height=dp(20), markup=True
-        )
-        min_day_label = MDLabel(
-            text=f"Dia com menor leitura: [b]{least_productive_day}[/b] ({min_minutes} min)",
-            halign="center", size_hint_y=None, height=dp(20), markup=True
-        )
+    # ------------------ BUSCA OFFLINE (FTS5) ------------------
+    def schedule_local_search(self, text):
+        # Debounce: só consulta quando o usuário para de digitar
+        self._local_search_text = text
+        if not getattr(self, "_local_search_trigger", None):
+            self._local_search_trigger = Clock.create_trigger(lambda *_: self.run_local_search(), 0.25)
+        self._local_search_trigger()
 
-        box.add_widget(total_label)
-        box.add_widget(max_day_label)
-        box.add_widget(min_day_label)
+    @staticmethod
+    def _search_snippet_markup(snippet):
+        text = escape_markup((snippet or "").replace("\n", " "))
+        return text.replace(local_search.HIT_START, "[b]").replace(local_search.HIT_END, "[/b]")
+
+    def run_local_search(self):
+        text = getattr(self, "_local_search_text", "")
+        # Uma consulta mais nova descarta a resposta de uma antiga
+        self._local_search_seq = seq = getattr(self, "_local_search_seq", 0) + 1
+
+        def _failed(err):
+            print("Erro na busca local:", err)
+            self.notify("Falha na busca.")
+
+        self.run_db(local_search.search_all, self.db, text,
+                    on_done=lambda found: seq == self._local_search_seq and self._show_local_results(*found),
+                    on_error=_failed)
+
+    @instrumentation.timed_call("search.local")
+    def _show_local_results(self, books, notes):
+        rv = self.root.get_screen('search_screen').ids.search_rv
+        data = []
+        for book_id, title, authors, cover_url, page_count, description, snippet in books:
+            data.append({
+                "text": escape_markup(title),
+                "secondary_text": self._search_snippet_markup(snippet),
+                "result_kind": "book",
+                "payload": {
+                    "book_id": book_id, "title": title, "authors": authors,
+                    "cover_url": cover_url, "page_count": page_count, "description": description,
+                },
+            })
+        for note_id, _book_id, book_title, snippet in notes:
+            data.append({
+                "text": f"Anotação — {escape_markup(book_title)}",
+                "secondary_text": self._search_snippet_markup(snippet),
+                "result_kind": "note",
+                "payload": {"note_id": note_id},
+            })
+        rv.data = data
+
+    def open_search_result(self, kind, payload):
+        if kind == "book":
+            self.open_book_detail(
+                payload["book_id"], payload["title"], payload["authors"],
+                payload["cover_url"], payload["page_count"], payload["description"],
+            )
+        elif kind == "note":
+            self.open_note_detail(payload["note_id"])
 
     # ------------------ ANOTAÇÕES ------------------
     def open_book_picker(self):
         ns = self.root.get_screen('notes_screen')
         btn = ns.ids.book_select_btn
 
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, nome FROM livros ORDER BY nome COLLATE NOCASE ASC")
-        books = cursor.fetchall()
-        conn.close()
+        self.run_db(queries.list_book_titles, self.db, on_done=lambda books: self._open_book_picker_menu(btn, books))
 
+    def _open_book_picker_menu(self, btn, books):
         items = [{"text": "Todos", "on_release": lambda: self._pick_book_for_note("", "Todos")}]
         if books:
             items += [{
@@ -690,6 +924,7 @@ class RootsApp(MDApp):
                 "on_release": (lambda b_id=bid, t=title: self._pick_book_for_note(b_id, t))
             } for bid, title in books]
 
+        from kivymd.uix.menu import MDDropdownMenu
         self._notes_menu = MDDropdownMenu(caller=btn, items=items, width_mult=4)
         self._notes_menu.open()
 
@@ -714,55 +949,60 @@ class RootsApp(MDApp):
         self.open_note_editor(note_id=0, book_id=bid, book_title=ns.notes_book_title, note_text="")
 
     def load_notes(self, filter_book_id=None):
+        """Recomeça a lista de anotações do topo (primeira página)."""
         ns = self.root.get_screen('notes_screen')
-        lst = ns.ids.notes_list
-        lst.clear_widgets()
-
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        if filter_book_id:
-            cursor.execute("""
-                SELECT a.id, COALESCE(l.nome, 'Sem livro'), a.texto, a.livro_id
-                FROM anotacoes a
-                LEFT JOIN livros l ON l.id = a.livro_id
-                WHERE a.livro_id = ?
-                ORDER BY a.id DESC
-            """, (filter_book_id,))
-        else:
-            cursor.execute("""
-                SELECT a.id, COALESCE(l.nome, 'Sem livro'), a.texto, a.livro_id
-                FROM anotacoes a
-                LEFT JOIN livros l ON l.id = a.livro_id
-                ORDER BY a.id DESC
-            """)
-        rows = cursor.fetchall()
-        conn.close()
-
-        for note_id, book_title, text, livro_id in rows:
-            preview = (text or "").replace("\n", " ")
-            if len(preview) > 80:
-                preview = preview[:80] + "…"
-
-            item = TwoLineAvatarIconListItem(text=book_title, secondary_text=preview)
-            item.bind(on_release=partial(self.open_note_detail, note_id))
-            item.add_widget(IconRightWidget(icon="pencil", on_release=partial(self.open_note_editor, note_id)))
-            item.add_widget(IconRightWidget(icon="delete", on_release=partial(self.delete_note_confirm, note_id)))
-            lst.add_widget(item)
+        ns.ids.notes_rv.data = []
+        self._notes_filter = filter_book_id or None
+        self._notes_last_id = None
+        self._notes_exhausted = False
+        self._notes_loading = False
+        # Páginas pedidas antes do reinício chegam com geração antiga e são ignoradas
+        self._notes_generation = getattr(self, "_notes_generation", 0) + 1
+        self._load_notes_page()
+
+    def on_notes_scroll(self, rv):
+        # scroll_y vai de 1 (topo) a 0 (fim): perto do fim, busca a próxima página
+        if rv.scroll_y <= 0.1 and not getattr(self, "_notes_exhausted", True):
+            self._load_notes_page()
+
+    def _load_notes_page(self):
+        if self._notes_loading:
+            return
+        self._notes_loading = True
+        generation = self._notes_generation
+
+        def _failed(err):
+            if generation == self._notes_generation:
+                self._notes_loading = False
+            self._on_db_error(err)
+
+        self.run_db(
+            queries.fetch_notes_page, self.db, self._notes_filter, self._notes_last_id, self.NOTES_PAGE_SIZE,
+            on_done=lambda rows: self._append_notes_page(generation, rows),
+            on_error=_failed,
+        )
+
+    @instrumentation.timed_call("ui.notes_page")
+    def _append_notes_page(self, generation, rows):
+        if generation != self._notes_generation:
+            return
+        self._notes_loading = False
+        if len(rows) < self.NOTES_PAGE_SIZE:
+            self._notes_exhausted = True
+        if not rows:
+            return
+        self._notes_last_id = rows[-1][0]
+
+        rv = self.root.get_screen('notes_screen').ids.notes_rv
+        rv.data.extend(
+            {"note_id": note_id, "text": book_title, "secondary_text": preview}
+            for note_id, book_title, preview in rows
+        )
 
     def open_note_detail(self, note_id, *args):
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT a.id, a.texto, COALESCE(l.id,''), COALESCE(l.nome,'Sem livro')
-            FROM anotacoes a
-            LEFT JOIN livros l ON l.id = a.livro_id
-            WHERE a.id = ?
-        """, (note_id,))
-        row = cursor.fetchone()
-        conn.close()
+        self.run_db(queries.fetch_note, self.db, note_id, on_done=self._show_note_detail)
 
+    def _show_note_detail(self, row):
         if not row:
             self.notify("Anotação não encontrada.")
             return
@@ -775,33 +1015,20 @@ class RootsApp(MDApp):
         self.root.current = 'note_detail'
 
     def open_note_editor(self, note_id=0, *args, book_id="", book_title="", note_text=""):
-        editor = self.root.get_screen('note_editor')
-
         if note_id:
-            db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT a.id, a.texto, COALESCE(l.id,''), COALESCE(l.nome,'Sem livro')
-                FROM anotacoes a
-                LEFT JOIN livros l ON l.id = a.livro_id
-                WHERE a.id = ?
-            """, (note_id,))
-            row = cursor.fetchone()
-            conn.close()
-            if not row:
-                self.notify("Anotação não encontrada.")
-                return
-            editor.note_id = int(row[0])
-            editor.note_text = row[1] or ""
-            editor.book_id = row[2] or ""
-            editor.book_title = row[3] or "Sem livro"
-        else:
-            editor.note_id = 0
-            editor.note_text = note_text or ""
-            editor.book_id = book_id or ""
-            editor.book_title = book_title or "Sem livro"
+            self.run_db(queries.fetch_note, self.db, note_id, on_done=self._show_note_editor)
+            return
+        self._show_note_editor((0, note_text, book_id, book_title))
 
+    def _show_note_editor(self, row):
+        if not row:
+            self.notify("Anotação não encontrada.")
+            return
+        editor = self.root.get_screen('note_editor')
+        editor.note_id = int(row[0] or 0)
+        editor.note_text = row[1] or ""
+        editor.book_id = row[2] or ""
+        editor.book_title = row[3] or "Sem livro"
         editor.ids.editor_text.text = editor.note_text
         self.root.current = 'note_editor'
 
@@ -812,36 +1039,21 @@ class RootsApp(MDApp):
             self.notify("Escreva algo na anotação.")
             return
 
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        try:
-            if editor.note_id:  # editar
-                cursor.execute(
-                    "UPDATE anotacoes SET texto = ?, livro_id = ? WHERE id = ?",
-                    (text, editor.book_id or None, editor.note_id)
-                )
-                note_id = editor.note_id
-            else:  # criar
-                if not editor.book_id:
-                    self.notify("Selecione um livro para a nova anotação.")
-                    conn.close()
-                    return
-                cursor.execute(
-                    "INSERT INTO anotacoes (livro_id, texto) VALUES (?, ?)",
-                    (editor.book_id, text)
-                )
-                note_id = cursor.lastrowid
-            conn.commit()
-        except sqlite3.Error as e:
-            print("Erro ao salvar anotação:", e)
-            self.notify("Erro ao salvar anotação.")
-            conn.close()
+        if not editor.note_id and not editor.book_id:
+            self.notify("Selecione um livro para a nova anotação.")
             return
-        conn.close()
 
-        self.load_notes()
-        self.open_note_detail(note_id)
+        def _saved(note_id):
+            self.load_notes()
+            self.open_note_detail(note_id)
+
+        def _failed(err):
+            print("Erro ao salvar anotação:", err)
+            self.notify("Erro ao salvar anotação.")
+
+        # editar (note_id) ou criar (0)
+        self.run_db(queries.save_note, self.db, editor.note_id, editor.book_id, text,
+                    on_done=_saved, on_error=_failed)
 
     def delete_note_confirm(self, note_id, *args):
         self._pending_delete_note_id = int(note_id)
@@ -850,18 +1062,10 @@ class RootsApp(MDApp):
             nid = getattr(self, "_pending_delete_note_id", 0)
             if not nid:
                 return
-            db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-            conn = sqlite3.connect(db_path)
-            cur = conn.cursor()
-            try:
-                cur.execute("DELETE FROM anotacoes WHERE id = ?", (nid,))
-                conn.commit()
-            except sqlite3.Error as e:
-                print("Erro ao apagar anotação:", e)
-                self.notify("Falha ao apagar anotação.")
-                conn.close()
-                return
-            conn.close()
+            self._dismiss_delete_dialog()
+            self.run_db(queries.delete_note, self.db, nid, on_done=_deleted, on_error=_failed)
+
+        def _deleted(_):
             self.notify("Anotação apagada.")
             self._pending_delete_note_id = 0
             if self.root.current == 'note_detail':
@@ -869,7 +1073,12 @@ class RootsApp(MDApp):
             else:
                 self.load_notes()
 
-            self._dismiss_delete_dialog()
+        def _failed(err):
+            print("Erro ao apagar anotação:", err)
+            self.notify("Falha ao apagar anotação.")
+
+        from kivymd.uix.dialog import MDDialog
+        from kivymd.uix.button import MDFlatButton
 
         self._delete_dialog = MDDialog(
             title="Apagar anotação",
@@ -909,64 +1118,30 @@ class RootsApp(MDApp):
         pc = int(detail.page_count or 0)
         self.update_book_status(s_db, pc, detail)
 
-    def update_book_progress(self, new_pages_read: int):
-        detail = self.root.get_screen('detail_screen')
-        pc = int(detail.page_count or 0)
-        old_pages = int(detail.pages_read or 0)
-
-        # Garante que o novo valor de páginas lidas esteja dentro dos limites (0 a page_count)
-        if pc > 0:
-            new_pages = max(0, min(int(new_pages_read or 0), pc))
-        else:
-            new_pages = 0
-
-        # Define o status com base no novo número de páginas
-        if new_pages <= 0:
-            status = 'Quero ler'
-            new_pages = 0
-        elif pc > 0 and new_pages >= pc:
-            status = 'Concluído'
-            new_pages = pc
-        else:
-            status = 'Lendo'
-
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        try:
-            # 1. Salva o estado principal (página e status) SEMPRE.
-            cur.execute(
-                "UPDATE livros SET pagina_atual = ?, status = ? WHERE id = ?",
-                (new_pages, status, detail.book_id)
-            )
-
-            # 2. Calcula o delta e salva o progresso diário APENAS se for um avanço.
-            delta = new_pages - old_pages
-            if delta > 0:
-                today = date.today().isoformat()
-                # Usamos INSERT OR IGNORE e UPDATE para lidar com o registro diário
-                cur.execute(
-                    "INSERT OR IGNORE INTO progresso_diario (livro_id, data, paginas_lidas) VALUES (?, ?, 0)",
-                    (detail.book_id, today)
-                )
-                cur.execute(
-                    "UPDATE progresso_diario SET paginas_lidas = paginas_lidas + ? WHERE livro_id = ? AND data = ?",
-                    (delta, detail.book_id, today)
-                )
-            
-            conn.commit()
-
-        except sqlite3.Error as e:
-            print("Erro ao atualizar progresso:", e)
-            self.notify("Não consegui salvar o progresso.")
-        finally:
-            conn.close()
-
-        # Atualiza as propriedades da tela para refletir a mudança imediatamente
-        detail.pages_read = new_pages
-        detail.book_status = status
-        self._refresh_detail_progress()  # Recalcula a porcentagem e atualiza a UI
-        self.notify("Progresso atualizado.")
+    def update_book_status(self, status, page_count, detail):
+        # "Lido" fecha o livro na última página e "Quero ler" volta ao início;
+        # "Lendo" mantém a página atual
+        pages = int(detail.pages_read or 0)
+        if status == 'Concluído' and page_count > 0:
+            pages = page_count
+        elif status == 'Quero ler':
+            pages = 0
+        book_id = detail.book_id
+
+        def _saved(_result):
+            if detail.book_id == book_id:
+                detail.pages_read = pages
+                detail.book_status = status
+                detail.progress_percent = int(round(pages * 100 / page_count)) if page_count > 0 else 0
+            self._library_update(book_id, pages, status)
+            self.notify(f"Status: {self.status_db_to_ui(status)}")
+
+        def _failed(err):
+            print("Erro ao atualizar status:", err)
+            self.notify("Não consegui salvar o status.")
+
+        self.run_db(queries.save_book_status, self.db, book_id, status, pages,
+                    on_done=_saved, on_error=_failed)
 
     def _refresh_detail_progress(self):
         detail = self.root.get_screen('detail_screen')
@@ -993,6 +1168,10 @@ class RootsApp(MDApp):
             self.notify("Adicione o livro para acompanhar o progresso.")
             return
 
+        from kivymd.uix.dialog import MDDialog
+        from kivymd.uix.button import MDFlatButton
+        from kivymd.uix.textfield import MDTextField
+
         field = MDTextField(
             text=str(detail.pages_read or 0),
             hint_text="Páginas lidas",
@@ -1038,39 +1217,43 @@ class RootsApp(MDApp):
         else:
             status = 'Lendo'
 
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        try:
-            cur.execute(
-                "UPDATE livros SET pagina_atual = ?, status = ? WHERE id = ?",
-                (new_pages, status, detail.book_id)
-            )
-
-            delta = max(0, new_pages - old_pages)
-            if delta > 0:
-                today = date.today().isoformat()
-                cur.execute(
-                    "INSERT INTO progresso_diario (livro_id, data, paginas_lidas) VALUES (?, ?, ?)",
-                    (detail.book_id, today, delta)
-                )
-            conn.commit()
-        except sqlite3.Error as e:
-            print("Erro ao atualizar progresso:", e)
-            self.notify("Não consegui salvar o progresso.")
-        finally:
-            conn.close()
-
+        # A tela muda na hora; a gravação vai para a fila do ProgressWriter e
+        # atualizações em rajada viram uma transação só (progress.py)
         detail.pages_read = new_pages
         detail.book_status = status
         self._refresh_detail_progress()
-        self.notify("Progresso atualizado.")
+        self._library_update(detail.book_id, new_pages, status)
+
+        delta = max(0, new_pages - old_pages)
+        self.progress_writer.add(detail.book_id, new_pages, status, delta, date.today().isoformat())
+        if not getattr(self, "_progress_flush_trigger", None):
+            self._progress_flush_trigger = Clock.create_trigger(lambda *_: self._flush_progress(), 0.5)
+        self._progress_flush_trigger()
+
+    def _flush_progress(self):
+        def _failed(err):
+            print("Erro ao atualizar progresso:", err)
+            self.notify("Não consegui salvar o progresso.")
+
+        def _flushed(books):
+            if not books:
+                return
+            self.notify("Progresso atualizado.")
+            # Os triggers já atualizaram o ritmo; a previsão do livro aberto muda junto
+            detail = self.root.get_screen('detail_screen')
+            if detail.already_added and detail.book_id in books:
+                self._load_forecast(detail.book_id)
+
+        self.run_db(self.progress_writer.flush, on_done=_flushed, on_error=_failed)
 
     # ------------------ CRONÔMETRO ------------------
+    # Estado e tempo em timer.ReadingTimer (relógio monotônico, segmentos
+    # reais). O rótulo só é atualizado com a tela do cronômetro visível; o
+    # checkpoint no banco roda enquanto o cronômetro estiver ligado.
+    TIMER_CHECKPOINT_SEC = 30
     _timer_event = None
-    _timer_running = False
-    _timer_start_ts = 0
-    _elapsed_paused = 0
+    _timer_checkpoint_event = None
+    _timer_book_id = None    # livro da sessão (o aberto no detalhe quando o cronômetro começou)
 
     def _fmt_hhmmss(self, secs: int) -> str:
         secs = max(0, int(secs))
@@ -1079,269 +1262,302 @@ class RootsApp(MDApp):
         s = secs % 60
         return f"{h:02d}:{m:02d}:{s:02d}"
 
+    def _restore_timer(self):
+        """Recupera (pausado) um cronômetro que ficou ligado quando o app morreu."""
+        def _restored(row):
+            if not row or self.timer.started:
+                return
+            try:
+                self.timer = ReadingTimer.restore(row[1])
+            except (ValueError, KeyError, TypeError) as e:
+                print("[Cronômetro] Checkpoint inválido:", e)
+                return
+            if self.timer.started:
+                self._set_timer_book(row[0], row[2])
+                self._refresh_timer_label()
+                self.notify(f"Sessão de leitura recuperada ({self._fmt_hhmmss(self.timer.elapsed())}).")
+
+        self.run_db(queries.load_timer_checkpoint, self.db, on_done=_restored)
+
+    def _checkpoint_timer(self, *_):
+        if self.timer.started:
+            self.run_db(queries.save_timer_checkpoint, self.db, self._timer_book_id, self.timer.checkpoint())
+
+    def _set_timer_book(self, book_id, title=''):
+        self._timer_book_id = book_id or None
+        try:
+            self.root.get_screen('timer_screen').book_title = (title or '') if book_id else ''
+        except Exception:
+            pass
+
+    def on_timer_screen_enter(self):
+        self._refresh_timer_label()
+        if self.timer.running:
+            self._start_timer_ticks()
+
+    def on_timer_screen_leave(self):
+        self._stop_timer_ticks()
+
+    def _start_timer_ticks(self):
+        if not self._timer_event:
+            self._timer_event = Clock.schedule_interval(self._tick_timer, 0.5)
+
+    def _stop_timer_ticks(self):
+        if self._timer_event:
+            self._timer_event.cancel()
+            self._timer_event = None
+
+    def _refresh_timer_label(self):
+        try:
+            ts = self.root.get_screen('timer_screen')
+        except Exception:
+            return
+        ts.ids.timer_label.text = self._fmt_hhmmss(self.timer.elapsed())
+
     def start_or_resume_timer(self):
         """Usa um único botão: iniciar do zero OU retomar se estiver pausado."""
-        if self._timer_running:
+        resuming = self.timer.started
+        if not self.timer.start():
             return
-        from time import time
-        self._timer_start_ts = int(time())
-        self._timer_running = True
-        if self._timer_event:
-            try: self._timer_event.cancel()
-            except Exception: pass
-        self._timer_event = Clock.schedule_interval(self._tick_timer, 1)
-        self.notify("Cronômetro retomado." if (self._elapsed_paused or 0) > 0 else "Cronômetro iniciado.")
+        if not resuming:
+            # A sessão nova fica com o livro aberto no detalhe (se ele estiver salvo)
+            detail = self.root.get_screen('detail_screen')
+            if detail.already_added:
+                self._set_timer_book(detail.book_id, detail.book_title)
+            else:
+                self._set_timer_book(None)
+        if self.root.current == 'timer_screen':
+            self._start_timer_ticks()
+        if not self._timer_checkpoint_event:
+            self._timer_checkpoint_event = Clock.schedule_interval(self._checkpoint_timer, self.TIMER_CHECKPOINT_SEC)
+        self._checkpoint_timer()
+        self.notify("Cronômetro retomado." if resuming else "Cronômetro iniciado.")
 
     start_timer  = start_or_resume_timer
     resume_timer = start_or_resume_timer
 
     def _tick_timer(self, dt):
-        from time import time
-        elapsed = (int(time()) - int(self._timer_start_ts or 0)) + int(self._elapsed_paused or 0)
-        ts = self.root.get_screen('timer_screen')
-        ts.ids.timer_label.text = self._fmt_hhmmss(elapsed)
+        self._refresh_timer_label()
+
+    def _stop_timer_events(self):
+        self._stop_timer_ticks()
+        if self._timer_checkpoint_event:
+            self._timer_checkpoint_event.cancel()
+            self._timer_checkpoint_event = None
 
     def pause_timer(self):
         """Pausa mas não zera"""
-        if not self._timer_running:
+        if not self.timer.pause():
             return
-        from time import time
-        # salva tempo acumulado
-        self._elapsed_paused += int(time()) - int(self._timer_start_ts or 0)
-        self._timer_running = False
-        if self._timer_event:
-            try:
-                self._timer_event.cancel()
-            except Exception:
-                pass
-            self._timer_event = None
+        self._stop_timer_events()
+        self._refresh_timer_label()
+        self._checkpoint_timer()
         self.notify("Cronômetro pausado.")
 
-
     def reset_timer(self):
         """Reseta sem salvar"""
-        if self._timer_event:
-            try:
-                self._timer_event.cancel()
-            except Exception:
-                pass
-            self._timer_event = None
-        self._timer_running = False
-        self._elapsed_paused = 0
-        ts = self.root.get_screen('timer_screen')
-        ts.ids.timer_label.text = "00:00:00"
+        self._stop_timer_events()
+        self.timer.reset()
+        self._set_timer_book(None)
+        self._refresh_timer_label()
+        self.run_db(queries.clear_timer_checkpoint, self.db)
         self.notify("Cronômetro zerado.")
 
     def save_timer(self):
         """Salva a sessão do cronômetro em sessoes_leitura e atualiza o gráfico se estiver na aba."""
-        ts = self.root.get_screen('timer_screen')
-        txt = ts.ids.timer_label.text.strip() if 'timer_label' in ts.ids else "00:00:00"
-        try:
-            h, m, s = [int(x) for x in txt.split(":")]
-            duracao = h * 3600 + m * 60 + s
-        except Exception:
-            duracao = 0
-
-        if duracao <= 0:
+        session = self.timer.session()
+        if not session:
             self.notify("Nada para salvar.")
             return
+        inicio, fim, duracao, dia = session
+        book_id = self._timer_book_id
+        # A sessão salva termina agora: para o cronômetro antes de gravar
+        self._stop_timer_events()
+        self.timer.reset()
+        self._set_timer_book(None)
+        self._refresh_timer_label()
+
+        def _saved(_session_id):
+            self.notify("Sessão salva.")
+            # Se o usuário estiver na tela de gráficos, atualiza na hora
+            if self.root.current == 'graph_screen':
+                self.render_time_chart()
+
+        def _failed(err):
+            print("Erro ao salvar sessão:", err)
+            self.notify("Falha ao salvar sessão.")
 
-        now = datetime.now()
-        inicio = now.strftime("%Y-%m-%d %H:%M:%S")
-        fim = inicio
-        dia = now.date().isoformat()
+        # livro_id NULL = sessão sem livro; o checkpoint sai na mesma transação
+        self.run_db(queries.finish_timer_session, self.db, book_id, inicio, fim, duracao, dia,
+                    on_done=_saved, on_error=_failed)
 
-        db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        try:
-            # livro_id pode ficar vazio
-            cur.execute("""
-                INSERT INTO sessoes_leitura (livro_id, inicio, fim, duracao_seg, dia)
-                VALUES (?, ?, ?, ?, ?)
-            """, ("", inicio, fim, int(duracao), dia))
-            conn.commit()
-        except Exception as e:
-            print("Erro ao salvar sessão:", e)
-            self.notify("Falha ao salvar sessão.")
-            conn.close()
-            return
-        conn.close()
+    #========== IMPORTAÇÃO (CSV / Goodreads) =============
 
-        ts.ids.timer_label.text = "00:00:00"
-        self.notify("Sessão salva.")
+    def open_library_menu(self, caller):
+        from kivymd.uix.menu import MDDropdownMenu
 
-        # Se o usuário estiver na tela de gráficos, atualiza na hora
-        if self.root.current == 'graph_screen':
-            self.render_time_chart()
+        items = [
+            {"text": "Importar CSV / Goodreads",
+             "on_release": lambda: (self._dismiss_library_menu(), self.open_import_picker())},
+            {"text": "Exportar (JSONL, CSV, Markdown)",
+             "on_release": lambda: (self._dismiss_library_menu(), self.export_library())},
+            {"text": "Backup do banco",
+             "on_release": lambda: (self._dismiss_library_menu(), self.backup_database())},
+        ]
+        self._dismiss_library_menu()
+        self._library_menu = MDDropdownMenu(caller=caller, items=items, width_mult=4)
+        self._library_menu.open()
+
+    def _dismiss_library_menu(self):
+        menu = getattr(self, "_library_menu", None)
+        if menu:
+            menu.dismiss()
+        self._library_menu = None
+
+    def open_import_picker(self):
+        from kivymd.uix.filemanager import MDFileManager
+
+        if not getattr(self, "_file_manager", None):
+            self._file_manager = MDFileManager(
+                exit_manager=lambda *_: self._file_manager.close(),
+                select_path=self._on_import_path,
+                ext=[".csv"],
+            )
+        start = os.path.expanduser("~") if platform != 'android' else "/storage/emulated/0/Download"
+        self._file_manager.show(start)
 
-    #========== COMPARTILHAMENTO DO GRÁFICO =============
+    def _on_import_path(self, path):
+        self._file_manager.close()
+        if not path or not os.path.isfile(path):
+            self.notify("Escolha um arquivo .csv.")
+            return
+        self.import_library_csv(path)
 
-    def share_weekly_summary(self):
+    def import_library_csv(self, path):
         """
-        Cria uma imagem de compartilhamento no estilo Strava, com fundo transparente.
+        Importa numa thread própria: cada lote é uma transação curta, então as
+        telas continuam lendo/gravando entre um lote e outro.
         """
-        import webbrowser
-        from kivy.core.window import Window
-        from kivy.clock import Clock
-        from kivy.metrics import dp
-        from kivymd.uix.boxlayout import MDBoxLayout
-        from kivymd.uix.label import MDLabel
-        from kivy_garden.graph import Graph, MeshLinePlot, MeshStemPlot
+        import threading
+        import importer
 
-        try:
-            # --- PARTE 1: Dados ---
-            start, end = self._week_range_sun_sat()
-            db_path = os.path.join(self.user_data_dir, "db", "roots.db")
-            conn = sqlite3.connect(db_path)
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT date(COALESCE(dia, inicio)) AS d, SUM(COALESCE(duracao_seg, 0)) AS segs
-                FROM sessoes_leitura 
-                WHERE date(COALESCE(dia, inicio)) BETWEEN ? AND ?
-                GROUP BY date(COALESCE(dia, inicio)) ORDER BY d
-            """, (start.isoformat(), end.isoformat()))
-            rows = dict(cur.fetchall())
-            conn.close()
-
-            ys = [int(rows.get((start + timedelta(days=i)).isoformat(), 0)) // 60 for i in range(7)]
-            week_days = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"]
-
-            total_minutes = sum(ys)
-            max_minutes = max(ys) if ys else 0
-            min_minutes = min(ys) if ys else 0
-            most_productive_day = week_days[ys.index(max_minutes)] if total_minutes > 0 else "Nenhum"
-            least_productive_day = week_days[ys.index(min_minutes)] if total_minutes > 0 else "Nenhum"
-
-            xs = list(range(7))
-            media = sum(ys) / 7.0 if ys else 0.0
-
-            # --- PARTE 2: Container ---
-            share_container = MDBoxLayout(
-                orientation='vertical',
-                size_hint=(None, None),
-                size=(dp(700), dp(800)),
-                padding=(dp(40), dp(40), dp(40), dp(40)),
-                spacing=dp(15),
-                md_bg_color=(0, 0, 0, 0)
-            )
+        if getattr(self, "_importing", False):
+            self.notify("Já existe uma importação em andamento.")
+            return
+        self._importing = True
+        shown = [0]   # último quarto (25%, 50%...) avisado
 
-            share_container.add_widget(MDLabel(
-                text="Meu Resumo da Semana no Roots", 
-                font_style="H5",
-                adaptive_height=True,
-                halign='center',
-                color=(1, 1, 1, 1)
-            ))
-
-            share_container.add_widget(MDBoxLayout(size_hint_y=None, height=dp(20)))
-
-            share_container.add_widget(MDLabel(
-                text="Tempo de leitura (min) — semana atual (Dom->Sáb)",
-                halign="center", 
-                size_hint_y=None, 
-                height=dp(24), 
-                bold=True,
-                color=(1, 1, 1, 1)
-            ))
-
-            # ------------- Gráfico --------------
-            graph = Graph(
-                xlabel='Dias',
-                ylabel='Minutos',
-                x_ticks_minor=0,
-                x_ticks_major=1,
-                y_ticks_major=30,
-                y_grid_label=True,
-                x_grid=True, y_grid=True,
-                xmin=-0.5, xmax=6.5,
-                ymin=0, ymax=120,
-                size_hint=(1, None),
-                height=dp(300),
-                padding=dp(5),
-                background_color=(0,0,0,0),
-                border_color=(1, 1, 1, 1),
-                tick_color=(1, 1, 1, 1),
-                label_options={'color': (1, 1, 1, 1)},
-                x_grid_label=True
-            )
+        def _progress(rows, fraction):
+            quarter = int((fraction or 0) * 4)
+            if 0 < quarter < 4 and quarter > shown[0]:
+                shown[0] = quarter
+                Clock.schedule_once(lambda *_: self.notify(f"Importando… {quarter * 25}% ({rows} linhas)"), 0)
 
-            # Aqui ficam só os dias da semana no eixo X
-            graph.x_labels = week_days  
+        def _run():
+            try:
+                result = importer.import_csv(self.db, path, progress=_progress)
+            except Exception as e:
+                print("[Importação] Falha:", e)
+                Clock.schedule_once(lambda *_, err=e: self._on_import_done(None, err), 0)
+                return
+            Clock.schedule_once(lambda *_: self._on_import_done(result, None), 0)
 
-            bar_plot = MeshStemPlot(color=[1, 1, 1, 1])
-            bar_plot.points = list(zip(xs, ys))
-            graph.add_plot(bar_plot)
+        self.notify("Importando biblioteca…")
+        threading.Thread(target=_run, name="import-csv", daemon=True).start()
 
-            avg_plot = MeshLinePlot(color=[1, 0, 0, 1])
-            avg_plot.points = [(x, media) for x in xs]
-            graph.add_plot(avg_plot)
+    def _on_import_done(self, result, err):
+        self._importing = False
+        if err is not None:
+            self.notify(f"Falha na importação: {err}")
+            return
+        # Carga em lote: aqui vale recarregar a biblioteca inteira de uma vez
+        self.load_saved_books()
+        self.notify(f"{result.imported} livros importados ({result.skipped} linhas ignoradas).")
 
-            share_container.add_widget(graph)
+    #========== EXPORTAÇÃO / BACKUP =============
 
-            # Legenda dos dias (abaixo do gráfico)
-            day_labels_layout = MDBoxLayout(
-                orientation='horizontal',
-                size_hint_y=None,
-                height=dp(22),
-                spacing=dp(5),
-                padding=(dp(80), 0, dp(20), 0)
-            )
-            
-            for d in week_days:
-                day_labels_layout.add_widget(MDLabel(
-                    text=d,
-                    halign="center",
-                    theme_text_color="Custom",
-                    text_color=(1, 1, 1, 1),
-                    font_size="12sp",
-                ))
-            share_container.add_widget(day_labels_layout)
-
-            # Média
-            share_container.add_widget(MDLabel(
-                text=f"Média: {media:.1f} min/dia",
-                halign="center",
-                size_hint_y=None,
-                height=dp(22),
-                color=(1, 1, 1, 1)
-            ))
-
-            # Estatísticas
-            stats_text = (
-                f"Total de minutos lidos: [b]{total_minutes}[/b]\n\n"
-                f"Dia mais produtivo: [b]{most_productive_day}[/b] ({max_minutes} min)\n\n"
-                f"Dia com menor leitura: [b]{least_productive_day}[/b] ({min_minutes} min)"
-            )
-            share_container.add_widget(MDLabel(
-                text=stats_text, 
-                markup=True, 
-                halign='center',
-                adaptive_height=True,
-                color=(1, 1, 1, 1)
-            ))
-
-            # --- PARTE 3: Exportar ---
-            def export_and_cleanup(*args):
-                filepath = os.path.join(self.user_data_dir, "resumo_roots.png")
-                share_container.export_to_png(filepath)
-                Window.remove_widget(share_container)
-
-                if platform == 'android':
-                    self.notify("Imagem salva na galeria! Procure por 'resumo_roots.png'.")
-                else:
-                    folder_path = os.path.dirname(filepath)
-                    webbrowser.open(f"file:///{folder_path}")
-                    self.notify("Imagem salva! Escolha na galeria para compartilhar.")
-
-            Window.add_widget(share_container)
-            share_container.do_layout()
-            share_container.canvas.ask_update()
-            Clock.schedule_once(export_and_cleanup, 0.2)
+    def _exports_dir(self):
+        return os.path.join(self.user_data_dir, "exports")
 
-        except Exception as e:
-            import traceback; traceback.print_exc()
-            self.notify("Ocorreu um erro ao gerar a imagem.")
+    def _run_in_background(self, name, fn, on_done, fail_msg):
+        """fn() numa thread própria; on_done(resultado) de volta na thread da UI."""
+        import threading
+
+        def _run():
+            try:
+                result = fn()
+            except Exception as e:
+                print(f"[{name}] Falha:", e)
+                Clock.schedule_once(lambda *_: self.notify(fail_msg), 0)
+                return
+            Clock.schedule_once(lambda *_: on_done(result), 0)
+
+        threading.Thread(target=_run, name=name, daemon=True).start()
+
+    def export_library(self):
+        import export
+
+        out_dir = export.timestamped(self._exports_dir(), "roots-export")
+        self.notify("Exportando…")
+        self._run_in_background(
+            "export", lambda: export.export_all(self.db, out_dir),
+            lambda _written: self._on_export_ready(out_dir, "Exportação concluída."),
+            "Falha ao exportar.",
+        )
+
+    def backup_database(self):
+        import export
+
+        os.makedirs(self._exports_dir(), exist_ok=True)
+        dest = export.timestamped(self._exports_dir(), "roots-backup", ".db")
+        self.notify("Copiando o banco…")
+        self._run_in_background(
+            "backup", lambda: export.backup(self.db, dest),
+            lambda path: self._on_export_ready(path, "Backup salvo."),
+            "Falha ao copiar o banco.",
+        )
+
+    def _on_export_ready(self, path, msg):
+        if platform == 'android':
+            self.notify(f"{msg} ({path})")
+        else:
+            import webbrowser
+            folder = path if os.path.isdir(path) else os.path.dirname(path)
+            webbrowser.open(f"file:///{folder}")
+            self.notify(msg)
+
+    #========== COMPARTILHAMENTO DO GRÁFICO =============
+
+    def share_weekly_summary(self):
+        """
+        Gera a imagem de compartilhamento (estilo Strava, fundo transparente)
+        com Pillow numa thread separada: sem widgets temporários nem janela.
+        """
+        import threading
+        from share_image import render_weekly_summary
+
+        week_range = self._week_range_sun_sat()
+        filepath = os.path.join(self.user_data_dir, "resumo_roots.png")
+
+        def _render():
+            try:
+                render_weekly_summary(self.stats.summary(*week_range), filepath)
+            except Exception:
+                import traceback; traceback.print_exc()
+                Clock.schedule_once(lambda *_: self.notify("Ocorreu um erro ao gerar a imagem."), 0)
+                return
+            Clock.schedule_once(lambda *_: self._on_share_image_ready(filepath), 0)
+
+        threading.Thread(target=_render, name="share-image", daemon=True).start()
+
+    def _on_share_image_ready(self, filepath):
+        if platform == 'android':
+            self.notify("Imagem salva na galeria! Procure por 'resumo_roots.png'.")
+        else:
+            import webbrowser
+            folder_path = os.path.dirname(filepath)
+            webbrowser.open(f"file:///{folder_path}")
+            self.notify("Imagem salva! Escolha na galeria para compartilhar.")
 
 if __name__ == "__main__":
     RootsApp().run()
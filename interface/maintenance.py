@@ -0,0 +1,99 @@
+"""
+Tarefas de manutenção do banco do Roots, fora do app.
+
+    python maintenance.py CAMINHO/roots.db migrate
+    python maintenance.py CAMINHO/roots.db rebuild-rollups
+    python maintenance.py CAMINHO/roots.db compact-progress
+    python maintenance.py CAMINHO/roots.db import-csv goodreads_library_export.csv
+    python maintenance.py CAMINHO/roots.db backup /tmp/roots-copia.db
+    python maintenance.py CAMINHO/roots.db export /tmp/roots-export
+"""
+import argparse
+import os
+import sys
+import time
+
+from database import Database
+import export
+import forecast
+import importer
+import analytics
+import progress
+import rollups
+
+
+def cmd_migrate(db, _args):
+    print("Esquema na versão", db.migrate())
+
+
+def cmd_rebuild_rollups(db, _args):
+    days = rollups.rebuild(db)
+    print(f"Resumo diário reconstruído: {days} dias.")
+    cells = analytics.rebuild(db)
+    print(f"Cubo dia da semana x hora x livro reconstruído: {cells} células.")
+    books = forecast.rebuild(db)
+    print(f"Ritmo de leitura reconstruído: {books} livros.")
+
+
+def cmd_compact_progress(db, _args):
+    removed = progress.compact(db)
+    print(f"Progresso diário compactado: {removed} linhas zeradas apagadas.")
+
+
+def cmd_import_csv(db, args):
+    if not args.path:
+        raise SystemExit("import-csv precisa do caminho do CSV")
+    t0 = time.perf_counter()
+
+    def progress(rows, fraction):
+        pct = f" ({fraction:.0%})" if fraction is not None else ""
+        print(f"\r{rows} linhas{pct}", end="", flush=True)
+
+    result = importer.import_csv(db, args.path, progress=progress)
+    print(f"\nImportados/atualizados: {result.imported} livros de {result.rows} linhas "
+          f"({result.skipped} sem título) em {time.perf_counter() - t0:.1f} s.")
+
+
+def cmd_backup(db, args):
+    if not args.path:
+        raise SystemExit("backup precisa do caminho do arquivo de destino")
+    print("Copiando o banco…")
+    export.backup(db, args.path)
+    print(f"Cópia gravada em {args.path} ({os.path.getsize(args.path) / 1e6:.1f} MB)")
+
+
+def cmd_export(db, args):
+    if not args.path:
+        raise SystemExit("export precisa da pasta de destino")
+    for path, rows in export.export_all(db, args.path).items():
+        print(f"{path}: {rows}")
+
+
+COMMANDS = {
+    "migrate": cmd_migrate,
+    "rebuild-rollups": cmd_rebuild_rollups,
+    "compact-progress": cmd_compact_progress,
+    "import-csv": cmd_import_csv,
+    "backup": cmd_backup,
+    "export": cmd_export,
+}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("db_path", help="caminho do roots.db (fica em user_data_dir/db/)")
+    ap.add_argument("command", choices=sorted(COMMANDS))
+    ap.add_argument("path", nargs="?", help="arquivo/pasta de entrada ou saída (import-csv, backup, export)")
+    args = ap.parse_args(argv)
+
+    db = Database(args.db_path)
+    try:
+        db.migrate()
+        COMMANDS[args.command](db, args)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
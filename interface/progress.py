@@ -0,0 +1,68 @@
+"""
+Gravação do progresso de leitura (sem Kivy).
+
+Um único caminho de escrita: queries.save_book_progress, que faz UPSERT
+em progresso_diario (uma linha por livro e dia). ProgressWriter junta as
+atualizações que chegam em rajada (vários "salvar" seguidos no diálogo) e
+grava tudo numa transação só no flush().
+"""
+import threading
+
+import queries
+
+
+class ProgressWriter:
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._pending = {}   # livro_id -> {"pages", "status", "days": {dia: delta}}
+
+    def add(self, book_id, pages, status, delta, day):
+        """Enfileira; página/status ficam com o último valor e os deltas do dia se somam."""
+        with self._lock:
+            entry = self._pending.setdefault(book_id, {"days": {}})
+            entry["pages"] = pages
+            entry["status"] = status
+            if delta > 0:
+                entry["days"][day] = entry["days"].get(day, 0) + delta
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self):
+        """Grava o que estiver pendente numa transação. Devolve os livros gravados."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return []
+        try:
+            with self.db.write("livros", "progresso_diario"):
+                for book_id, entry in pending.items():
+                    days = entry["days"] or {None: 0}
+                    for day, delta in days.items():
+                        queries.save_book_progress(self.db, book_id, entry["pages"], entry["status"], delta, day)
+        except Exception:
+            # Devolve para a fila (sem passar por cima do que chegou depois)
+            with self._lock:
+                for book_id, entry in pending.items():
+                    newer = self._pending.get(book_id)
+                    if newer is None:
+                        self._pending[book_id] = entry
+                    else:
+                        for day, delta in entry["days"].items():
+                            newer["days"][day] = newer["days"].get(day, 0) + delta
+            raise
+        return list(pending)
+
+
+def compact(db):
+    """
+    Apaga as linhas zeradas de progresso_diario (paginas_lidas nulo ou <= 0),
+    que não contam para nada. As datas já estão em 'AAAA-MM-DD': a migração 2
+    normalizou as antigas e todas as gravações usam isoformat(). Devolve o nº
+    de linhas apagadas.
+    """
+    with db.write("progresso_diario") as cur:
+        cur.execute("DELETE FROM progresso_diario WHERE COALESCE(paginas_lidas, 0) <= 0")
+        return cur.rowcount
@@ -0,0 +1,226 @@
+"""
+Consultas e gravações das telas, sem Kivy.
+
+Rodam na thread do banco (Database.submit) e também são o que os
+benchmarks medem.
+"""
+from book_keys import book_key
+
+
+def fetch_library(db):
+    """Livros salvos, do mais recente para o mais antigo (sem duplicatas: idx_livros_chave)."""
+    with db.read() as cur:
+        cur.execute("""
+            SELECT id, nome, autor, cover_url, COALESCE(qtde_paginas,0), COALESCE(descricao,''),
+                   COALESCE(pagina_atual,0), COALESCE(status,'Quero ler')
+            FROM livros
+            ORDER BY rowid DESC
+        """)
+        return cur.fetchall()
+
+
+def fetch_book_state(db, book_id):
+    """(pagina_atual, status, qtde_paginas) do livro salvo, ou None."""
+    with db.read() as cur:
+        cur.execute("""
+            SELECT COALESCE(pagina_atual,0),
+                   COALESCE(status,'Quero ler'),
+                   COALESCE(qtde_paginas,0)
+            FROM livros WHERE id = ?
+        """, (book_id,))
+        return cur.fetchone()
+
+
+def save_book(db, book_id, title, authors, cover_url, page_count, description=''):
+    """
+    Adiciona o livro à biblioteca. True se entrou, False se já estava salvo
+    (mesmo id ou mesmo título+autores com outro id).
+    """
+    with db.write("livros") as cur:
+        cur.execute("""
+            INSERT OR IGNORE INTO livros (
+                id, nome, autor, cover_url, qtde_paginas, status, pagina_atual, nota, genero_id, descricao,
+                chave_normalizada
+            ) VALUES (?, ?, ?, ?, ?, 'Quero ler', 0, 0, NULL, ?, ?)
+        """, (book_id, title, authors, cover_url, page_count, description, book_key(title, authors)))
+        return cur.rowcount > 0
+
+
+def find_saved_book(db, book_id, title, authors):
+    """id com que o livro está salvo (pelo id ou pela chave normalizada), ou None."""
+    with db.read() as cur:
+        cur.execute("""
+            SELECT id FROM livros WHERE id = ?
+            UNION ALL
+            SELECT id FROM livros WHERE chave_normalizada = ?
+            LIMIT 1
+        """, (book_id, book_key(title, authors)))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+
+def fetch_saved_book_state(db, book_id, title, authors):
+    """(id salvo, (pagina_atual, status, qtde_paginas)) do livro, ou None se não estiver salvo."""
+    saved_id = find_saved_book(db, book_id, title, authors)
+    if saved_id is None:
+        return None
+    return saved_id, fetch_book_state(db, saved_id)
+
+
+def saved_keys(db, keys):
+    """Quais das chaves normalizadas já estão na biblioteca (uma consulta só)."""
+    keys = list(set(keys))
+    if not keys:
+        return set()
+    found = set()
+    with db.read() as cur:
+        # Lotes abaixo do limite de parâmetros do SQLite
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            cur.execute(
+                f"SELECT chave_normalizada FROM livros WHERE chave_normalizada IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            found.update(row[0] for row in cur.fetchall())
+    return found
+
+
+def save_book_status(db, book_id, status, pages):
+    """Troca o status (e a página atual que ele implica) do livro."""
+    with db.write("livros") as cur:
+        cur.execute("UPDATE livros SET status = ?, pagina_atual = ? WHERE id = ?", (status, pages, book_id))
+
+
+def delete_book(db, book_id):
+    """Remove o livro; progresso e anotações saem junto (ON DELETE CASCADE)."""
+    with db.write("livros", "progresso_diario", "anotacoes", "sessoes_leitura") as cur:
+        cur.execute("DELETE FROM livros WHERE id = ?", (book_id,))
+
+
+def fetch_notes_page(db, book_id=None, before_id=None, limit=50):
+    """
+    Uma página de anotações [(id, nome_do_livro, prévia), ...] em ordem
+    decrescente de id. Paginação por chave (a.id < before_id), sem OFFSET:
+    usa a PK ou idx_anotacoes_livro(livro_id, id). A prévia (80 caracteres,
+    sem quebras de linha) já vem pronta do SQL.
+    """
+    where, params = [], []
+    if book_id:
+        where.append("a.livro_id = ?")
+        params.append(book_id)
+    if before_id is not None:
+        where.append("a.id < ?")
+        params.append(before_id)
+    sql_where = f"WHERE {' AND '.join(where)}" if where else ""
+
+    with db.read() as cur:
+        cur.execute(f"""
+            SELECT a.id,
+                   COALESCE(l.nome, 'Sem livro'),
+                   CASE WHEN length(a.texto) > 80
+                        THEN substr(replace(a.texto, char(10), ' '), 1, 80) || '…'
+                        ELSE replace(COALESCE(a.texto, ''), char(10), ' ')
+                   END
+            FROM anotacoes a
+            LEFT JOIN livros l ON l.id = a.livro_id
+            {sql_where}
+            ORDER BY a.id DESC
+            LIMIT ?
+        """, (*params, limit))
+        return cur.fetchall()
+
+
+def fetch_note(db, note_id):
+    """(id, texto, livro_id, nome_do_livro) ou None."""
+    with db.read() as cur:
+        cur.execute("""
+            SELECT a.id, a.texto, COALESCE(l.id,''), COALESCE(l.nome,'Sem livro')
+            FROM anotacoes a
+            LEFT JOIN livros l ON l.id = a.livro_id
+            WHERE a.id = ?
+        """, (note_id,))
+        return cur.fetchone()
+
+
+def save_note(db, note_id, book_id, text):
+    """Cria (note_id 0) ou edita a anotação; devolve o id."""
+    with db.write("anotacoes") as cur:
+        if note_id:
+            cur.execute(
+                "UPDATE anotacoes SET texto = ?, livro_id = ? WHERE id = ?",
+                (text, book_id or None, note_id)
+            )
+            return note_id
+        cur.execute("INSERT INTO anotacoes (livro_id, texto) VALUES (?, ?)", (book_id, text))
+        return cur.lastrowid
+
+
+def delete_note(db, note_id):
+    with db.write("anotacoes") as cur:
+        cur.execute("DELETE FROM anotacoes WHERE id = ?", (note_id,))
+
+
+def list_book_titles(db):
+    """[(id, nome)] da biblioteca em ordem alfabética (seletor de livro das anotações)."""
+    with db.read() as cur:
+        cur.execute("SELECT id, nome FROM livros ORDER BY nome COLLATE NOCASE ASC")
+        return cur.fetchall()
+
+
+def save_book_progress(db, book_id, pages, status, delta, day):
+    """Grava página/status do livro e soma `delta` páginas ao progresso do dia."""
+    with db.write("livros", "progresso_diario") as cur:
+        cur.execute(
+            "UPDATE livros SET pagina_atual = ?, status = ? WHERE id = ?",
+            (pages, status, book_id)
+        )
+        if delta > 0:
+            cur.execute("""
+                INSERT INTO progresso_diario (livro_id, data, paginas_lidas) VALUES (?, ?, ?)
+                ON CONFLICT(livro_id, data) DO UPDATE SET paginas_lidas = paginas_lidas + excluded.paginas_lidas
+            """, (book_id, day, delta))
+
+
+def insert_session(db, book_id, inicio, fim, duracao_seg, dia):
+    """Grava uma sessão de leitura (book_id None = sem livro) e devolve o id."""
+    with db.write("sessoes_leitura") as cur:
+        cur.execute("""
+            INSERT INTO sessoes_leitura (livro_id, inicio, fim, duracao_seg, dia)
+            VALUES (?, ?, ?, ?, ?)
+        """, (book_id, inicio, fim, int(duracao_seg), dia))
+        return cur.lastrowid
+
+
+def save_timer_checkpoint(db, book_id, state):
+    """Grava (ou substitui) o estado do cronômetro em andamento."""
+    with db.write("cronometro_ativo") as cur:
+        cur.execute("""
+            INSERT INTO cronometro_ativo (id, livro_id, estado, atualizado_em)
+            VALUES (1, ?, ?, datetime('now', 'localtime'))
+            ON CONFLICT(id) DO UPDATE SET
+                livro_id = excluded.livro_id, estado = excluded.estado, atualizado_em = excluded.atualizado_em
+        """, (book_id, state))
+
+
+def load_timer_checkpoint(db):
+    """(livro_id, estado, nome do livro) do cronômetro interrompido, ou None."""
+    with db.read() as cur:
+        cur.execute("""
+            SELECT c.livro_id, c.estado, l.nome
+            FROM cronometro_ativo c LEFT JOIN livros l ON l.id = c.livro_id
+            WHERE c.id = 1
+        """)
+        return cur.fetchone()
+
+
+def clear_timer_checkpoint(db):
+    with db.write("cronometro_ativo") as cur:
+        cur.execute("DELETE FROM cronometro_ativo")
+
+
+def finish_timer_session(db, book_id, inicio, fim, duracao_seg, dia):
+    """Grava a sessão e apaga o checkpoint na mesma transação; devolve o id."""
+    with db.write("sessoes_leitura", "cronometro_ativo"):
+        session_id = insert_session(db, book_id, inicio, fim, duracao_seg, dia)
+        clear_timer_checkpoint(db)
+        return session_id
@@ -0,0 +1,109 @@
+"""
+Estatísticas de leitura independentes do Kivy (gráfico, imagem de
+compartilhamento, etc.).
+
+Os resultados ficam memorizados por (intervalo, versão dos dados): a versão
+é o data_version("sessoes_leitura") do Database, que só muda quando uma
+transação que grava sessões é confirmada.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import rollups
+
+
+WEEK_DAYS = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"]
+# date.weekday(): segunda = 0
+_WEEKDAY_LABELS = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+
+def week_range_sun_sat(today=None):
+    """Retorna (start, end) da semana DOM->SÁB da data informada (hoje por padrão)."""
+    today = today or date.today()
+    days_since_sun = (today.weekday() + 1) % 7  # dom -> 0
+    start = today - timedelta(days=days_since_sun)
+    return start, start + timedelta(days=6)
+
+
+def day_label(d: date) -> str:
+    return _WEEKDAY_LABELS[d.weekday()]
+
+
+@dataclass(frozen=True)
+class RangeSummary:
+    start: date
+    end: date
+    days: tuple           # datas do intervalo, em ordem
+    minutes: tuple        # minutos lidos em cada dia (mesma ordem)
+    total_minutes: int
+    average: float        # média de minutos/dia no intervalo
+    max_minutes: int
+    min_minutes: int
+    most_productive_day: str    # rótulo do dia ("Nenhum" se não houve leitura)
+    least_productive_day: str
+
+
+def summarize(start: date, end: date, seconds_by_day: dict) -> RangeSummary:
+    """Monta o resumo a partir de {'YYYY-MM-DD': segundos} (função pura)."""
+    days, minutes = [], []
+    d = start
+    while d <= end:
+        days.append(d)
+        minutes.append(int(seconds_by_day.get(d.isoformat(), 0)) // 60)
+        d += timedelta(days=1)
+
+    total = sum(minutes)
+    max_m = max(minutes) if minutes else 0
+    min_m = min(minutes) if minutes else 0
+    if total > 0:
+        most = day_label(days[minutes.index(max_m)])
+        least = day_label(days[minutes.index(min_m)])
+    else:
+        most = least = "Nenhum"
+
+    return RangeSummary(
+        start=start,
+        end=end,
+        days=tuple(days),
+        minutes=tuple(minutes),
+        total_minutes=total,
+        average=(total / len(minutes)) if minutes else 0.0,
+        max_minutes=max_m,
+        min_minutes=min_m,
+        most_productive_day=most,
+        least_productive_day=least,
+    )
+
+
+class ReadingStats:
+    """Resumos por intervalo de datas, memorizados até a próxima gravação de sessão."""
+
+    def __init__(self, db, max_entries=64):
+        self.db = db
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()   # usado pela UI e pela thread do banco
+
+    def summary(self, start: date, end: date) -> RangeSummary:
+        key = (start, end, self.db.data_version("sessoes_leitura"))
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+
+        result = summarize(start, end, rollups.daily_seconds(self.db, start, end))
+        with self._lock:
+            self._memo[key] = result
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return result
+
+    def current_week(self) -> RangeSummary:
+        return self.summary(*week_range_sun_sat())
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
@@ -0,0 +1,46 @@
+"""
+Resumo diário de leitura (tabelas leitura_diaria / leitura_diaria_livro).
+
+As tabelas são mantidas por triggers em sessoes_leitura (migração 5); este
+módulo só lê os totais e sabe reconstruí-los do zero a partir das sessões.
+"""
+
+
+def daily_seconds(db, start, end):
+    """{'YYYY-MM-DD': segundos} para os dias com leitura entre start e end (inclusive)."""
+    with db.read() as cur:
+        cur.execute(
+            "SELECT dia, segundos FROM leitura_diaria WHERE dia BETWEEN ? AND ?",
+            (start.isoformat(), end.isoformat()),
+        )
+        return dict(cur.fetchall())
+
+
+def seconds_by_book(db, start, end):
+    """{livro_id: segundos} somados entre start e end, inclusive ('' = sessões sem livro)."""
+    with db.read() as cur:
+        cur.execute("""
+            SELECT livro_id, SUM(segundos)
+            FROM leitura_diaria_livro
+            WHERE dia BETWEEN ? AND ?
+            GROUP BY livro_id
+        """, (start.isoformat(), end.isoformat()))
+        return dict(cur.fetchall())
+
+
+def rebuild(db):
+    """Recalcula os dois resumos a partir de sessoes_leitura. Retorna o nº de dias."""
+    with db.write() as cur:
+        cur.execute("DELETE FROM leitura_diaria")
+        cur.execute("DELETE FROM leitura_diaria_livro")
+        cur.execute("""
+            INSERT INTO leitura_diaria (dia, segundos, sessoes)
+            SELECT dia, SUM(duracao_seg), COUNT(*) FROM sessoes_leitura GROUP BY dia
+        """)
+        days = cur.rowcount
+        cur.execute("""
+            INSERT INTO leitura_diaria_livro (dia, livro_id, segundos, sessoes)
+            SELECT dia, COALESCE(livro_id, ''), SUM(duracao_seg), COUNT(*)
+            FROM sessoes_leitura GROUP BY dia, COALESCE(livro_id, '')
+        """)
+    return days
@@ -0,0 +1,120 @@
+"""
+Imagem de compartilhamento do resumo semanal, desenhada direto com Pillow.
+
+Não depende do Kivy nem de uma janela: pode rodar numa thread qualquer,
+em benchmark ou em teste de snapshot (mesma entrada -> mesmos pixels).
+"""
+import math
+import os.path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from reading_stats import WEEK_DAYS
+
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+
+WIDTH, HEIGHT = 700, 800
+WHITE = (255, 255, 255, 255)
+GRID = (255, 255, 255, 70)
+RED = (255, 0, 0, 255)
+TRANSPARENT = (0, 0, 0, 0)
+Y_TICK = 30
+
+
+def _font(name, size, fonts_dir):
+    return ImageFont.truetype(os.path.join(fonts_dir, name), size)
+
+
+def _center_text(draw, y, text, font, width, fill=WHITE):
+    w = draw.textlength(text, font=font)
+    draw.text(((width - w) / 2, y), text, font=font, fill=fill)
+
+
+def _stat_line(draw, y, parts, regular, bold, width):
+    """Linha centralizada misturando trechos normais e em negrito: [(texto, negrito?), ...]."""
+    total = sum(draw.textlength(t, font=bold if b else regular) for t, b in parts)
+    x = (width - total) / 2
+    for text, is_bold in parts:
+        font = bold if is_bold else regular
+        draw.text((x, y), text, font=font, fill=WHITE)
+        x += draw.textlength(text, font=font)
+
+
+def render_weekly_summary(summary, path=None, scale=1.0, fonts_dir=FONTS_DIR):
+    """
+    Desenha o resumo (reading_stats.RangeSummary da semana Dom->Sáb) numa
+    imagem RGBA de fundo transparente. Grava em `path` (PNG) se informado e
+    devolve a imagem.
+    """
+    width, height = int(WIDTH * scale), int(HEIGHT * scale)
+
+    def px(v):
+        return int(round(v * scale))
+
+    title_font = _font("Poppins-SemiBold.ttf", px(32), fonts_dir)
+    subtitle_font = _font("Poppins-SemiBold.ttf", px(18), fonts_dir)
+    label_font = _font("Inter-Regular.ttf", px(15), fonts_dir)
+    text_font = _font("Inter-Regular.ttf", px(18), fonts_dir)
+    bold_font = _font("Inter-Medium.ttf", px(18), fonts_dir)
+
+    img = Image.new("RGBA", (width, height), TRANSPARENT)
+    draw = ImageDraw.Draw(img)
+
+    _center_text(draw, px(40), "Meu Resumo da Semana no Roots", title_font, width)
+    _center_text(draw, px(110), "Tempo de leitura (min) — semana atual (Dom->Sáb)", subtitle_font, width)
+
+    # ---------- Gráfico ----------
+    minutes = list(summary.minutes)
+    y_max = max(120, int(math.ceil(max(minutes or [0]) / Y_TICK)) * Y_TICK)
+    left, right = px(90), width - px(40)
+    top, bottom = px(160), px(480)
+    plot_h = bottom - top
+    slot = (right - left) / 7.0
+
+    def y_of(value):
+        return bottom - (value / y_max) * plot_h
+
+    for tick in range(0, y_max + 1, Y_TICK):
+        y = y_of(tick)
+        draw.line([(left, y), (right, y)], fill=GRID, width=max(1, px(1)))
+        label = str(tick)
+        lw = draw.textlength(label, font=label_font)
+        draw.text((left - px(10) - lw, y - px(9)), label, font=label_font, fill=WHITE)
+    draw.rectangle([left, top, right, bottom], outline=WHITE, width=max(1, px(2)))
+
+    bar_w = slot * 0.45
+    for i, value in enumerate(minutes):
+        cx = left + slot * (i + 0.5)
+        if value > 0:
+            draw.rectangle([cx - bar_w / 2, y_of(min(value, y_max)), cx + bar_w / 2, bottom], fill=WHITE)
+        day = WEEK_DAYS[i] if i < len(WEEK_DAYS) else ""
+        dw = draw.textlength(day, font=label_font)
+        draw.text((cx - dw / 2, bottom + px(10)), day, font=label_font, fill=WHITE)
+
+    avg_y = y_of(min(summary.average, y_max))
+    draw.line([(left, avg_y), (right, avg_y)], fill=RED, width=max(1, px(3)))
+
+    # Rótulo do eixo Y (girado)
+    axis = Image.new("RGBA", (int(draw.textlength("Minutos", font=label_font)) + 2, px(22)), TRANSPARENT)
+    ImageDraw.Draw(axis).text((0, 0), "Minutos", font=label_font, fill=WHITE)
+    axis = axis.rotate(90, expand=True)
+    img.alpha_composite(axis, (px(10), int(top + (plot_h - axis.height) / 2)))
+
+    # ---------- Textos ----------
+    _center_text(draw, px(530), f"Média: {summary.average:.1f} min/dia", text_font, width)
+    _stat_line(draw, px(600), [
+        ("Total de minutos lidos: ", False), (str(summary.total_minutes), True),
+    ], text_font, bold_font, width)
+    _stat_line(draw, px(650), [
+        ("Dia mais produtivo: ", False), (summary.most_productive_day, True),
+        (f" ({summary.max_minutes} min)", False),
+    ], text_font, bold_font, width)
+    _stat_line(draw, px(700), [
+        ("Dia com menor leitura: ", False), (summary.least_productive_day, True),
+        (f" ({summary.min_minutes} min)", False),
+    ], text_font, bold_font, width)
+
+    if path:
+        img.save(path, "PNG")
+    return img
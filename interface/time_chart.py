@@ -0,0 +1,116 @@
+"""
+Gráfico de tempo de leitura da semana (tela de gráficos).
+
+Os widgets (Graph, plots, rótulos) são criados uma vez em TimeChart();
+update() só troca os pontos dos plots e o texto dos rótulos. Importado
+apenas quando a tela de gráficos abre pela primeira vez.
+"""
+import math
+
+from kivy.metrics import dp
+from kivymd.uix.boxlayout import MDBoxLayout
+from kivymd.uix.card import MDSeparator
+from kivymd.uix.label import MDLabel
+
+from reading_stats import WEEK_DAYS
+
+Y_MIN_MAX = 120   # eixo Y vai pelo menos até 2 h
+Y_TICK = 30
+
+# ---------- Graph (kivy-garden.graph) ----------
+_garden_graph = None
+
+
+def garden_graph():
+    """Módulo kivy_garden.graph (importado na primeira chamada) ou None se faltar."""
+    global _garden_graph
+    if _garden_graph is None:
+        try:
+            import kivy_garden.graph as mod
+        except Exception:
+            mod = False
+        _garden_graph = mod
+    return _garden_graph or None
+
+
+class TimeChart:
+    """Monta o gráfico dentro de `box` (esvaziado antes) e guarda as referências."""
+
+    def __init__(self, box, primary_color=(1, 1, 1, 1)):
+        self.box = box
+        box.clear_widgets()
+        self.graph = self.bars = self.avg_line = None
+        xs = list(range(len(WEEK_DAYS)))
+        self._xs = xs
+
+        box.add_widget(MDLabel(text="Tempo de leitura (min) — semana atual (Dom->Sáb)",
+                               halign="center", size_hint_y=None, height=dp(24), bold=True))
+
+        mod = garden_graph()
+        if mod is not None:
+            self.graph = mod.Graph(
+                xlabel='Dias',
+                ylabel='Minutos',
+                x_ticks_minor=0,
+                x_ticks_major=1,
+                y_ticks_major=Y_TICK,
+                y_grid_label=True,
+                x_grid=True,
+                y_grid=True,
+                xmin=-0.5,
+                xmax=len(xs) - 0.5,
+                ymin=0,
+                ymax=Y_MIN_MAX,
+                size_hint=(1, None),
+                height=dp(260),
+                padding=dp(5),
+            )
+            try:
+                self.bars = mod.MeshStemPlot(color=[1, 1, 1, 1])
+            except Exception:
+                self.bars = mod.MeshLinePlot(color=list(primary_color))
+            self.graph.add_plot(self.bars)
+            self.avg_line = mod.MeshLinePlot(color=[1, 0, 0, 1])
+            self.graph.add_plot(self.avg_line)
+            box.add_widget(self.graph)
+
+            day_labels = MDBoxLayout(
+                orientation='horizontal',
+                size_hint_y=None,
+                height=dp(20),
+                padding=(dp(68), 0, dp(10), 0),
+            )
+            for label in WEEK_DAYS:
+                day_labels.add_widget(MDLabel(text=label, halign='center'))
+            box.add_widget(day_labels)
+
+        self.average_label = MDLabel(halign="center", size_hint_y=None, height=dp(22),
+                                     theme_text_color="Secondary")
+        box.add_widget(self.average_label)
+        box.add_widget(MDBoxLayout(size_hint_y=None, height=dp(20)))
+        box.add_widget(MDSeparator())
+        box.add_widget(MDBoxLayout(size_hint_y=None, height=dp(10)))
+
+        self.total_label = self._stat_label()
+        self.max_day_label = self._stat_label()
+        self.min_day_label = self._stat_label()
+
+    def _stat_label(self):
+        label = MDLabel(halign="center", size_hint_y=None, height=dp(20), markup=True)
+        self.box.add_widget(label)
+        return label
+
+    def update(self, week):
+        """Troca só dados: pontos dos plots, escala do eixo Y e textos."""
+        ys = list(week.minutes)
+        if self.graph is not None:
+            self.graph.ymax = max(Y_MIN_MAX, int(math.ceil(max(ys or [0]) / Y_TICK)) * Y_TICK)
+            self.bars.points = list(zip(self._xs, ys))
+            self.avg_line.points = [(x, week.average) for x in self._xs]
+
+        self.average_label.text = f"Média: {week.average:.1f} min/dia"
+        self.total_label.text = f"Total de minutos lidos na semana: [b]{week.total_minutes}[/b]"
+        self.max_day_label.text = (f"Dia mais produtivo: [b]{week.most_productive_day}[/b] "
+                                   f"({week.max_minutes} min)")
+        self.min_day_label.text = (f"Dia com menor leitura: [b]{week.least_productive_day}[/b] "
+                                   f"({week.min_minutes} min)")
@@ -0,0 +1,98 @@
+"""
+Motor do cronômetro de leitura (sem Kivy).
+
+- O tempo decorrido vem de time.monotonic(): mudar o relógio do sistema
+  (fuso, NTP, horário de verão) não altera a duração.
+- Cada iniciar/retomar abre um segmento e cada pausa o fecha; o início
+  (relógio de parede) de cada segmento fica guardado, então a sessão salva
+  tem inicio/fim reais e duracao_seg sem as pausas.
+- checkpoint() devolve um JSON com o estado; depois de um crash,
+  ReadingTimer.restore() volta com o tempo até o último checkpoint
+  (pausado, já que o relógio monotônico não sobrevive ao processo).
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+TIME_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+class ReadingTimer:
+    def __init__(self, monotonic=time.monotonic, now=datetime.now):
+        self._monotonic = monotonic
+        self._now = now
+        self.reset()
+
+    def reset(self):
+        self._segments = []        # [(início no relógio de parede, segundos)] já fechados
+        self._open_wall = None     # início (parede) do segmento em andamento
+        self._open_mono = None     # início (monotônico) do segmento em andamento
+
+    # ------------------ ESTADO ------------------
+    @property
+    def running(self) -> bool:
+        return self._open_mono is not None
+
+    @property
+    def started(self) -> bool:
+        return self.running or bool(self._segments)
+
+    def elapsed(self) -> float:
+        total = sum(seconds for _start, seconds in self._segments)
+        if self.running:
+            total += self._monotonic() - self._open_mono
+        return total
+
+    # ------------------ CONTROLES ------------------
+    def start(self) -> bool:
+        """Inicia ou retoma. False se já estava rodando."""
+        if self.running:
+            return False
+        self._open_wall = self._now()
+        self._open_mono = self._monotonic()
+        return True
+
+    def pause(self) -> bool:
+        """Fecha o segmento atual. False se não estava rodando."""
+        if not self.running:
+            return False
+        self._segments.append((self._open_wall, self._monotonic() - self._open_mono))
+        self._open_wall = self._open_mono = None
+        return True
+
+    def session(self):
+        """
+        (inicio, fim, duracao_seg, dia) da sessão até agora, ou None se não
+        houver tempo. fim = fim real do último segmento; as pausas contam no
+        intervalo inicio->fim, mas não em duracao_seg.
+        """
+        segments = list(self._segments)
+        if self.running:
+            segments.append((self._open_wall, self._monotonic() - self._open_mono))
+        duration = int(sum(seconds for _start, seconds in segments))
+        if duration <= 0:
+            return None
+        first_start = segments[0][0]
+        last_start, last_seconds = segments[-1]
+        end = last_start + timedelta(seconds=last_seconds)
+        return (first_start.strftime(TIME_FMT), end.strftime(TIME_FMT), duration, first_start.date().isoformat())
+
+    # ------------------ CHECKPOINT ------------------
+    def checkpoint(self) -> str:
+        segments = list(self._segments)
+        if self.running:
+            segments.append((self._open_wall, self._monotonic() - self._open_mono))
+        return json.dumps({
+            "segments": [[start.strftime(TIME_FMT), round(seconds, 3)] for start, seconds in segments],
+            "running": self.running,
+        })
+
+    @classmethod
+    def restore(cls, state: str, **kwargs):
+        """Timer pausado com os segmentos gravados em `state` (JSON de checkpoint())."""
+        timer = cls(**kwargs)
+        data = json.loads(state)
+        timer._segments = [
+            (datetime.strptime(start, TIME_FMT), float(seconds)) for start, seconds in data.get("segments", ())
+        ]
+        return timer